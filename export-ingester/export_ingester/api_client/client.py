@@ -21,6 +21,7 @@ T = TypeVar("T")
 
 class Routes(StrEnum):
     EXPORTS = "/api/1/exports"
+    EXPORTS_STREAM = "/api/1/exports/stream"
     ARCHIVES = "/api/1/archives"
 
 
@@ -48,13 +49,18 @@ class APIClient:
         self,
         params: ExportParams,
     ) -> AsyncGenerator[ExportModel, None]:
-        export_stream = self._stream_paginated_response(
-            Routes.EXPORTS,
-            params,
-            PaginatedResponse[ExportModel],
-        )
-        async for item in export_stream:
-            yield item
+        # Read from the NDJSON stream rather than paging through the range
+        stream_params = params.model_dump(mode="json", exclude={"limit"})
+
+        async with self.client.stream(
+            "GET",
+            Routes.EXPORTS_STREAM,
+            params=stream_params,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield ExportModel.model_validate_json(line)
 
     async def _stream_archives(
         self,
@@ -77,25 +83,22 @@ class APIClient:
         params: Params,
         paginator_cls: type[PaginatedResponse[DataT]],
     ) -> AsyncGenerator[DataT, None]:
-        default_params = params.model_dump(mode="json")
+        # Follow the cursor rather than fanning out offsets, so each page is
+        # read from where the last one ended.
+        next_params = {**params.model_dump(mode="json"), "with_count": False}
 
         get_response = partial(
             self._get_response, url, paginator_cls.model_validate_json
         )
-        initial_data = await get_response({"offset": 0, **default_params})
-        for item in initial_data.data:
-            yield item
-
-        tasks: list[asyncio.Task[PaginatedResponse[DataT]]] = []
-        for index in range(initial_data.count // params.limit):
-            next_params = {"offset": (index + 1) * params.limit, **default_params}
-            tasks.append(asyncio.create_task(get_response(next_params)))
-
-        for task in asyncio.as_completed(tasks):
-            next_data = await task
-            for item in next_data.data:
+        while True:
+            page = await get_response(next_params)
+            for item in page.data:
                 yield item
 
+            if not page.next_cursor:
+                break
+            next_params = {**next_params, "cursor": page.next_cursor}
+
     async def _get_response(
         self,
         endpoint: str,
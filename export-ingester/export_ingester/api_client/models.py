@@ -12,7 +12,8 @@ class Params(BaseModel):
 
 
 class PaginatedResponse(BaseModel, Generic[DataT]):
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
     data: list[DataT]
 
 
@@ -2,6 +2,7 @@ from typing import Annotated, Callable
 from uuid import UUID
 
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from export_ingester.api_client.models import (
     ArchiveModel,
@@ -36,14 +37,34 @@ def get_exports(filter_params: Annotated[ExportsFilterParams, Query()]) -> dict:
         lambda obj: obj.timestamp < filter_params.end,
         lambda obj: obj.timestamp > filter_params.start,
     ]
-    count, data = filter_data(EXPORT_DATA, filters, filter_params)
+    count, data, next_cursor = filter_data(EXPORT_DATA, filters, filter_params)
 
     return {
         "count": count,
+        "next_cursor": next_cursor,
         "data": data,
     }
 
 
+@app.get("/api/1/exports/stream", response_class=StreamingResponse)
+def stream_exports(filter_params: Annotated[ExportsFilterParams, Query()]):
+    filters: list[Callable[[ExportModel], bool]] = [
+        lambda obj: obj.type == filter_params.event_type,
+        lambda obj: obj.timestamp < filter_params.end,
+        lambda obj: obj.timestamp > filter_params.start,
+    ]
+    _, data, _ = filter_data(
+        EXPORT_DATA,
+        filters,
+        filter_params.model_copy(update={"limit": len(EXPORT_DATA)}),
+    )
+
+    return StreamingResponse(
+        (f"{item.model_dump_json()}\n" for item in data),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.get(
     "/api/1/archives",
     response_model=PaginatedResponse[ArchiveSummaryModel],
@@ -52,10 +73,11 @@ def get_archives(filter_params: Annotated[ArchivesFilterParams, Query()]) -> dic
     filters: list[Callable[[ArchiveModel], bool]] = [
         lambda item: item.experiment_id == filter_params.experiment_id,
     ]
-    count, data = filter_data(ARCHIVES_DATA, filters, filter_params)
+    count, data, next_cursor = filter_data(ARCHIVES_DATA, filters, filter_params)
 
     return {
         "count": count,
+        "next_cursor": next_cursor,
         "data": [{"url": get_archive_url(item), **dict(item)} for item in data],
     }
 
@@ -9,6 +9,7 @@ from export_ingester.utils import now
 class PaginationParams(BaseModel):
     limit: PositiveInt = Field(250, le=250)
     offset: int = Field(0, ge=0)
+    cursor: str | None = None
 
 
 class ArchivesFilterParams(PaginationParams):
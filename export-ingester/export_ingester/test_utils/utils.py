@@ -19,19 +19,24 @@ def filter_data(
     data: list[T],
     filters: list[Callable[[T], bool]],
     pagination_params: PaginationParams,
-) -> tuple[int, list[T]]:
+) -> tuple[int, list[T], str | None]:
     filtered_data: Iterable[T] = data
     for filter_ in filters:
         filtered_data = filter(filter_, filtered_data)
 
     filtered_data = list(filtered_data)
 
+    # The cursor is opaque to clients, so the offset is enough here
+    start = pagination_params.offset
+    if pagination_params.cursor:
+        start += int(pagination_params.cursor)
+    end = start + pagination_params.limit
+
     count = len(filtered_data)
-    data = filtered_data[
-        pagination_params.offset : pagination_params.offset + pagination_params.limit
-    ]
+    data = filtered_data[start:end]
+    next_cursor = str(end) if end < count else None
 
-    return count, data
+    return count, data, next_cursor
 
 
 def create_archive_data(count: int = 30) -> Generator[ArchiveModel, None, None]:
@@ -0,0 +1,59 @@
+"""Add daily stats
+
+Revision ID: 0f7a3c5d8e21
+Revises: e4b9d2a61c07
+Create Date: 2026-10-18 15:21:48.630517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0f7a3c5d8e21"
+down_revision: Union[str, None] = "e4b9d2a61c07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_stats",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("export_count", sa.Integer(), nullable=False),
+        sa.Column("archive_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("date"),
+    )
+
+    # Backfill from existing events; counts are maintained by the state
+    # handlers from here on.
+    op.execute(
+        """
+        INSERT INTO daily_stats (
+            date, event_count, export_count, archive_count, created_at, updated_at
+        )
+        SELECT
+            date(timezone('UTC', imaging_events.timestamp)),
+            count(DISTINCT imaging_events.id),
+            count(DISTINCT object_store_entries.id),
+            count(data_archive_members.id),
+            now(),
+            now()
+        FROM imaging_events
+        LEFT OUTER JOIN object_store_entries
+            ON object_store_entries.imaging_event_id = imaging_events.id
+        LEFT OUTER JOIN data_archive_members
+            ON data_archive_members.src_key = object_store_entries.key
+        GROUP BY 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_stats")
@@ -0,0 +1,63 @@
+"""Add checksum algorithms
+
+Revision ID: 5c2e1f0b7a93
+Revises: ba7817fc8944
+Create Date: 2026-10-18 09:12:04.512318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2e1f0b7a93"
+down_revision: Union[str, None] = "ba7817fc8944"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "archive_checksums",
+        "algorithm",
+        existing_type=sa.VARCHAR(length=6),
+        type_=sa.Enum(
+            "SHA256",
+            "SHA1",
+            "BLAKE2B",
+            "CRC32",
+            name="algorithm",
+            native_enum=False,
+        ),
+        existing_nullable=False,
+    )
+    op.create_unique_constraint(
+        op.f("archive_checksums_event_archive_id_algorithm_key"),
+        "archive_checksums",
+        ["event_archive_id", "algorithm"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        op.f("archive_checksums_event_archive_id_algorithm_key"),
+        "archive_checksums",
+        type_="unique",
+    )
+    op.alter_column(
+        "archive_checksums",
+        "algorithm",
+        existing_type=sa.Enum(
+            "SHA256",
+            "SHA1",
+            "BLAKE2B",
+            "CRC32",
+            name="algorithm",
+            native_enum=False,
+        ),
+        type_=sa.VARCHAR(length=6),
+        existing_nullable=False,
+    )
@@ -0,0 +1,58 @@
+"""Add checksum position
+
+Revision ID: 8d3b6e1f4a27
+Revises: 0f7a3c5d8e21
+Create Date: 2026-10-18 21:04:52.730114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3b6e1f4a27"
+down_revision: Union[str, None] = "0f7a3c5d8e21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "archive_checksums",
+        sa.Column(
+            "position", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    # Existing checksums keep the order they were previously read in
+    op.execute(
+        """
+        UPDATE archive_checksums
+        SET position = ordered.position
+        FROM (
+            SELECT
+                id,
+                row_number() OVER (
+                    PARTITION BY event_archive_id ORDER BY created_at, id
+                ) - 1 AS position
+            FROM archive_checksums
+        ) AS ordered
+        WHERE archive_checksums.id = ordered.id
+        """
+    )
+    op.create_unique_constraint(
+        op.f("archive_checksums_event_archive_id_position_key"),
+        "archive_checksums",
+        ["event_archive_id", "position"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        op.f("archive_checksums_event_archive_id_position_key"),
+        "archive_checksums",
+        type_="unique",
+    )
+    op.drop_column("archive_checksums", "position")
@@ -0,0 +1,68 @@
+"""Add lookup indexes
+
+Revision ID: e4b9d2a61c07
+Revises: 5c2e1f0b7a93
+Create Date: 2026-10-18 14:03:27.184025
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9d2a61c07"
+down_revision: Union[str, None] = "5c2e1f0b7a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) pairs indexed for lookups and the read model joins
+COLUMN_INDEXES = [
+    ("data_archive_entries", "path"),
+    ("data_archive_members", "data_archive_entry_id"),
+    ("data_archive_members", "src_key"),
+    ("event_archives", "imaging_event_id"),
+    ("object_store_entries", "imaging_event_id"),
+    ("object_store_entries", "uploaded_at"),
+    ("src_dir_info", "imaging_event_id"),
+]
+
+
+def upgrade() -> None:
+    # Fails if duplicate ref ids have been recorded; these need to be
+    # resolved by hand before upgrading.
+    op.create_unique_constraint(
+        op.f("imaging_events_ref_id_key"),
+        "imaging_events",
+        ["ref_id"],
+    )
+    op.create_index(
+        "ix_imaging_events_timestamp_utc_date",
+        "imaging_events",
+        [sa.text("date(timezone('UTC', \"timestamp\"))")],
+        unique=False,
+    )
+    for table, column in COLUMN_INDEXES:
+        op.create_index(
+            op.f(f"ix_{table}_{column}"),
+            table,
+            [column],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(COLUMN_INDEXES):
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
+    op.drop_index(
+        "ix_imaging_events_timestamp_utc_date",
+        table_name="imaging_events",
+    )
+    op.drop_constraint(
+        op.f("imaging_events_ref_id_key"),
+        "imaging_events",
+        type_="unique",
+    )
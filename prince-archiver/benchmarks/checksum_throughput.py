@@ -0,0 +1,82 @@
+"""
+Benchmark checksum throughput of `AsyncFileSystem` across chunk sizes.
+
+Usage:
+    poetry run python benchmarks/checksum_throughput.py --size-mib 4096 --dir /data/tmp
+
+A file of the requested size is written to `--dir` (use the same file system
+the exporter reads from) and hashed once per chunk size, with and without a
+reusable read buffer. Note that the page cache will serve repeated reads; drop
+caches between runs for cold numbers.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+
+from prince_archiver.adapters.file.checksum import ChecksumFactory
+from prince_archiver.adapters.file.file_system import AsyncFileSystem
+
+MIB = 1024 * 1024
+
+Reader = Callable[[Path, int], AsyncGenerator[bytes | memoryview, None]]
+
+DEFAULT_CHUNK_SIZES_KIB = [64, 256, 1024, 4 * 1024, 16 * 1024, 64 * 1024]
+
+
+def write_file(path: Path, size: int, block_size: int = 64 * MIB):
+    block = os.urandom(min(block_size, size))
+    with path.open("wb") as file:
+        remaining = size
+        while remaining > 0:
+            file.write(block[:remaining])
+            remaining -= len(block)
+
+
+async def run(path: Path, chunk_sizes: list[int]):
+    file_system = AsyncFileSystem()
+    size = path.stat().st_size
+
+    print(f"{'chunk size':>12} {'reader':>8} {'seconds':>9} {'MiB/s':>9}")
+    for chunk_size in chunk_sizes:
+        readers: dict[str, Reader]
+        readers = {
+            "bytes": file_system.iter_bytes,
+            "buffer": file_system.iter_buffer,
+        }
+        for name, reader in readers.items():
+            start = time.perf_counter()
+            await ChecksumFactory.get_checksum(reader(path, chunk_size))
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{chunk_size // 1024:>9} KiB {name:>8} {elapsed:>9.2f} "
+                f"{size / MIB / elapsed:>9.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mib", type=int, default=1024)
+    parser.add_argument("--dir", type=Path, default=None)
+    parser.add_argument(
+        "--chunk-sizes-kib",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CHUNK_SIZES_KIB,
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        path = Path(temp_dir, "benchmark.tar")
+        write_file(path, args.size_mib * MIB)
+
+        asyncio.run(run(path, [item * 1024 for item in args.chunk_sizes_kib]))
+
+
+if __name__ == "__main__":
+    main()
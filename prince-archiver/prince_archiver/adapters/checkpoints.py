@@ -0,0 +1,130 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from redis.asyncio import Redis
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class UploadedPart:
+    part_number: int
+    etag: str
+    size: int
+    # Base64 encoded CRC32 of the part, as reported by s3
+    checksum_crc32: str | None = None
+
+    def to_dict(self) -> dict:
+        data = {"PartNumber": self.part_number, "ETag": self.etag}
+        if self.checksum_crc32:
+            data["ChecksumCRC32"] = self.checksum_crc32
+        return data
+
+
+@dataclass
+class UploadCheckpoint:
+    """
+    Progress of a multipart upload which can be resumed by a later attempt.
+
+    Only the completed parts are recorded, so a resumed upload skips sending
+    them again but the archive is still read in full to compute its checksums.
+    """
+
+    key: str
+    upload_id: str
+    part_size: int
+    parts: dict[int, UploadedPart] = field(default_factory=dict)
+
+
+class CheckpointStore:
+    """
+    Class to persist upload checkpoints in redis.
+
+    Each checkpoint is stored as a hash so completed parts can be recorded
+    individually as they finish. Checkpoints expire after `ttl`, which should
+    outlast the retry schedule of the jobs using them.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        prefix: str = "upload-checkpoint",
+        ttl: timedelta = timedelta(days=3),
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def get(self, id: str) -> UploadCheckpoint | None:
+        raw_data: dict = await self.redis.hgetall(self._get_name(id))
+        if not raw_data:
+            return None
+
+        data = {key.decode(): value.decode() for key, value in raw_data.items()}
+        try:
+            checkpoint = UploadCheckpoint(
+                key=data.pop("key"),
+                upload_id=data.pop("upload_id"),
+                part_size=int(data.pop("part_size")),
+            )
+        except KeyError:
+            LOGGER.warning("Ignoring incomplete checkpoint %s", id)
+            return None
+
+        for value in data.values():
+            part = UploadedPart(**json.loads(value))
+            checkpoint.parts[part.part_number] = part
+
+        return checkpoint
+
+    async def start(self, id: str, checkpoint: UploadCheckpoint) -> None:
+        name = self._get_name(id)
+        mapping: dict = {
+            "key": checkpoint.key,
+            "upload_id": checkpoint.upload_id,
+            "part_size": checkpoint.part_size,
+        }
+        mapping.update(
+            {
+                self._get_field(part): self._serialize(part)
+                for part in checkpoint.parts.values()
+            }
+        )
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(name)
+            pipe.hset(name, mapping=mapping)
+            pipe.expire(name, self.ttl)
+            await pipe.execute()
+
+    async def add_part(self, id: str, part: UploadedPart) -> None:
+        name = self._get_name(id)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(name, self._get_field(part), self._serialize(part))
+            pipe.expire(name, self.ttl)
+            await pipe.execute()
+
+    async def clear(self, id: str) -> None:
+        await self.redis.delete(self._get_name(id))
+
+    def _get_name(self, id: str) -> str:
+        return f"{self.prefix}:{id}"
+
+    @staticmethod
+    def _get_field(part: UploadedPart) -> str:
+        return f"part:{part.part_number}"
+
+    @staticmethod
+    def _serialize(part: UploadedPart) -> str:
+        return json.dumps(
+            {
+                "part_number": part.part_number,
+                "etag": part.etag,
+                "size": part.size,
+                "checksum_crc32": part.checksum_crc32,
+            }
+        )
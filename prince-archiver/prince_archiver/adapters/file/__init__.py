@@ -1,11 +1,12 @@
-from .file_system import AsyncFileSystem, MetaData
-from .integrations import ArchiveFile, ArchiveInfo, SrcDir, SystemDir
+from .file_system import ArchiveInfo, ArchiveInfoBuilder, AsyncFileSystem, MetaData
+from .integrations import ArchiveFile, SrcDir, SystemDir
 from .path_manager import PathManager
 
 __all__ = (
     "AsyncFileSystem",
     "ArchiveFile",
     "ArchiveInfo",
+    "ArchiveInfoBuilder",
     "EventFile",
     "PathManager",
     "SrcDir",
@@ -1,15 +1,73 @@
-from hashlib import sha256
+import asyncio
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from hashlib import blake2b, sha1, sha256
 from typing import AsyncGenerator, Callable, Protocol
 
 from prince_archiver.domain.value_objects import Algorithm, Checksum
 
+LOGGER = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+
 
 class _HashProtocol(Protocol):
-    def update(self, data: bytes): ...
+    def update(self, data: bytes | memoryview): ...
 
     def hexdigest(self) -> str: ...
 
 
+class _CRC32:
+    """
+    CRC32 with a hashlib style interface. Matches the s3 `CRC32` checksum.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data: bytes | memoryview):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self) -> str:
+        return f"{self.value:08x}"
+
+
+class ChecksumBuilder:
+    """
+    Class for incrementally building checksums.
+
+    Several algorithms can be computed in a single pass over the data. The
+    first algorithm is treated as the primary checksum.
+    """
+
+    def __init__(self, *algorithms: Algorithm):
+        self.algorithms = algorithms or (Algorithm.SHA256,)
+        self._hashes = [
+            ChecksumFactory.HASH_MAPPING[algorithm]() for algorithm in self.algorithms
+        ]
+
+    @property
+    def algorithm(self) -> Algorithm:
+        return self.algorithms[0]
+
+    def update(self, data: bytes | memoryview):
+        for hash in self._hashes:
+            hash.update(data)
+
+    def checksum(self) -> Checksum:
+        return self.checksums()[0]
+
+    def checksums(self) -> list[Checksum]:
+        return [
+            Checksum(algorithm=algorithm, hex=hash.hexdigest())
+            for algorithm, hash in zip(self.algorithms, self._hashes)
+        ]
+
+
 class ChecksumFactory:
     """
     Class for generating checksums.
@@ -17,20 +75,97 @@ class ChecksumFactory:
 
     HASH_MAPPING: dict[Algorithm, Callable[[], _HashProtocol]] = {
         Algorithm.SHA256: sha256,
+        Algorithm.SHA1: sha1,
+        Algorithm.BLAKE2B: blake2b,
+        Algorithm.CRC32: _CRC32,
     }
 
     @classmethod
     async def get_checksum(
         cls,
-        bytes_iterator: AsyncGenerator[bytes, None],
+        bytes_iterator: AsyncGenerator[bytes | memoryview, None],
         *,
         algorithm: Algorithm = Algorithm.SHA256,
     ) -> Checksum:
-        hash = cls.HASH_MAPPING[algorithm]()
+        builder = ChecksumBuilder(algorithm)
         async for chunk in bytes_iterator:
-            hash.update(chunk)
+            builder.update(chunk)
+
+        return builder.checksum()
+
+
+@dataclass
+class HashingMetrics:
+    bytes_hashed: int = 0
+    seconds: float = 0.0
 
-        return Checksum(
-            algorithm=algorithm,
-            hex=hash.hexdigest(),
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_hashed / self.seconds if self.seconds else 0.0
+
+
+class HashingEngine:
+    """
+    Class for computing checksums in a dedicated thread pool.
+
+    hashlib releases the GIL whilst hashing large buffers, so data can be
+    hashed whilst the next chunk is read, with at most `max_concurrency`
+    updates running at once across all exports. The hash state lives in this
+    process, so a custom `executor` must be thread based.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        *,
+        max_concurrency: int = 2,
+    ):
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="hashing",
         )
+        self.metrics = HashingMetrics()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        builder: ChecksumBuilder,
+        data: bytes | memoryview,
+    ) -> Future[None]:
+        """
+        Update `builder` with `data` in the executor.
+
+        Callers must wait for the update to finish before submitting the next
+        chunk, so the data is hashed in order.
+        """
+        return self.executor.submit(self._update, builder, data)
+
+    async def get_checksum(
+        self,
+        bytes_iterator: AsyncGenerator[bytes | memoryview, None],
+        *,
+        algorithm: Algorithm = Algorithm.SHA256,
+    ) -> Checksum:
+        builder = ChecksumBuilder(algorithm)
+        async for chunk in bytes_iterator:
+            await asyncio.wrap_future(self.submit(builder, chunk))
+
+        return builder.checksum()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        LOGGER.info(
+            "Hashed %.1f MiB at %.1f MiB/s",
+            self.metrics.bytes_hashed / MIB,
+            self.metrics.bytes_per_second / MIB,
+        )
+
+    def _update(self, builder: ChecksumBuilder, data: bytes | memoryview):
+        start = time.perf_counter()
+        builder.update(data)
+        seconds = time.perf_counter() - start
+
+        with self._lock:
+            self.metrics.bytes_hashed += len(data)
+            self.metrics.seconds += seconds
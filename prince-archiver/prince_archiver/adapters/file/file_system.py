@@ -3,27 +3,45 @@ import io
 import logging
 import shutil
 import tarfile
-from concurrent.futures import Executor
+import threading
+from concurrent.futures import Executor, Future
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import AsyncGenerator, Awaitable, Callable, TypeVar
+from typing import (
+    AsyncGenerator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Protocol,
+    Sequence,
+    TypeVar,
+)
 from uuid import uuid4
 
 import aiofiles.os
 import aiofiles.ospath
 from aiofiles.tempfile import TemporaryDirectory
 
+from prince_archiver.definitions import Algorithm
 from prince_archiver.domain.value_objects import Checksum
 
-from .checksum import ChecksumFactory
+from .checksum import ChecksumBuilder, ChecksumFactory, HashingEngine
 
 LOGGER = logging.getLogger(__name__)
 
 T = TypeVar("T")
 MapperT = Callable[[bytes], T]
 
-ChecksumFactoryT = Callable[[AsyncGenerator[bytes, None]], Awaitable[Checksum]]
+ChecksumFactoryT = Callable[
+    [AsyncGenerator[bytes | memoryview, None]],
+    Awaitable[Checksum],
+]
+
+TAR_COPY_BUFSIZE = 1024 * 1024
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
 
 
 @dataclass
@@ -32,20 +50,175 @@ class MetaData:
     name: str = "./metadata.json"
 
 
+@dataclass
+class ArchiveInfo:
+    checksum: Checksum
+    size: int
+    additional_checksums: list[Checksum] = field(default_factory=list)
+
+
+class ArchiveInfoBuilder:
+    """
+    Class for computing the checksums and size of an archive as it is written.
+
+    With a `hashing_engine`, each chunk is hashed in the engine whilst the
+    next one is written.
+    """
+
+    def __init__(
+        self,
+        *algorithms: Algorithm,
+        hashing_engine: HashingEngine | None = None,
+    ):
+        self.checksum_builder = ChecksumBuilder(*algorithms)
+        self.hashing_engine = hashing_engine
+        self.size = 0
+
+        self._pending: Future[None] | None = None
+
+    def update(self, data: bytes):
+        if self.hashing_engine:
+            self.wait()
+            self._pending = self.hashing_engine.submit(self.checksum_builder, data)
+        else:
+            self.checksum_builder.update(data)
+        self.size += len(data)
+
+    def wait(self):
+        """
+        Block until the chunks written so far have been hashed.
+        """
+        if self._pending:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def info(self) -> ArchiveInfo:
+        self.wait()
+        checksum, *additional_checksums = self.checksum_builder.checksums()
+        return ArchiveInfo(
+            checksum=checksum,
+            size=self.size,
+            additional_checksums=additional_checksums,
+        )
+
+
+class StreamAborted(OSError):
+    pass
+
+
+class _WriterProtocol(Protocol):
+    def write(self, data: bytes) -> int: ...
+
+    def tell(self) -> int: ...
+
+
+class _TrackingWriter:
+    """
+    Write only file object which feeds all written bytes to an
+    `ArchiveInfoBuilder` before passing them on to the wrapped file object.
+    """
+
+    def __init__(
+        self, fileobj: _WriterProtocol | BinaryIO, builder: ArchiveInfoBuilder
+    ):
+        self.fileobj = fileobj
+        self.builder = builder
+
+    def write(self, data: bytes) -> int:
+        self.builder.update(data)
+        return self.fileobj.write(data)
+
+    def tell(self) -> int:
+        return self.fileobj.tell()
+
+
+class _QueueWriter:
+    """
+    Write only file object which hands fixed size chunks to an asyncio queue.
+
+    Used to bridge a blocking tar writer running in an executor with an async
+    consumer. As the queue is bounded the writer blocks when the consumer falls
+    behind, bounding the number of chunks held in memory.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue[bytes | None],
+        chunk_size: int,
+    ):
+        self.loop = loop
+        self.queue = queue
+        self.chunk_size = chunk_size
+
+        self._buffer = bytearray()
+        self._position = 0
+        self._aborted = threading.Event()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+
+        while len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer[: self.chunk_size]))
+            del self._buffer[: self.chunk_size]
+
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def finish(self) -> None:
+        if not self._aborted.is_set():
+            self._put(None)
+
+    def abort(self) -> None:
+        self._aborted.set()
+
+    def _put(self, item: bytes | None) -> None:
+        if self._aborted.is_set():
+            raise StreamAborted("Consumer stopped reading the stream")
+
+        future = asyncio.run_coroutine_threadsafe(self.queue.put(item), self.loop)
+        future.result()
+
+
 class AsyncFileSystem:
     def __init__(
         self,
         executor: Executor | None = None,
         checksum_factory: ChecksumFactoryT | None = None,
+        algorithms: Sequence[Algorithm] = (Algorithm.SHA256,),
+        hashing_engine: HashingEngine | None = None,
     ):
         self.executor = executor
-        self.checksum_factory: ChecksumFactoryT = (
-            checksum_factory or ChecksumFactory.get_checksum
+        self.algorithms = tuple(algorithms)
+        self.hashing_engine = hashing_engine
+        self.checksum_factory: ChecksumFactoryT = checksum_factory or partial(
+            hashing_engine.get_checksum
+            if hashing_engine
+            else ChecksumFactory.get_checksum,
+            algorithm=self.algorithms[0],
+        )
+
+    def get_info_builder(self) -> ArchiveInfoBuilder:
+        return ArchiveInfoBuilder(
+            *self.algorithms,
+            hashing_engine=self.hashing_engine,
         )
 
-    async def get_checksum(self, path: Path, chunk_size: int) -> Checksum:
+    async def get_checksum(
+        self,
+        path: Path,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Checksum:
         return await self.checksum_factory(
-            self.iter_bytes(path, chunk_size),
+            self.iter_buffer(path, chunk_size),
         )
 
     async def copy_tree(self, src: Path, target: Path):
@@ -62,10 +235,44 @@ class AsyncFileSystem:
     async def exists(self, path: Path) -> bool:
         return await aiofiles.ospath.exists(path, executor=self.executor)
 
-    async def iter_bytes(self, path: Path, chunk_size: int | None):
+    async def iter_bytes(
+        self,
+        path: Path,
+        chunk_size: int | None = DEFAULT_CHUNK_SIZE,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Iterate over the contents of a file in `chunk_size` chunks.
+
+        If `chunk_size` is None the whole file is yielded as a single chunk.
+        """
         async with aiofiles.open(path, "rb", executor=self.executor) as file:
-            chunk_size = chunk_size if isinstance(chunk_size, int) else -1
-            yield await file.read(chunk_size)
+            if chunk_size is None:
+                yield await file.read()
+                return
+
+            while chunk := await file.read(chunk_size):
+                yield chunk
+
+    async def iter_buffer(
+        self,
+        path: Path,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        buffer: bytearray | None = None,
+    ) -> AsyncGenerator[memoryview, None]:
+        """
+        Iterate over the contents of a file by reading into a reusable buffer.
+
+        Avoids allocating a new bytes object per chunk. The yielded view is
+        only valid until the next iteration, so consumers must not hold on to
+        it. If `buffer` is given its size takes precedence over `chunk_size`.
+        """
+        buffer = buffer if buffer is not None else bytearray(chunk_size)
+        view = memoryview(buffer)
+
+        async with aiofiles.open(path, "rb", executor=self.executor) as file:
+            while n_bytes := await file.readinto(buffer):
+                yield view[:n_bytes]
 
     async def list_dir(self, path: Path) -> list[Path]:
         entries = await aiofiles.os.listdir(path, executor=self.executor)
@@ -76,21 +283,64 @@ class AsyncFileSystem:
         return stat.st_size
 
     async def read_bytes(self, path: Path) -> bytes:
-        return await anext(self.iter_bytes(path, chunk_size=None))
+        async with aiofiles.open(path, "rb", executor=self.executor) as file:
+            return await file.read()
+
+    async def iter_tar(
+        self,
+        src: Path,
+        metadata: MetaData | None = None,
+        *,
+        chunk_size: int,
+        max_chunks: int = 2,
+        info_builder: ArchiveInfoBuilder | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Generate a tar archive of `src` on the fly, yielding `chunk_size` chunks.
+
+        At most `max_chunks` chunks are buffered ahead of the consumer. Only
+        the final chunk may be smaller than `chunk_size`. If an `info_builder`
+        is given it is updated with the archive bytes as they are produced.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_chunks)
+        writer = _QueueWriter(loop, queue, chunk_size)
+
+        producer = loop.run_in_executor(
+            self.executor,
+            self._stream_tar,
+            src,
+            writer,
+            metadata,
+            info_builder,
+        )
+
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            await producer
+        finally:
+            if not producer.done():
+                # Unblock the producer so the executor thread can exit
+                writer.abort()
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.gather(producer, return_exceptions=True)
 
     async def tar_tree(
         self,
         src_dir: Path,
         target_path: Path,
         metadata: MetaData | None = None,
-    ):
+    ) -> ArchiveInfo:
         loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
+        return await loop.run_in_executor(
             self.executor,
             self._tar,
             src_dir,
             target_path,
             metadata,
+            self.get_info_builder(),
         )
 
     @staticmethod
@@ -98,26 +348,73 @@ class AsyncFileSystem:
         src: Path,
         target: Path,
         metadata: MetaData | None = None,
-    ):
+        info_builder: ArchiveInfoBuilder | None = None,
+    ) -> ArchiveInfo:
         LOGGER.debug("Tarring %s", src)
 
+        info_builder = info_builder or ArchiveInfoBuilder()
+
         target.parent.mkdir(parents=True, exist_ok=True)
-        with tarfile.open(target, "a") as tar:
-            if src.is_dir():
-                tar.add(src, arcname=".")
-            else:
-                tar.add(src, arcname=src.name)
+        with (
+            open(target, "wb") as file,
+            tarfile.TarFile(
+                fileobj=_TrackingWriter(file, info_builder),  # type: ignore[arg-type]
+                mode="w",
+                copybufsize=TAR_COPY_BUFSIZE,
+            ) as tar,
+        ):
+            AsyncFileSystem._add_to_tar(tar, src, metadata)
 
-            if metadata:
-                tar_info = tarfile.TarInfo(metadata.name)
-                tar_info.size = len(metadata.content)
+        LOGGER.debug("Tarred %s", src)
 
-                tar.addfile(
-                    tar_info,
-                    io.BytesIO(metadata.content),
-                )
+        return info_builder.info()
 
-        LOGGER.debug("Tarred %s", src)
+    @staticmethod
+    def _stream_tar(
+        src: Path,
+        writer: _QueueWriter,
+        metadata: MetaData | None = None,
+        info_builder: ArchiveInfoBuilder | None = None,
+    ):
+        LOGGER.debug("Streaming tar of %s", src)
+
+        fileobj = _TrackingWriter(writer, info_builder) if info_builder else writer
+
+        try:
+            with tarfile.TarFile(
+                fileobj=fileobj,  # type: ignore[arg-type]
+                mode="w",
+                copybufsize=writer.chunk_size,
+            ) as tar:
+                AsyncFileSystem._add_to_tar(tar, src, metadata)
+            writer.drain()
+
+            if info_builder:
+                info_builder.wait()
+        finally:
+            writer.finish()
+
+        LOGGER.debug("Streamed tar of %s", src)
+
+    @staticmethod
+    def _add_to_tar(
+        tar: tarfile.TarFile,
+        src: Path,
+        metadata: MetaData | None = None,
+    ):
+        if src.is_dir():
+            tar.add(src, arcname=".")
+        else:
+            tar.add(src, arcname=src.name)
+
+        if metadata:
+            tar_info = tarfile.TarInfo(metadata.name)
+            tar_info.size = len(metadata.content)
+
+            tar.addfile(
+                tar_info,
+                io.BytesIO(metadata.content),
+            )
 
     @asynccontextmanager
     async def get_temp_archive(
@@ -125,10 +422,10 @@ class AsyncFileSystem:
         src_path: Path,
         *,
         metadata: MetaData | None = None,
-    ) -> AsyncGenerator[Path, None]:
+    ) -> AsyncGenerator[tuple[Path, ArchiveInfo], None]:
         async with TemporaryDirectory() as temp_dir:
             temp_archive_path = Path(temp_dir, f"{uuid4().hex[:6]}.tar")
 
-            await self.tar_tree(src_path, temp_archive_path, metadata)
+            info = await self.tar_tree(src_path, temp_archive_path, metadata)
 
-            yield Path(temp_archive_path)
+            yield Path(temp_archive_path), info
@@ -1,13 +1,18 @@
 import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
 from pathlib import Path
 
 from prince_archiver.definitions import System
 from prince_archiver.domain.value_objects import Checksum
 
-from .file_system import AsyncFileSystem, MetaData
+from .file_system import (
+    DEFAULT_CHUNK_SIZE,
+    ArchiveInfo,
+    ArchiveInfoBuilder,
+    AsyncFileSystem,
+    MetaData,
+)
 
 
 class SystemDir:
@@ -69,26 +74,42 @@ class SrcDir:
         metadata: MetaData | None = None,
     ) -> AsyncGenerator["ArchiveFile", None]:
         temp_archive = self.file_system.get_temp_archive(self.path, metadata=metadata)
-        async with temp_archive as path:
-            yield ArchiveFile(path, self.file_system)
+        async with temp_archive as (path, info):
+            yield ArchiveFile(path, self.file_system, info=info)
 
+    def get_info_builder(self) -> ArchiveInfoBuilder:
+        return self.file_system.get_info_builder()
 
-@dataclass
-class ArchiveInfo:
-    checksum: Checksum
-    size: int
+    def iter_archive(
+        self,
+        *,
+        chunk_size: int,
+        max_chunks: int = 2,
+        metadata: MetaData | None = None,
+        info_builder: ArchiveInfoBuilder | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        return self.file_system.iter_tar(
+            self.path,
+            metadata,
+            chunk_size=chunk_size,
+            max_chunks=max_chunks,
+            info_builder=info_builder,
+        )
 
 
 class ArchiveFile:
-    DEFAULT_CHUNK_SIZE = 10 * 1024
+    DEFAULT_CHUNK_SIZE = DEFAULT_CHUNK_SIZE
 
     def __init__(
         self,
         path: Path,
         file_system: AsyncFileSystem,
+        *,
+        info: ArchiveInfo | None = None,
     ):
         self.path = path
         self.file_system = file_system
+        self.info = info
 
     async def get_checksum(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Checksum:
         return await self.file_system.get_checksum(self.path, chunk_size)
@@ -97,6 +118,10 @@ class ArchiveFile:
         return await self.file_system.get_size(self.path)
 
     async def get_info(self) -> ArchiveInfo:
+        # Computed whilst writing the archive, so no need to re-read it
+        if self.info:
+            return self.info
+
         async with asyncio.TaskGroup() as tg:
             t1 = tg.create_task(self.get_checksum())
             t2 = tg.create_task(self.get_size())
@@ -1,23 +1,41 @@
 from abc import ABC, abstractmethod
-from datetime import date
-from uuid import UUID
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import Select
 
-from prince_archiver.domain.models import DataArchiveEntry, ImagingEvent
+from prince_archiver.domain.models import (
+    DataArchiveEntry,
+    EventArchive,
+    ImagingEvent,
+    ObjectStoreEntry,
+)
 from prince_archiver.models import write as data_models
+from prince_archiver.utils import now
 
 
 class AbstractDataArchiveEntryRepo(ABC):
     @abstractmethod
     def add(self, data_archive_entry: DataArchiveEntry) -> None: ...
 
+    @abstractmethod
+    async def add_many(
+        self, data_archive_entries: Iterable[DataArchiveEntry]
+    ) -> None: ...
+
     @abstractmethod
     async def get_by_path(self, path: str) -> DataArchiveEntry | None: ...
 
+    @abstractmethod
+    async def get_existing_paths(self, paths: Iterable[str]) -> set[str]: ...
+
 
 class DataArchiveEntryRepo(AbstractDataArchiveEntryRepo):
     def __init__(self, session: AsyncSession):
@@ -26,20 +44,82 @@ class DataArchiveEntryRepo(AbstractDataArchiveEntryRepo):
     def add(self, data_archive_entry: DataArchiveEntry) -> None:
         self.session.add(data_archive_entry)
 
+    async def add_many(self, data_archive_entries: Iterable[DataArchiveEntry]) -> None:
+        entries: list[dict] = []
+        members: list[dict] = []
+        for entry in data_archive_entries:
+            entries.append({"id": entry.id, "path": entry.path, "job_id": entry.job_id})
+            members.extend(
+                {
+                    "member_key": member.member_key,
+                    "src_key": member.src_key,
+                    "data_archive_entry_id": entry.id,
+                }
+                for member in entry.members
+            )
+
+        # Executed as multi-row inserts, parents before children
+        for model, rows in (
+            (data_models.DataArchiveEntry, entries),
+            (data_models.DataArchiveMember, members),
+        ):
+            if rows:
+                await self.session.execute(insert(model), rows)
+
     async def get_by_path(self, path: str) -> DataArchiveEntry | None:
         return await self.session.scalar(
             self._base_query().where(data_models.DataArchiveEntry.path == path)
         )
 
+    async def get_existing_paths(self, paths: Iterable[str]) -> set[str]:
+        paths = set(paths)
+        if not paths:
+            return set()
+
+        result = await self.session.scalars(
+            select(data_models.DataArchiveEntry.path).where(
+                data_models.DataArchiveEntry.path.in_(paths),
+            ),
+        )
+        return set(result.all())
+
     @staticmethod
     def _base_query() -> Select[tuple[DataArchiveEntry]]:
         return select(DataArchiveEntry).options(selectinload("*"))
 
 
+@dataclass
+class ImagingEventRef:
+    id: UUID
+    timestamp: datetime
+    is_exported: bool
+
+
+@dataclass
+class ImagingEventExport:
+    imaging_event_id: UUID
+    event_archive: EventArchive
+    object_store_entry: ObjectStoreEntry
+
+
 class AbstractImagingEventRepo(ABC):
     @abstractmethod
     def add(self, image_event: ImagingEvent) -> None: ...
 
+    @abstractmethod
+    async def add_many(self, image_events: Iterable[ImagingEvent]) -> set[UUID]: ...
+
+    @abstractmethod
+    async def get_existing_ref_ids(self, ref_ids: Iterable[UUID]) -> set[UUID]: ...
+
+    @abstractmethod
+    async def get_refs(
+        self, ref_ids: Iterable[UUID]
+    ) -> dict[UUID, ImagingEventRef]: ...
+
+    @abstractmethod
+    async def add_exports(self, exports: Iterable[ImagingEventExport]) -> None: ...
+
     @abstractmethod
     async def get_by_ref_id(self, event_id: UUID) -> ImagingEvent | None: ...
 
@@ -54,6 +134,139 @@ class ImagingEventRepo(AbstractImagingEventRepo):
     def add(self, image_event: ImagingEvent) -> None:
         self.session.add(image_event)
 
+    async def add_many(self, image_events: Iterable[ImagingEvent]) -> set[UUID]:
+        """
+        Insert imaging events, skipping those whose ref id already exists.
+
+        Returns the ref ids of the events inserted.
+        """
+        # Sorted so concurrent inserts lock ref ids in the same order
+        mapping: dict[UUID, ImagingEvent] = {}
+        for item in sorted(image_events, key=lambda item: item.ref_id):
+            mapping.setdefault(item.ref_id, item)
+
+        if not mapping:
+            return set()
+
+        model = data_models.ImagingEvent
+        result = await self.session.scalars(
+            pg_insert(model)
+            .values(
+                [
+                    {
+                        "id": item.id,
+                        "ref_id": item.ref_id,
+                        "type": item.type,
+                        "system": item.system,
+                        "experiment_id": item.experiment_id,
+                        "timestamp": item.timestamp,
+                        "raw_metadata": item.raw_metadata,
+                    }
+                    for item in mapping.values()
+                ],
+            )
+            .on_conflict_do_nothing(index_elements=[model.ref_id])
+            .returning(model.ref_id),
+        )
+        inserted_ref_ids = set(result.all())
+
+        src_dir_infos = [
+            {
+                "local_path": item.src_dir_info.local_path,
+                "img_count": item.src_dir_info.img_count,
+                "imaging_event_id": item.id,
+            }
+            for ref_id, item in mapping.items()
+            if ref_id in inserted_ref_ids
+        ]
+        if src_dir_infos:
+            await self.session.execute(insert(data_models.SrcDirInfo), src_dir_infos)
+
+        return inserted_ref_ids
+
+    async def get_existing_ref_ids(self, ref_ids: Iterable[UUID]) -> set[UUID]:
+        ref_ids = set(ref_ids)
+        if not ref_ids:
+            return set()
+
+        result = await self.session.scalars(
+            select(data_models.ImagingEvent.ref_id).where(
+                data_models.ImagingEvent.ref_id.in_(ref_ids),
+            ),
+        )
+        return set(result.all())
+
+    async def get_refs(self, ref_ids: Iterable[UUID]) -> dict[UUID, ImagingEventRef]:
+        ref_ids = set(ref_ids)
+        if not ref_ids:
+            return {}
+
+        imaging_event = data_models.ImagingEvent
+        event_archive = data_models.EventArchive
+        object_store_entry = data_models.ObjectStoreEntry
+
+        result = await self.session.execute(
+            select(
+                imaging_event.ref_id,
+                imaging_event.id,
+                imaging_event.timestamp,
+                (event_archive.id.is_not(None) | object_store_entry.id.is_not(None)),
+            )
+            .outerjoin(
+                event_archive,
+                event_archive.imaging_event_id == imaging_event.id,
+            )
+            .outerjoin(
+                object_store_entry,
+                object_store_entry.imaging_event_id == imaging_event.id,
+            )
+            .where(imaging_event.ref_id.in_(ref_ids)),
+        )
+        return {
+            ref_id: ImagingEventRef(id=id, timestamp=timestamp, is_exported=is_exported)
+            for ref_id, id, timestamp, is_exported in result.all()
+        }
+
+    async def add_exports(self, exports: Iterable[ImagingEventExport]) -> None:
+        event_archives: list[dict] = []
+        checksums: list[dict] = []
+        object_store_entries: list[dict] = []
+
+        for export in exports:
+            event_archive_id = uuid4()
+            event_archives.append(
+                {
+                    "id": event_archive_id,
+                    "size": export.event_archive.size,
+                    "imaging_event_id": export.imaging_event_id,
+                },
+            )
+            checksums.extend(
+                {
+                    "hex": checksum.hex,
+                    "algorithm": checksum.algorithm,
+                    "position": position,
+                    "event_archive_id": event_archive_id,
+                }
+                for position, checksum in enumerate(export.event_archive.checksums)
+            )
+            object_store_entries.append(
+                {
+                    "key": export.object_store_entry.key,
+                    "uploaded_at": export.object_store_entry.uploaded_at,
+                    "imaging_event_id": export.imaging_event_id,
+                },
+            )
+
+        # Executed as multi-row inserts, parents before children
+        for model, rows in (
+            (data_models.EventArchive, event_archives),
+            (data_models.ArchiveChecksum, checksums),
+            (data_models.ObjectStoreEntry, object_store_entries),
+        ):
+            if rows:
+                await self.session.execute(insert(model), rows)
+
     async def get_by_ref_id(self, event_id: UUID) -> ImagingEvent | None:
         return await self.session.scalar(
             self._base_query().where(
@@ -64,7 +277,7 @@ class ImagingEventRepo(AbstractImagingEventRepo):
     async def get_by_ref_date(self, date_: date) -> list[ImagingEvent]:
         result = await self.session.scalars(
             self._base_query().where(
-                func.date(data_models.ImagingEvent.timestamp) == date_,
+                data_models.utc_date(data_models.ImagingEvent.timestamp) == date_,
             ),
         )
         return list(result.all())
@@ -72,3 +285,81 @@ class ImagingEventRepo(AbstractImagingEventRepo):
     @staticmethod
     def _base_query() -> Select[tuple[ImagingEvent]]:
         return select(ImagingEvent).options(selectinload("*"))
+
+
+class AbstractDailyStatsRepo(ABC):
+    @abstractmethod
+    async def record_events(self, timestamps: Iterable[datetime]) -> None: ...
+
+    @abstractmethod
+    async def record_exports(self, timestamps: Iterable[datetime]) -> None: ...
+
+    @abstractmethod
+    async def record_archived(self, src_keys: Iterable[str]) -> None: ...
+
+
+class DailyStatsRepo(AbstractDailyStatsRepo):
+    """
+    Repo to maintain the daily stats counts as events are added.
+
+    Counts are incremented in place, so concurrent transactions touching the
+    same date don't overwrite each other.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record_events(self, timestamps: Iterable[datetime]) -> None:
+        await self._increment(
+            "event_count",
+            Counter(self._get_date(item) for item in timestamps),
+        )
+
+    async def record_exports(self, timestamps: Iterable[datetime]) -> None:
+        await self._increment(
+            "export_count",
+            Counter(self._get_date(item) for item in timestamps),
+        )
+
+    async def record_archived(self, src_keys: Iterable[str]) -> None:
+        key_counts = Counter(src_keys)
+        if not key_counts:
+            return
+
+        result = await self.session.execute(
+            select(
+                data_models.ObjectStoreEntry.key,
+                data_models.utc_date(data_models.ImagingEvent.timestamp),
+            )
+            .join_from(data_models.ObjectStoreEntry, data_models.ImagingEvent)
+            .where(data_models.ObjectStoreEntry.key.in_(key_counts)),
+        )
+
+        date_counts: Counter[date] = Counter()
+        for key, date_ in result.all():
+            date_counts[date_] += key_counts[key]
+
+        await self._increment("archive_count", date_counts)
+
+    async def _increment(self, field: str, counts: Counter[date]) -> None:
+        if not counts:
+            return
+
+        model = data_models.DailyStatsEntry
+
+        # Sorted so concurrent upserts lock rows in the same order
+        stmt = pg_insert(model).values(
+            [{"date": date_, field: counts[date_]} for date_ in sorted(counts)],
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.date],
+            set_={
+                field: getattr(model, field) + stmt.excluded[field],
+                "updated_at": now(),
+            },
+        )
+        await self.session.execute(stmt)
+
+    @staticmethod
+    def _get_date(timestamp: datetime) -> date:
+        return timestamp.astimezone(UTC).date()
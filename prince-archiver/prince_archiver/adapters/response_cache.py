@@ -0,0 +1,137 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from redis.asyncio import Redis
+
+ARCHIVES_TAG = "archives"
+
+
+def get_exports_tag(date_: date) -> str:
+    """
+    Tag of exports uploaded on a given UTC date.
+    """
+    return f"exports:{date_.isoformat()}"
+
+
+class AbstractResponseCache(ABC):
+    """
+    Cache of serialized responses.
+
+    Entries are stored under a key derived from the current version of each
+    of their tags. Invalidating a tag bumps its version, so entries stored
+    beforehand are never read again and age out.
+    """
+
+    async def get_key(self, key: str, tags: Iterable[str]) -> str:
+        tags = sorted(tags)
+        versions = await self.get_versions(tags)
+
+        digest = hashlib.blake2b(digest_size=8)
+        for tag, version in zip(tags, versions):
+            digest.update(f"{tag}={version};".encode())
+
+        return f"{key}:{digest.hexdigest()}"
+
+    @abstractmethod
+    async def get_versions(self, tags: list[str]) -> list[int]: ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> None: ...
+
+
+class LocalResponseCache(AbstractResponseCache):
+    """
+    In-process LRU cache.
+
+    Invalidations are only seen by the process making them.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: timedelta = timedelta(minutes=15),
+        maxsize: int = 1000,
+    ):
+        self.ttl = ttl.total_seconds()
+        self.maxsize = maxsize
+
+        self._versions: defaultdict[str, int] = defaultdict(int)
+        self._cache: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get_versions(self, tags: list[str]) -> list[int]:
+        return [self._versions[tag] for tag in tags]
+
+    async def get(self, key: str) -> bytes | None:
+        if cached := self._cache.get(key):
+            expires_at, value = cached
+            if time.monotonic() < expires_at:
+                self._cache.move_to_end(key)
+                return value
+            del self._cache[key]
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._versions[tag] += 1
+
+
+class RedisResponseCache(AbstractResponseCache):
+    """
+    Cache shared between processes through redis.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        prefix: str = "response-cache",
+        ttl: timedelta = timedelta(minutes=15),
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def get_versions(self, tags: list[str]) -> list[int]:
+        if not tags:
+            return []
+        versions = await self.redis.mget([self._get_tag_name(tag) for tag in tags])
+        return [int(version or 0) for version in versions]
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.redis.get(self._get_name(key))
+        return value.encode() if isinstance(value, str) else value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.redis.set(self._get_name(key), value, ex=self.ttl)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        if not tags:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(self._get_tag_name(tag))
+            await pipe.execute()
+
+    def _get_name(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _get_tag_name(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
@@ -1,9 +1,28 @@
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+import asyncio
+import base64
+import logging
+import math
+import zlib
+from collections.abc import AsyncGenerator, Iterable
+from contextlib import aclosing, asynccontextmanager
+from hashlib import md5
+from pathlib import Path
 from typing import Protocol
 
 from s3fs import S3FileSystem
 
+from prince_archiver.adapters.checkpoints import (
+    CheckpointStore,
+    UploadCheckpoint,
+    UploadedPart,
+)
+from prince_archiver.definitions import Algorithm
+from prince_archiver.domain.value_objects import Checksum
+
+LOGGER = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+
 
 class AWSSettings(Protocol):
     AWS_ACCESS_KEY_ID: str
@@ -19,6 +38,14 @@ config = {
 }
 
 
+# Fields in which s3 reports additional checksums of an object
+CHECKSUM_FIELDS: dict[Algorithm, str] = {
+    Algorithm.CRC32: "ChecksumCRC32",
+    Algorithm.SHA1: "ChecksumSHA1",
+    Algorithm.SHA256: "ChecksumSHA256",
+}
+
+
 def file_system_factory(settings: AWSSettings) -> S3FileSystem:
     client_kwargs = {}
     if settings.AWS_REGION_NAME:
@@ -44,3 +71,400 @@ async def managed_file_system(
     yield file_system
 
     await session.close()
+
+
+class ChecksumMismatchError(OSError):
+    pass
+
+
+def to_s3_checksum(checksum: Checksum) -> str:
+    """
+    Encode a checksum in the format reported by s3 (base64 of the digest).
+    """
+    return base64.b64encode(bytes.fromhex(checksum.hex)).decode()
+
+
+async def verify_checksums(
+    s3: S3FileSystem,
+    key: str,
+    checksums: Iterable[Checksum],
+) -> bool | None:
+    """
+    Compare checksums against those stored by s3 without downloading the object.
+
+    Returns None if s3 holds no comparable full object checksum, e.g. when the
+    object was uploaded without additional checksums or as a multipart upload
+    with composite checksums. Uploads made by `MultipartUploader` have a full
+    object CRC32.
+    """
+    bucket, path, _ = s3.split_path(key)
+    response = await s3._call_s3(
+        "head_object",
+        Bucket=bucket,
+        Key=path,
+        ChecksumMode="ENABLED",
+    )
+
+    results = [
+        response[field] == to_s3_checksum(checksum)
+        for checksum in checksums
+        if (field := CHECKSUM_FIELDS.get(checksum.algorithm))
+        # Composite checksums of multipart uploads are suffixed with `-<parts>`
+        and "-" not in response.get(field, "-")
+    ]
+    return all(results) if results else None
+
+
+def _read_part(path: Path, offset: int, size: int) -> bytes:
+    with path.open("rb") as file:
+        file.seek(offset)
+        return file.read(size)
+
+
+def _get_etag(body: bytes) -> str:
+    # Matches the ETag s3 assigns to parts uploaded without SSE-KMS
+    return f'"{md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+def _get_crc32(body: bytes) -> str:
+    return base64.b64encode(zlib.crc32(body).to_bytes(4, "big")).decode()
+
+
+class MultipartUploader:
+    """
+    Class to upload files and streams to s3 as multipart uploads.
+
+    Timeouts scale with the size of the payload, allowing `timeout` seconds of
+    overhead plus the time needed to transfer at `min_throughput` bytes/s.
+
+    When a `checkpoint_store` is configured, uploads given a `checkpoint_id`
+    record their progress as parts complete so a later attempt with the same
+    id continues the same upload rather than starting over.
+
+    Parts are uploaded with their CRC32, so s3 stores a full object CRC32 of
+    each upload which can be checked with `verify_checksums`.
+    """
+
+    def __init__(
+        self,
+        s3: S3FileSystem,
+        *,
+        part_size: int = 16 * MIB,
+        part_concurrency: int = 4,
+        timeout: int = 120,
+        min_throughput: int = MIB,
+        resumable: bool = True,
+        checkpoint_store: CheckpointStore | None = None,
+    ):
+        self.s3 = s3
+        self.part_size = part_size
+        self.part_concurrency = part_concurrency
+        self.timeout = timeout
+        self.min_throughput = min_throughput
+        self.resumable = resumable
+        self.checkpoint_store = checkpoint_store
+
+    def get_timeout(self, size: int) -> float:
+        return self.timeout + size / self.min_throughput
+
+    async def upload(
+        self,
+        key: str,
+        parts: AsyncGenerator[bytes, None],
+        *,
+        checkpoint_id: str | None = None,
+    ) -> None:
+        """
+        Upload a stream of parts.
+
+        Each chunk produced by the stream is uploaded as a single part, so all
+        chunks except the last must satisfy the s3 minimum part size (5 MiB).
+        With a checkpoint the upload is kept on failure, and parts matching
+        those already uploaded are skipped when the stream is replayed. The
+        stream is closed once the upload finishes, including on failure.
+        """
+        bucket, path, _ = self.s3.split_path(key)
+        checkpoint_id = checkpoint_id if self.checkpoint_store else None
+
+        upload_id, existing_parts = await self._get_or_create_upload(
+            bucket,
+            path,
+            checkpoint_id=checkpoint_id,
+        )
+        kwargs = {"Bucket": bucket, "Key": path, "UploadId": upload_id}
+
+        try:
+            completed_parts: list[dict] = []
+            part_number = 1
+            async with aclosing(parts):
+                async for body in parts:
+                    existing_part = existing_parts.get(part_number)
+                    part = await self._reuse_part(existing_part, body)
+                    if not part:
+                        part = await self._upload_part(
+                            part_number,
+                            body,
+                            checkpoint_id=checkpoint_id,
+                            **kwargs,
+                        )
+                    completed_parts.append(part.to_dict())
+                    part_number += 1
+
+            await self.s3._call_s3(
+                "complete_multipart_upload",
+                MultipartUpload={"Parts": completed_parts},
+                ChecksumType="FULL_OBJECT",
+                **kwargs,
+            )
+        except Exception:
+            if not checkpoint_id:
+                LOGGER.warning("Aborting multipart upload of %s", key)
+                await self.s3._call_s3("abort_multipart_upload", **kwargs)
+            raise
+
+        await self._clear_checkpoint(checkpoint_id)
+
+    async def upload_file(
+        self,
+        src: Path,
+        key: str,
+        *,
+        checkpoint_id: str | None = None,
+    ) -> None:
+        """
+        Upload a file, uploading up to `part_concurrency` parts in parallel.
+
+        If resumable, an unfinished upload to the same key is resumed, with
+        parts whose ETag matches the local content being reused. Unfinished
+        uploads are left in place on failure so a retry can pick them up.
+        """
+        bucket, path, _ = self.s3.split_path(key)
+        checkpoint_id = checkpoint_id if self.checkpoint_store else None
+        loop = asyncio.get_running_loop()
+
+        size = src.stat().st_size
+        n_parts = max(1, math.ceil(size / self.part_size))
+
+        upload_id, existing_parts = await self._get_or_create_upload(
+            bucket,
+            path,
+            checkpoint_id=checkpoint_id,
+            discover=self.resumable,
+        )
+        kwargs = {"Bucket": bucket, "Key": path, "UploadId": upload_id}
+
+        semaphore = asyncio.Semaphore(self.part_concurrency)
+        reused_parts: list[int] = []
+
+        async def _process_part(part_number: int) -> UploadedPart:
+            offset = (part_number - 1) * self.part_size
+            part_size = min(self.part_size, size - offset)
+
+            async with semaphore:
+                body = await loop.run_in_executor(
+                    None,
+                    _read_part,
+                    src,
+                    offset,
+                    part_size,
+                )
+
+                part = await self._reuse_part(existing_parts.get(part_number), body)
+                if part:
+                    reused_parts.append(part_number)
+                    return part
+
+                return await self._upload_part(
+                    part_number,
+                    body,
+                    checkpoint_id=checkpoint_id,
+                    **kwargs,
+                )
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(_process_part(part_number))
+                    for part_number in range(1, n_parts + 1)
+                ]
+        except* Exception:
+            if not (self.resumable or checkpoint_id):
+                LOGGER.warning("Aborting multipart upload of %s", key)
+                await self.s3._call_s3("abort_multipart_upload", **kwargs)
+            raise
+
+        if reused_parts:
+            LOGGER.info(
+                "Reused %d of %d parts uploading %s",
+                len(reused_parts),
+                n_parts,
+                key,
+            )
+
+        await self.s3._call_s3(
+            "complete_multipart_upload",
+            MultipartUpload={"Parts": [task.result().to_dict() for task in tasks]},
+            ChecksumType="FULL_OBJECT",
+            **kwargs,
+        )
+
+        await self._clear_checkpoint(checkpoint_id)
+
+    async def _upload_part(
+        self,
+        part_number: int,
+        body: bytes,
+        *,
+        checkpoint_id: str | None = None,
+        **kwargs,
+    ) -> UploadedPart:
+        loop = asyncio.get_running_loop()
+        checksum = await loop.run_in_executor(None, _get_crc32, body)
+
+        async with asyncio.timeout(self.get_timeout(len(body))):
+            response = await self.s3._call_s3(
+                "upload_part",
+                PartNumber=part_number,
+                Body=body,
+                ChecksumAlgorithm="CRC32",
+                ChecksumCRC32=checksum,
+                **kwargs,
+            )
+
+        part = UploadedPart(
+            part_number=part_number,
+            etag=response["ETag"],
+            size=len(body),
+            checksum_crc32=checksum,
+        )
+        if checkpoint_id and self.checkpoint_store:
+            await self.checkpoint_store.add_part(checkpoint_id, part)
+
+        return part
+
+    @staticmethod
+    async def _reuse_part(
+        existing_part: UploadedPart | None,
+        body: bytes,
+    ) -> UploadedPart | None:
+        if not existing_part or existing_part.size != len(body):
+            return None
+
+        loop = asyncio.get_running_loop()
+        etag = await loop.run_in_executor(None, _get_etag, body)
+
+        return existing_part if etag == existing_part.etag else None
+
+    async def _create_upload(self, bucket: str, path: str) -> str:
+        response = await self.s3._call_s3(
+            "create_multipart_upload",
+            Bucket=bucket,
+            Key=path,
+            ChecksumAlgorithm="CRC32",
+            ChecksumType="FULL_OBJECT",
+        )
+        return response["UploadId"]
+
+    async def _get_or_create_upload(
+        self,
+        bucket: str,
+        path: str,
+        *,
+        checkpoint_id: str | None = None,
+        discover: bool = False,
+    ) -> tuple[str, dict[int, UploadedPart]]:
+        key = f"{bucket}/{path}"
+
+        upload_id: str | None = None
+        if checkpoint_id and self.checkpoint_store:
+            checkpoint = await self.checkpoint_store.get(checkpoint_id)
+            if (
+                checkpoint
+                and checkpoint.key == key
+                and checkpoint.part_size == self.part_size
+            ):
+                upload_id = checkpoint.upload_id
+        elif discover:
+            upload_id = await self._find_upload(bucket, path)
+
+        if upload_id:
+            try:
+                parts = await self._list_parts(bucket, path, upload_id)
+            except FileNotFoundError:
+                LOGGER.warning("Upload of %s no longer exists, restarting", key)
+            else:
+                if parts is not None:
+                    LOGGER.info("Resuming upload of %s with %d parts", key, len(parts))
+                    return upload_id, {part.part_number: part for part in parts}
+
+                LOGGER.warning("Upload of %s has no full object CRC32, restarting", key)
+                await self.s3._call_s3(
+                    "abort_multipart_upload",
+                    Bucket=bucket,
+                    Key=path,
+                    UploadId=upload_id,
+                )
+
+        upload_id = await self._create_upload(bucket, path)
+        if checkpoint_id and self.checkpoint_store:
+            await self.checkpoint_store.start(
+                checkpoint_id,
+                UploadCheckpoint(
+                    key=key,
+                    upload_id=upload_id,
+                    part_size=self.part_size,
+                ),
+            )
+
+        return upload_id, {}
+
+    async def _clear_checkpoint(self, checkpoint_id: str | None) -> None:
+        if checkpoint_id and self.checkpoint_store:
+            await self.checkpoint_store.clear(checkpoint_id)
+
+    async def _find_upload(self, bucket: str, path: str) -> str | None:
+        response = await self.s3._call_s3(
+            "list_multipart_uploads",
+            Bucket=bucket,
+            Prefix=path,
+        )
+        uploads = [item for item in response.get("Uploads", []) if item["Key"] == path]
+        if not uploads:
+            return None
+
+        return max(uploads, key=lambda item: item["Initiated"])["UploadId"]
+
+    async def _list_parts(
+        self,
+        bucket: str,
+        path: str,
+        upload_id: str,
+    ) -> list[UploadedPart] | None:
+        """
+        List the parts of an upload, or None if it has no full object CRC32.
+        """
+        parts: list[UploadedPart] = []
+        marker = 0
+        while True:
+            response = await self.s3._call_s3(
+                "list_parts",
+                Bucket=bucket,
+                Key=path,
+                UploadId=upload_id,
+                PartNumberMarker=marker,
+            )
+            if response.get("ChecksumType") != "FULL_OBJECT":
+                return None
+
+            parts.extend(
+                UploadedPart(
+                    part_number=item["PartNumber"],
+                    etag=item["ETag"],
+                    size=item["Size"],
+                    checksum_crc32=item.get("ChecksumCRC32"),
+                )
+                for item in response.get("Parts", [])
+            )
+            if not response.get("IsTruncated"):
+                return parts
+            marker = response["NextPartNumberMarker"]
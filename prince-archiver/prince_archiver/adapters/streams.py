@@ -1,11 +1,12 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import AsyncGenerator, Awaitable, Callable
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Generic, TypeVar
+from typing import Generic, TypeVar, cast
 from uuid import uuid4
 
 from redis.asyncio import Redis
@@ -27,6 +28,22 @@ class Consumer:
     consumer_name: str = field(default_factory=lambda: uuid4().hex)
 
 
+@dataclass
+class ReclaimPolicy:
+    """
+    Policy for claiming messages left pending by other consumers.
+
+    Messages idle for at least `min_idle_time` milliseconds are claimed every
+    `interval` seconds. Once delivered `max_deliveries` times, a message is
+    moved to `dead_letter_stream` (`<stream>:dead-letter` by default).
+    """
+
+    min_idle_time: int = 5 * 60 * 1000
+    interval: float = 30
+    max_deliveries: int | None = 5
+    dead_letter_stream: str | None = None
+
+
 @dataclass
 class MessageInfo:
     id: str
@@ -54,6 +71,9 @@ class AbstractIncomingMessage(Generic[T], ABC):
         self.raw_data = raw_data
         self.stream = stream
 
+        # Set when acknowledgements are deferred to the end of a batch
+        self.ack_buffer: AckBuffer | None = None
+
     @property
     def info(self):
         return MessageInfo(
@@ -72,7 +92,42 @@ class AbstractIncomingMessage(Generic[T], ABC):
         except Exception as e:
             raise e
         else:
-            await self.stream.ack(self.info)
+            if self.ack_buffer is None:
+                await self.stream.ack(self.info)
+            else:
+                await self.ack_buffer.ack(self.info)
+
+
+class AckBuffer:
+    """
+    Acknowledgements of a batch of messages, sent together.
+
+    The buffer is flushed once every message of the batch has been
+    acknowledged, or earlier through `flush`. Acknowledgements arriving after
+    a flush are sent immediately.
+    """
+
+    def __init__(self, stream: "Stream", size: int):
+        self.stream = stream
+        self.size = size
+        self.message_infos: list[MessageInfo] = []
+        self.flushed = False
+
+    async def ack(self, message_info: MessageInfo):
+        if self.flushed:
+            await self.stream.ack(message_info)
+            return
+
+        self.message_infos.append(message_info)
+        if len(self.message_infos) >= self.size:
+            await self.flush()
+
+    async def flush(self):
+        if self.flushed:
+            return
+
+        self.flushed = True
+        await self.stream.ack_many(self.message_infos)
 
 
 AbstractIncomingMessageT = TypeVar(
@@ -115,18 +170,83 @@ class Stream:
         *,
         msg_cls: type[AbstractIncomingMessageT],
         stop_event: asyncio.Event | None = None,
+        batch_size: int = 1,
+        reclaim: ReclaimPolicy | None = None,
     ) -> AsyncGenerator[AbstractIncomingMessageT, None]:
-        stream_id: int | str = 0
+        """
+        Yield messages one at a time from batches of up to `batch_size`.
+
+        When reading in batches, acknowledgements made through
+        `message.process()` are buffered and sent together once the batch
+        has been consumed.
+        """
+        batches = self.stream_group_batches(
+            consumer,
+            msg_cls=msg_cls,
+            stop_event=stop_event,
+            batch_size=batch_size,
+            reclaim=reclaim,
+        )
+        async for batch in batches:
+            ack_buffer = AckBuffer(self, len(batch))
+            try:
+                for msg in batch:
+                    if batch_size > 1:
+                        msg.ack_buffer = ack_buffer
+                    yield msg
+            finally:
+                await ack_buffer.flush()
+
+    async def stream_group_batches(
+        self,
+        consumer: Consumer,
+        *,
+        msg_cls: type[AbstractIncomingMessageT],
+        stop_event: asyncio.Event | None = None,
+        batch_size: int = 1,
+        block: int = 2000,
+        reclaim: ReclaimPolicy | None = None,
+    ) -> AsyncGenerator[list[AbstractIncomingMessageT], None]:
+        """
+        Yield batches of up to `batch_size` messages.
+
+        The consumer's pending entries are read first, after which only new
+        messages are read. With a `reclaim` policy, messages left idle in the
+        pending lists of other consumers are periodically claimed as well.
+        """
+        stream_id: bytes | int | str = 0
         stop_event = stop_event or asyncio.Event()
 
+        loop = asyncio.get_running_loop()
+        reclaim_id: bytes | str = "0-0"
+        next_reclaim = loop.time()
+
         LOGGER.info("Consuming `%s`", self.name)
         while not stop_event.is_set():
+            # Claim messages abandoned by other consumers once up to date
+            if reclaim and stream_id == ">" and loop.time() >= next_reclaim:
+                reclaim_id, claimed = await self.claim_idle(
+                    consumer,
+                    msg_cls=msg_cls,
+                    policy=reclaim,
+                    count=batch_size,
+                    start_id=reclaim_id,
+                )
+
+                # Continue claiming straight away until the whole PEL is scanned
+                if reclaim_id in ("0-0", b"0-0"):
+                    next_reclaim = loop.time() + reclaim.interval
+
+                if claimed:
+                    yield claimed
+                    continue
+
             response: ResponseT = await self.redis.xreadgroup(
                 groupname=consumer.group_name,
                 consumername=consumer.consumer_name,
                 streams={self.name: stream_id},
-                count=1,
-                block=2000,
+                count=batch_size,
+                block=block,
             )
 
             # Occurs when there are no latest messages (e.g >)
@@ -137,15 +257,125 @@ class Stream:
             _, msgs = response[0]
             if not msgs:
                 stream_id = ">"
+                continue
 
-            for id, raw_payload in msgs:
-                yield msg_cls(
+            # Continue reading the backlog after the last entry received
+            if stream_id != ">":
+                stream_id = msgs[-1][0]
+
+            yield [
+                msg_cls(
                     id=id,
                     stream_name=self.name,
                     group_name=consumer.group_name,
                     raw_data=raw_payload,
                     stream=self,
                 )
+                for id, raw_payload in msgs
+            ]
+
+    async def claim_idle(
+        self,
+        consumer: Consumer,
+        *,
+        msg_cls: type[AbstractIncomingMessageT],
+        policy: ReclaimPolicy,
+        count: int = 100,
+        start_id: bytes | str = "0-0",
+    ) -> tuple[bytes | str, list[AbstractIncomingMessageT]]:
+        """
+        Claim idle pending messages, returning the id to continue from.
+
+        Messages which have exceeded the maximum number of deliveries are
+        moved to the dead-letter stream rather than returned.
+        """
+        if policy.max_deliveries:
+            await self.dead_letter(consumer, policy=policy, count=count)
+
+        next_id, msgs, *_ = await self.redis.xautoclaim(
+            self.name,
+            consumer.group_name,
+            consumer.consumer_name,
+            min_idle_time=policy.min_idle_time,
+            start_id=start_id,
+            count=count,
+        )
+
+        # Entries deleted from the stream are returned without a payload
+        claimed = [
+            msg_cls(
+                id=id,
+                stream_name=self.name,
+                group_name=consumer.group_name,
+                raw_data=raw_payload,
+                stream=self,
+            )
+            for id, raw_payload in msgs
+            if raw_payload
+        ]
+        if claimed:
+            LOGGER.info("Claimed %d idle messages from `%s`", len(claimed), self.name)
+
+        return next_id, claimed
+
+    async def dead_letter(
+        self,
+        consumer: Consumer,
+        *,
+        policy: ReclaimPolicy,
+        count: int = 100,
+    ) -> int:
+        """
+        Move idle messages delivered too many times to the dead-letter stream.
+        """
+        if not policy.max_deliveries:
+            return 0
+
+        pending: list[dict] = await self.redis.xpending_range(
+            self.name,
+            consumer.group_name,
+            min="-",
+            max="+",
+            count=count,
+            idle=policy.min_idle_time,
+        )
+        ids = [
+            item["message_id"]
+            for item in pending
+            if item["times_delivered"] >= policy.max_deliveries
+        ]
+        if not ids:
+            return 0
+
+        # Claiming ensures only one consumer moves each message
+        # Payloads of messages trimmed from the stream are returned as None
+        msgs = cast(
+            list[tuple[bytes, dict | None]],
+            await self.redis.xclaim(
+                self.name,
+                consumer.group_name,
+                consumer.consumer_name,
+                min_idle_time=policy.min_idle_time,
+                message_ids=ids,
+            ),
+        )
+
+        dead_letter_stream = policy.dead_letter_stream or f"{self.name}:dead-letter"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for id, raw_payload in msgs:
+                if raw_payload:
+                    pipe.xadd(dead_letter_stream, raw_payload)
+                pipe.xack(self.name, consumer.group_name, id)
+            await pipe.execute()
+
+        LOGGER.warning(
+            "Moved %d messages from `%s` to `%s`",
+            len(msgs),
+            self.name,
+            dead_letter_stream,
+        )
+
+        return len(msgs)
 
     async def add(self, msg: AbstractOutgoingMessage):
         await self.redis.xadd(self.name, msg.fields(), maxlen=self.max_len)
@@ -154,6 +384,20 @@ class Stream:
         if message_info.group_name:
             await self.redis.xack(self.name, message_info.group_name, message_info.id)
 
+    async def ack_many(self, message_infos: Iterable[MessageInfo]):
+        ids_by_group: dict[str, list[str]] = defaultdict(list)
+        for message_info in message_infos:
+            if message_info.group_name:
+                ids_by_group[message_info.group_name].append(message_info.id)
+
+        if not ids_by_group:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for group_name, ids in ids_by_group.items():
+                pipe.xack(self.name, group_name, *ids)
+            await pipe.execute()
+
     async def trim(self, datetime: datetime):
         await self.redis.xtrim(
             self.name,
@@ -162,17 +406,57 @@ class Stream:
         )
 
 
-class AbstractIngester(ABC):
+MessageT = TypeVar("MessageT")
+
+
+class AbstractIngester(Generic[MessageT], ABC):
+    """
+    Consume messages, or batches of messages, from a stream, handling up to
+    `max_concurrency` at once.
+
+    Once the stream stops, messages in flight are allowed to finish before
+    `consume` returns.
+    """
+
     def __init__(
         self,
-        streamer: AsyncGenerator[AbstractIncomingMessageT, None],
-        handler: Callable[[AbstractIncomingMessageT], Awaitable[None]],
+        streamer: AsyncGenerator[MessageT, None],
+        handler: Callable[[MessageT], Awaitable[None]],
+        *,
+        max_concurrency: int = 1,
     ):
         self.streamer = streamer
         self.handler = handler
+        self.max_concurrency = max_concurrency
 
     @abstractmethod
-    async def consume(self): ...
+    async def process_message(self, message: MessageT): ...
+
+    async def consume(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async for message in self.streamer:
+            await semaphore.acquire()
+
+            task = asyncio.create_task(self._process_message(message, semaphore))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        # Drain messages still in flight
+        if tasks:
+            LOGGER.info("Waiting for %d messages to be processed", len(tasks))
+            await asyncio.wait(tasks)
+
+    async def _process_message(
+        self,
+        message: MessageT,
+        semaphore: asyncio.Semaphore,
+    ):
+        try:
+            await self.process_message(message)
+        finally:
+            semaphore.release()
 
     @asynccontextmanager
     async def managed_consumer(self):
@@ -5,6 +5,9 @@ from fastapi import Depends, Request
 from s3fs import S3FileSystem
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from prince_archiver.adapters.presign import AbstractUrlSigner
+from prince_archiver.adapters.response_cache import AbstractResponseCache
+
 SessionmakerT = async_sessionmaker[AsyncSession]
 
 
@@ -12,6 +15,8 @@ SessionmakerT = async_sessionmaker[AsyncSession]
 class APIState:
     file_system: S3FileSystem
     sessionmaker: SessionmakerT
+    url_signer: AbstractUrlSigner
+    response_cache: AbstractResponseCache
 
 
 async def get_state(request: Request) -> APIState:
@@ -25,6 +30,24 @@ async def get_file_system(
     return state.file_system
 
 
+async def get_url_signer(
+    state: Annotated[APIState, Depends(get_state)],
+) -> AbstractUrlSigner:
+    return state.url_signer
+
+
+async def get_response_cache(
+    state: Annotated[APIState, Depends(get_state)],
+) -> AbstractResponseCache:
+    return state.response_cache
+
+
+async def get_sessionmaker(
+    state: Annotated[APIState, Depends(get_state)],
+) -> SessionmakerT:
+    return state.sessionmaker
+
+
 async def get_session(
     state: Annotated[APIState, Depends(get_state)],
 ) -> AsyncGenerator[AsyncSession, None]:
@@ -7,12 +7,18 @@ from prince_archiver.definitions import EventType
 from prince_archiver.utils import now
 
 
-class ExportFilterParams(BaseModel):
+class ExportRangeParams(BaseModel):
     start: AwareDatetime = Field(default_factory=lambda: now() - timedelta(hours=24))
     end: AwareDatetime = Field(default_factory=now)
     event_type: EventType = EventType.STITCH
+    with_url: bool = True
+
+
+class ExportFilterParams(ExportRangeParams):
     limit: int = Field(500, le=500)
     offset: int = Field(0, ge=0)
+    cursor: str | None = None
+    with_count: bool = True
 
 
 class DailyStatsModel(BaseModel):
@@ -32,7 +38,8 @@ class ExportModel(BaseModel):
 
 
 class ExportsModel(BaseModel):
-    count: int
+    count: int | None
+    next_cursor: str | None = None
     data: list[ExportModel]
 
 
@@ -50,7 +57,8 @@ class ArchiveSummaryModel(BaseArchiveModel):
 
 
 class ArchivesModel(BaseModel):
-    count: int
+    count: int | None
+    next_cursor: str | None = None
     data: list[ArchiveSummaryModel]
 
 
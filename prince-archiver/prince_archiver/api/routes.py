@@ -1,107 +1,194 @@
 import asyncio
+from datetime import UTC, timedelta
 from functools import partial
-from typing import Annotated
+from typing import Annotated, AsyncGenerator
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from s3fs import S3FileSystem
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from prince_archiver.adapters.presign import AbstractUrlSigner
+from prince_archiver.adapters.response_cache import (
+    ARCHIVES_TAG,
+    AbstractResponseCache,
+    get_exports_tag,
+)
 from prince_archiver.models import read
+from prince_archiver.utils import now
 
-from .deps import get_file_system, get_session
+from .deps import (
+    SessionmakerT,
+    get_response_cache,
+    get_session,
+    get_sessionmaker,
+    get_url_signer,
+)
 from .models import (
     ArchiveModel,
     ArchivesModel,
     DailyStatsModel,
     ExportFilterParams,
+    ExportModel,
+    ExportRangeParams,
     ExportsModel,
 )
-from .utils import get_pagininated_results
+from .utils import get_cached_response, get_pagininated_results
 
 router = APIRouter(prefix="/api/1")
 
+# Longest range of exports, in days, for which responses are cached
+MAX_CACHED_EXPORT_DAYS = 92
+
 
-@router.get("/exports")
+@router.get("/exports", response_model=ExportsModel)
 async def list_exports(
+    request: Request,
     filter_query: Annotated[ExportFilterParams, Query()],
     session: Annotated[AsyncSession, Depends(get_session)],
-    file_system: Annotated[S3FileSystem, Depends(get_file_system)],
-) -> ExportsModel:
+    url_signer: Annotated[AbstractUrlSigner, Depends(get_url_signer)],
+    cache: Annotated[AbstractResponseCache, Depends(get_response_cache)],
+) -> Response:
     """Get latest exports."""
-    filter_params = [
-        read.Export.type == filter_query.event_type,
-        read.Export.uploaded_at > filter_query.start,
-        read.Export.uploaded_at < filter_query.end,
-    ]
 
-    count, exports = await get_pagininated_results(
-        session=session,
-        model=read.Export,
-        filter_params=filter_params,
-        limit=filter_query.limit,
-        offset=filter_query.offset,
-    )
+    async def build() -> ExportsModel:
+        page = await get_pagininated_results(
+            session=session,
+            model=read.Export,
+            keyset=(read.Export.uploaded_at, read.Export.ref_id),
+            filter_params=_get_export_filters(filter_query),
+            cursor=filter_query.cursor,
+            limit=filter_query.limit,
+            offset=filter_query.offset,
+            with_count=filter_query.with_count,
+        )
+
+        presigned_urls = await _get_urls(
+            url_signer,
+            [item.key for item in page.results],
+            with_url=filter_query.with_url,
+        )
+        iterator = zip(page.results, presigned_urls)
+
+        return ExportsModel(
+            count=page.count,
+            next_cursor=page.next_cursor,
+            data=[{**item.__dict__, "url": url} for item, url in iterator],
+        )
 
-    # Need to fetch the presigned urls
-    presigned_urls = await asyncio.gather(
-        *(file_system._url(item.key) for item in exports),
+    return await get_cached_response(
+        request,
+        cache,
+        build,
+        tags=_get_export_tags(request, filter_query),
     )
-    iterator = zip(exports, presigned_urls)
 
-    return ExportsModel(
-        count=count,
-        data=[{**item.__dict__, "url": url} for item, url in iterator],
+
+@router.get("/exports/stream", response_class=StreamingResponse)
+async def stream_exports(
+    filter_query: Annotated[ExportRangeParams, Query()],
+    sessionmaker: Annotated[SessionmakerT, Depends(get_sessionmaker)],
+    url_signer: Annotated[AbstractUrlSigner, Depends(get_url_signer)],
+) -> StreamingResponse:
+    """Stream all exports in a range as newline delimited JSON."""
+    return StreamingResponse(
+        _iter_export_lines(
+            sessionmaker,
+            url_signer,
+            _get_export_filters(filter_query),
+            with_url=filter_query.with_url,
+        ),
+        media_type="application/x-ndjson",
     )
 
 
-@router.get("/archives")
+@router.get("/archives", response_model=ArchivesModel)
 async def list_archives(
+    request: Request,
     session: Annotated[AsyncSession, Depends(get_session)],
+    cache: Annotated[AbstractResponseCache, Depends(get_response_cache)],
     experiment_id: str | None = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(le=100)] = 100,
-) -> ArchivesModel:
+    cursor: str | None = None,
+    with_count: bool = True,
+) -> Response:
     filter_params = []
     if experiment_id:
         filter_params.append(
             read.Archive.experiment_id == experiment_id,
         )
 
-    count, archives = await get_pagininated_results(
-        session=session,
-        model=read.Archive,
-        filter_params=filter_params,
-        limit=limit,
-        offset=offset,
-    )
+    async def build() -> ArchivesModel:
+        page = await get_pagininated_results(
+            session=session,
+            model=read.Archive,
+            keyset=(read.Archive.created_at, read.Archive.id),
+            filter_params=filter_params,
+            cursor=cursor,
+            limit=limit,
+            offset=offset,
+            with_count=with_count,
+        )
 
-    get_url = partial(router.url_path_for, "read_archive")
+        get_url = partial(router.url_path_for, "read_archive")
 
-    return ArchivesModel(
-        count=count,
-        data=[{**item.__dict__, "url": get_url(id=item.id)} for item in archives],
-    )
+        return ArchivesModel(
+            count=page.count,
+            next_cursor=page.next_cursor,
+            data=[
+                {**item.__dict__, "url": get_url(id=item.id)} for item in page.results
+            ],
+        )
 
+    return await get_cached_response(request, cache, build, tags=[ARCHIVES_TAG])
 
-@router.get("/archives/{id}", name="read_archive")
+
+@router.get("/archives/{id}", name="read_archive", response_model=ArchiveModel)
 async def read_archive(
+    request: Request,
     id: UUID,
     session: Annotated[AsyncSession, Depends(get_session)],
-) -> ArchiveModel:
-    archive = await session.scalar(select(read.Archive).where(read.Archive.id == id))
-    if not archive:
-        raise HTTPException(status_code=404, detail="item not found")
+    cache: Annotated[AbstractResponseCache, Depends(get_response_cache)],
+) -> Response:
+    async def build() -> ArchiveModel:
+        # Members are read along with the archive, which takes its type and
+        # experiment from them, rather than aggregating over every archive.
+        result = await session.execute(
+            select(
+                read.ArchiveEntry.id,
+                read.ArchiveEntry.path,
+                read.ArchiveEntry.created_at,
+                read.ArchiveMember.type,
+                read.ArchiveMember.experiment_id,
+                read.ArchiveMember.member_key,
+                read.ArchiveMember.ref_id,
+                read.ArchiveMember.timestamp,
+                read.ArchiveMember.checksum,
+                read.ArchiveMember.size,
+            )
+            .join_from(
+                read.ArchiveEntry,
+                read.ArchiveMember,
+                onclause=read.ArchiveEntry.id
+                == read.ArchiveMember.data_archive_entry_id,
+            )
+            .where(read.ArchiveEntry.id == id)
+            .order_by(read.ArchiveMember.member_key),
+        )
+        rows = result.all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="item not found")
 
-    members = await session.scalars(
-        select(read.ArchiveMember).where(read.ArchiveMember.data_archive_entry_id == id)
-    )
+        return ArchiveModel.model_validate(
+            {
+                **rows[0]._asdict(),
+                "members": [row._asdict() for row in rows],
+            },
+        )
 
-    return ArchiveModel(
-        **archive.__dict__,
-        members=[item.__dict__ for item in members.all()],
-    )
+    return await get_cached_response(request, cache, build, tags=[ARCHIVES_TAG])
 
 
 @router.get("/daily-stats")
@@ -112,3 +199,75 @@ async def list_daily_stats(
         select(read.DailyStats).order_by(read.DailyStats.date.desc()).limit(7)
     )
     return [DailyStatsModel(**item.__dict__) for item in result.all()]
+
+
+def _get_export_tags(
+    request: Request,
+    filter_query: ExportRangeParams,
+) -> list[str] | None:
+    # Only ranges given explicitly and ending before today are cached, as the
+    # defaults move with the time of the request whereas the cache key is the
+    # query. They're tagged with each day spanned so late exports invalidate
+    # them.
+    if not {"start", "end"} <= request.query_params.keys():
+        return None
+
+    start = filter_query.start.astimezone(UTC).date()
+    end = filter_query.end.astimezone(UTC).date()
+    if end >= now().astimezone(UTC).date():
+        return None
+
+    days = (end - start).days + 1
+    if days > MAX_CACHED_EXPORT_DAYS:
+        return None
+
+    return [get_exports_tag(start + timedelta(days=day)) for day in range(days)]
+
+
+def _get_export_filters(filter_query: ExportRangeParams) -> list[ColumnElement]:
+    return [
+        read.Export.type == filter_query.event_type,
+        read.Export.uploaded_at > filter_query.start,
+        read.Export.uploaded_at < filter_query.end,
+    ]
+
+
+async def _iter_export_lines(
+    sessionmaker: SessionmakerT,
+    url_signer: AbstractUrlSigner,
+    filter_params: list[ColumnElement],
+    *,
+    with_url: bool = True,
+    chunk_size: int = 500,
+) -> AsyncGenerator[bytes, None]:
+    # The session is opened here as it needs to outlive the request handler
+    # while the response is streamed.
+    async with sessionmaker() as session:
+        result = await session.stream_scalars(
+            select(read.Export)
+            .where(*filter_params)
+            .order_by(read.Export.uploaded_at, read.Export.ref_id)
+            .execution_options(yield_per=chunk_size),
+        )
+        async for exports in result.partitions():
+            presigned_urls = await _get_urls(
+                url_signer,
+                [item.key for item in exports],
+                with_url=with_url,
+            )
+            yield b"".join(
+                ExportModel(**{**item.__dict__, "url": url}).model_dump_json().encode()
+                + b"\n"
+                for item, url in zip(exports, presigned_urls)
+            )
+
+
+async def _get_urls(
+    url_signer: AbstractUrlSigner,
+    keys: list[str],
+    *,
+    with_url: bool = True,
+) -> list[str | None]:
+    if not with_url:
+        return [None] * len(keys)
+    return await asyncio.gather(*(url_signer.sign(key) for key in keys))
@@ -1,29 +1,130 @@
-from collections.abc import Sequence
-from typing import TypeVar
+import binascii
+import hashlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, TypeVar
+from urllib.parse import urlencode
+from uuid import UUID
 
-from sqlalchemy import ColumnElement, func, select
+from fastapi import HTTPException, Request, Response
+from pydantic import AwareDatetime, BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import ColumnElement, func, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
+from prince_archiver.adapters.response_cache import AbstractResponseCache
 from prince_archiver.models import read
 
 ReadT = TypeVar("ReadT", bound=read.ReadBase)
 
+CursorKey = tuple[AwareDatetime, UUID]
+
+CURSOR_ADAPTER = TypeAdapter(CursorKey)
+
+
+@dataclass
+class Page(Generic[ReadT]):
+    count: int | None
+    results: Sequence[ReadT]
+    next_cursor: str | None
+
+
+def encode_cursor(key: tuple[datetime, UUID]) -> str:
+    return urlsafe_b64encode(CURSOR_ADAPTER.dump_json(key)).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        return CURSOR_ADAPTER.validate_json(urlsafe_b64decode(cursor))
+    except (binascii.Error, ValidationError) as exc:
+        raise HTTPException(status_code=400, detail="invalid cursor") from exc
+
 
 async def get_pagininated_results(
     session: AsyncSession,
     model: type[ReadT],
     *,
+    keyset: tuple[InstrumentedAttribute[datetime], InstrumentedAttribute[UUID]],
     filter_params: list[ColumnElement] | None = None,
+    cursor: str | None = None,
     offset: int = 0,
     limit: int = 100,
-) -> tuple[int, Sequence[ReadT]]:
+    with_count: bool = True,
+) -> Page[ReadT]:
+    """
+    Get a page of results ordered by `keyset`.
+
+    When a `cursor` is given results are read from after the row it points
+    to, which doesn't slow down the further into the results it is, and
+    `offset` is applied from there. `next_cursor` is set while there are
+    more results to read. Set `with_count` to False to skip counting the
+    filtered results.
+    """
     filter_params = filter_params or []
 
-    count_stmt = select(func.count()).select_from(model).where(*filter_params)
+    count = None
+    if with_count:
+        count_stmt = select(func.count()).select_from(model).where(*filter_params)
+        count = await session.scalar(count_stmt) or 0
+
+    read_stmt = select(model).where(*filter_params)
+    if cursor:
+        values = (
+            literal(value, column.type)
+            for column, value in zip(keyset, decode_cursor(cursor))
+        )
+        read_stmt = read_stmt.where(tuple_(*keyset) > tuple_(*values))
+
+    # Read one more row than needed to tell if there is a next page
+    read_stmt = read_stmt.order_by(*keyset).limit(limit + 1).offset(offset)
+
+    results = (await session.scalars(read_stmt)).all()
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor(
+            (getattr(last, keyset[0].key), getattr(last, keyset[1].key)),
+        )
+
+    return Page(count=count, results=results, next_cursor=next_cursor)
+
+
+async def get_cached_response(
+    request: Request,
+    cache: AbstractResponseCache,
+    build: Callable[[], Awaitable[BaseModel]],
+    *,
+    tags: Iterable[str] | None = None,
+) -> Response:
+    """
+    Get a JSON response with an ETag, answering If-None-Match with a 304.
+
+    The response is only cached when `tags` is given, and is invalidated
+    along with any of them.
+    """
+    key = None
+    body = None
+    if tags is not None:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = await cache.get_key(f"{request.url.path}?{query}", tags)
+        body = await cache.get(key)
+
+    if body is None:
+        body = (await build()).model_dump_json().encode()
+        if key:
+            await cache.set(key, body)
+
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = _parse_etags(request.headers.get("if-none-match", ""))
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers={"ETag": etag})
 
-    read_stmt = select(model).where(*filter_params).limit(limit).offset(offset)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
 
-    count = await session.scalar(count_stmt)
-    results = await session.scalars(read_stmt)
 
-    return count or 0, results.all()
+def _parse_etags(header: str) -> set[str]:
+    return {item.strip().removeprefix("W/") for item in header.split(",")}
@@ -21,3 +21,7 @@ class AWSSettings(BaseSettings):
     AWS_BUCKET_NAME: str
 
     UPLOAD_MAX_CONCURRENCY: int = 5
+    UPLOAD_PART_SIZE: int = 16 * 1024 * 1024
+    UPLOAD_PART_CONCURRENCY: int = 4
+    # Lower bound on throughput (bytes/s) used to derive upload timeouts
+    UPLOAD_MIN_THROUGHPUT: int = 1024 * 1024
@@ -15,3 +15,6 @@ class EventType(StrEnum):
 
 class Algorithm(StrEnum):
     SHA256 = auto()
+    SHA1 = auto()
+    BLAKE2B = auto()
+    CRC32 = auto()
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -39,7 +39,12 @@ class SrcDirInfo:
 @dataclass
 class EventArchive:
     size: int
-    checksum: Checksum | None = None
+    checksums: list[Checksum] = field(default_factory=list)
+
+    @property
+    def checksum(self) -> Checksum | None:
+        """Primary checksum of the archive."""
+        return self.checksums[0] if self.checksums else None
 
 
 @dataclass
@@ -3,12 +3,44 @@ from pathlib import Path
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from prince_archiver.config import AWSSettings
+from prince_archiver.definitions import Algorithm
 
 
 class Settings(AWSSettings, BaseSettings):
     SRC_DIR: Path  # from compose.yml: /data
     STAGING_DIR: Path | None = None
 
+    # Stream consumer name, unique to each replica and kept when it is recreated
+    # so it reads back its own pending messages. Container hostnames change
+    # when compose recreates a container, so this must be set explicitly.
+    CONSUMER_NAME: str
+
+    # Seconds before messages pending on another consumer are claimed. Messages
+    # are only acknowledged once exported, so this must outlast the retries.
+    STREAM_RECLAIM_IDLE_TIME: int = 3 * 24 * 60 * 60
+    # Deliveries after which a message is moved to the dead-letter stream
+    STREAM_MAX_DELIVERIES: int = 5
+
+    # Maximum number of messages read from a stream per round trip
+    STREAM_BATCH_SIZE: int = 100
+
+    # Maximum number of stream messages handled concurrently
+    INGEST_MAX_CONCURRENCY: int = 4
+
+    # Stream tar directly to s3 rather than via a temporary archive
+    STREAMING_EXPORT: bool = False
+    STREAMING_MAX_BUFFERED_PARTS: int = 2
+
+    # Seconds upload checkpoints are kept, should outlast the retry schedule
+    UPLOAD_CHECKPOINT_TTL: int = 3 * 24 * 60 * 60
+
+    # Threads hashing exports whilst their tars are written, shared by all jobs
+    HASHING_MAX_CONCURRENCY: int = 2
+
+    # Checksums computed for each export, the first being the primary one.
+    # Uploads are verified against the CRC32 s3 computes, if included.
+    CHECKSUM_ALGORITHMS: list[Algorithm] = [Algorithm.SHA256, Algorithm.CRC32]
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -2,18 +2,26 @@ import asyncio
 import logging
 from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
+from datetime import timedelta
 from functools import partial
 from typing import AsyncGenerator
 
 from arq import ArqRedis
 
-from prince_archiver.adapters.file import PathManager
-from prince_archiver.adapters.s3 import file_system_factory, managed_file_system
-from prince_archiver.adapters.streams import Consumer, Stream
+from prince_archiver.adapters.checkpoints import CheckpointStore
+from prince_archiver.adapters.file import AsyncFileSystem, PathManager
+from prince_archiver.adapters.file.checksum import HashingEngine
+from prince_archiver.adapters.s3 import (
+    MultipartUploader,
+    file_system_factory,
+    managed_file_system,
+)
+from prince_archiver.adapters.streams import Consumer, ReclaimPolicy, Stream
 from prince_archiver.service_layer.handlers.export import (
     Exporter,
     ExportHandler,
     Publisher,
+    StreamingConfig,
 )
 from prince_archiver.service_layer.handlers.utils import get_target_key
 from prince_archiver.service_layer.streams import Group, IncomingMessage, Streams
@@ -44,7 +52,14 @@ async def get_managed_state(
     s3 = file_system_factory(settings)
     await exit_stack.enter_async_context(managed_file_system(s3))
 
+    hashing_engine = HashingEngine(max_concurrency=settings.HASHING_MAX_CONCURRENCY)
+    exit_stack.callback(hashing_engine.shutdown)
+
     stop_event = asyncio.Event()
+    reclaim_policy = ReclaimPolicy(
+        min_idle_time=settings.STREAM_RECLAIM_IDLE_TIME * 1000,
+        max_deliveries=settings.STREAM_MAX_DELIVERIES,
+    )
 
     imaging_events_stream = Stream(redis=redis, name=Streams.imaging_events)
     upload_events_stream = Stream(redis=redis, name=Streams.upload_events, max_len=150)
@@ -53,11 +68,17 @@ async def get_managed_state(
         stop_event=stop_event,
         stream_ingester=Ingester(
             streamer=imaging_events_stream.stream_group(
-                Consumer(group_name=Group.upload_worker),
+                Consumer(
+                    group_name=Group.upload_worker,
+                    consumer_name=settings.CONSUMER_NAME,
+                ),
                 msg_cls=IncomingMessage,
                 stop_event=stop_event,
+                batch_size=settings.STREAM_BATCH_SIZE,
+                reclaim=reclaim_policy,
             ),
             handler=partial(message_handler, redis=redis),
+            max_concurrency=settings.INGEST_MAX_CONCURRENCY,
         ),
         export_handler=ExportHandler(
             stream=imaging_events_stream,
@@ -67,7 +88,31 @@ async def get_managed_state(
                     get_target_key,
                     bucket=settings.AWS_BUCKET_NAME,
                 ),
-                path_manager=PathManager(settings.SRC_DIR),
+                path_manager=PathManager(
+                    settings.SRC_DIR,
+                    file_system=AsyncFileSystem(
+                        algorithms=settings.CHECKSUM_ALGORITHMS,
+                        hashing_engine=hashing_engine,
+                    ),
+                ),
+                streaming=(
+                    StreamingConfig(
+                        part_size=settings.UPLOAD_PART_SIZE,
+                        max_buffered_parts=settings.STREAMING_MAX_BUFFERED_PARTS,
+                    )
+                    if settings.STREAMING_EXPORT
+                    else None
+                ),
+                uploader=MultipartUploader(
+                    s3,
+                    part_size=settings.UPLOAD_PART_SIZE,
+                    part_concurrency=settings.UPLOAD_PART_CONCURRENCY,
+                    min_throughput=settings.UPLOAD_MIN_THROUGHPUT,
+                    checkpoint_store=CheckpointStore(
+                        redis,
+                        ttl=timedelta(seconds=settings.UPLOAD_CHECKPOINT_TTL),
+                    ),
+                ),
             ),
             publisher=Publisher(stream=upload_events_stream),
         ),
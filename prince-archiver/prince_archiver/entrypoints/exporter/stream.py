@@ -4,7 +4,7 @@ import logging
 
 from arq import ArqRedis
 
-from prince_archiver.adapters.streams import AbstractIngester
+from prince_archiver.adapters.streams import AbstractIncomingMessage, AbstractIngester
 from prince_archiver.service_layer.dto import ExportImagingEvent
 from prince_archiver.service_layer.streams import IncomingMessage
 
@@ -12,12 +12,11 @@ LOGGER = logging.getLogger(__name__)
 
 
 class Ingester(AbstractIngester):
-    async def consume(self):
-        async for message in self.streamer:
-            try:
-                await self.handler(message)
-            except Exception as exc:
-                LOGGER.exception(exc)
+    async def process_message(self, message: AbstractIncomingMessage):
+        try:
+            await self.handler(message)
+        except Exception as exc:
+            LOGGER.exception(exc)
 
 
 async def message_handler(message: IncomingMessage, *, redis: ArqRedis):
@@ -25,7 +24,15 @@ async def message_handler(message: IncomingMessage, *, redis: ArqRedis):
         **dict(message.processed_data()),
         message_info=message.info.__dict__,
     )
+    # Messages are redelivered until their export acks them, so the job id is
+    # derived from the message to stop arq queueing an export twice
     await redis.enqueue_job(
         "run_export",
         mapped_msg.model_dump(mode="json"),
+        _job_id=get_job_id(message),
     )
+
+
+def get_job_id(message: IncomingMessage) -> str:
+    message_id = message.id.decode() if isinstance(message.id, bytes) else message.id
+    return f"run_export:{message.info.stream_name}:{message_id}"
@@ -1,9 +1,13 @@
 from .rabbitmq import SubscriberMessageHandler
-from .stream import Ingester, import_handler, upload_event_handler
+from .stream import (
+    Ingester,
+    import_batch_handler,
+    upload_event_batch_handler,
+)
 
 __all__ = (
     "SubscriberMessageHandler",
     "Ingester",
-    "import_handler",
-    "upload_event_handler",
+    "import_batch_handler",
+    "upload_event_batch_handler",
 )
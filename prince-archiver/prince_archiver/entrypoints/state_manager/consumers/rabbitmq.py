@@ -3,7 +3,12 @@ from typing import Generator
 
 from aio_pika.abc import AbstractIncomingMessage
 
+from prince_archiver.adapters.response_cache import (
+    ARCHIVES_TAG,
+    AbstractResponseCache,
+)
 from prince_archiver.service_layer.dto import (
+    AddDataArchiveEntries,
     AddDataArchiveEntry,
     NewDataArchiveEntries,
 )
@@ -18,8 +23,13 @@ class SubscriberMessageHandler:
     def __init__(
         self,
         messagebus_factory: MessagebusFactoryT,
+        *,
+        chunk_size: int = 1000,
+        response_cache: AbstractResponseCache | None = None,
     ):
         self.messagebus_factory = messagebus_factory
+        self.chunk_size = chunk_size
+        self.response_cache = response_cache
 
     async def __call__(self, message: AbstractIncomingMessage):
         async with message.process():
@@ -30,15 +40,27 @@ class SubscriberMessageHandler:
                 raise err
 
     async def _process(self, raw_message: bytes):
-        for message in self._map_external_dto(raw_message):
+        message = self.DTO_CLASS.model_validate_json(raw_message)
+
+        entries = list(self._map_external_dto(message))
+
+        # Each chunk of archives is persisted in a single transaction
+        for start in range(0, len(entries), self.chunk_size):
             messagebus = self.messagebus_factory()
-            await messagebus.handle(message)
+            await messagebus.handle(
+                AddDataArchiveEntries(
+                    job_id=message.job_id,
+                    entries=entries[start : start + self.chunk_size],
+                ),
+            )
+
+        if self.response_cache:
+            await self.response_cache.invalidate([ARCHIVES_TAG])
 
     def _map_external_dto(
         self,
-        raw_message: bytes,
+        message: NewDataArchiveEntries,
     ) -> Generator[AddDataArchiveEntry, None, None]:
-        message = self.DTO_CLASS.model_validate_json(raw_message)
         for archive in message.archives:
             yield AddDataArchiveEntry(
                 id=archive.id,
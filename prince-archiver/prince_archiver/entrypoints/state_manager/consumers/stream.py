@@ -1,55 +1,183 @@
 import logging
+from datetime import UTC
 from typing import Callable
 
-from prince_archiver.adapters.streams import AbstractIngester
-from prince_archiver.service_layer.dto import ImportImagingEvent
-from prince_archiver.service_layer.exceptions import ServiceLayerException
+from prince_archiver.adapters.response_cache import (
+    AbstractResponseCache,
+    get_exports_tag,
+)
+from prince_archiver.adapters.streams import AbstractIncomingMessage, AbstractIngester
+from prince_archiver.service_layer.dto import (
+    ExportedImagingEvent,
+    ExportedImagingEvents,
+    ImportImagingEvent,
+    ImportImagingEvents,
+)
+from prince_archiver.service_layer.exceptions import (
+    InvalidStreamMessage,
+    ServiceLayerException,
+)
+from prince_archiver.service_layer.handlers.state import (
+    ExportOutcome,
+    persist_imaging_event_exports,
+)
 from prince_archiver.service_layer.messagebus import MessageBus
 from prince_archiver.service_layer.streams import IncomingExportMessage, IncomingMessage
+from prince_archiver.service_layer.uow import AbstractUnitOfWork
 
 LOGGER = logging.getLogger(__name__)
 
 
 class Ingester(AbstractIngester):
-    async def consume(self):
-        async for message in self.streamer:
-            try:
-                await self.handler(message)
-            except ServiceLayerException:
-                LOGGER.warning(
-                    "Skipped message due to ServiceLayerException",
-                    exc_info=True,
-                )
-            except Exception as err:
-                LOGGER.exception(err)
-
-
-async def upload_event_handler(
-    message: IncomingExportMessage,
+    async def process_message(self, message: AbstractIncomingMessage):
+        try:
+            await self.handler(message)
+        except ServiceLayerException:
+            LOGGER.warning(
+                "Skipped message due to ServiceLayerException",
+                exc_info=True,
+            )
+        except Exception as err:
+            LOGGER.exception(err)
+
+
+async def upload_event_batch_handler(
+    messages: list[IncomingExportMessage],
     *,
-    messagebus_factory: Callable[[], MessageBus],
+    uow_factory: Callable[[], AbstractUnitOfWork],
+    response_cache: AbstractResponseCache | None = None,
 ):
-    messagebus = messagebus_factory()
-    async with message.process():
-        await messagebus.handle(message.processed_data())
+    """
+    Persist a batch of exports in one transaction.
+
+    Messages are acknowledged once persisted or found to be duplicates.
+    Exports of events not imported yet are left pending to be retried, as
+    are all messages of a failing batch persisted one at a time which still
+    fail. Cached responses covering the days of persisted exports are
+    invalidated.
+    """
+    events: list[tuple[IncomingExportMessage, ExportedImagingEvent]] = []
+    for message in messages:
+        try:
+            events.append((message, message.processed_data()))
+        except InvalidStreamMessage:
+            LOGGER.warning("Skipped invalid message %s", message.id, exc_info=True)
+
+    if not events:
+        return
 
+    outcomes: list[ExportOutcome | None]
+    try:
+        outcomes = list(
+            await persist_imaging_event_exports(
+                ExportedImagingEvents(events=[event for _, event in events]),
+                uow_factory(),
+            ),
+        )
+    except Exception:
+        if len(events) == 1:
+            raise
+        LOGGER.warning(
+            "Failed to persist batch, persisting %d exports individually",
+            len(events),
+            exc_info=True,
+        )
+        outcomes = [
+            await _persist_export(message, event, uow_factory=uow_factory)
+            for message, event in events
+        ]
 
-async def import_handler(
-    message: IncomingMessage,
+    if response_cache:
+        await response_cache.invalidate(
+            {
+                get_exports_tag(event.timestamp.astimezone(UTC).date())
+                for (_, event), outcome in zip(events, outcomes)
+                if outcome == ExportOutcome.PERSISTED
+            },
+        )
+
+    await messages[0].stream.ack_many(
+        message.info
+        for (message, _), outcome in zip(events, outcomes)
+        if outcome in (ExportOutcome.PERSISTED, ExportOutcome.DUPLICATE)
+    )
+
+
+async def _persist_export(
+    message: IncomingExportMessage,
+    event: ExportedImagingEvent,
+    *,
+    uow_factory: Callable[[], AbstractUnitOfWork],
+) -> ExportOutcome | None:
+    try:
+        (outcome,) = await persist_imaging_event_exports(
+            ExportedImagingEvents(events=[event]),
+            uow_factory(),
+        )
+    except Exception:
+        LOGGER.exception("Failed to persist message %s", message.id)
+        return None
+    return outcome
+
+
+async def import_batch_handler(
+    messages: list[IncomingMessage],
     *,
     messagebus_factory: Callable[[], MessageBus],
 ):
+    """
+    Import a batch of messages in one transaction, acknowledging them together.
+
+    Invalid messages are skipped and left unacknowledged. Should the batch
+    fail, its messages are imported one at a time so only those failing are
+    left pending, to be retried and eventually dead-lettered.
+    """
+    events: list[ImportImagingEvent] = []
+    valid_messages: list[IncomingMessage] = []
+    for message in messages:
+        try:
+            events.append(_map_import_message(message))
+        except InvalidStreamMessage:
+            LOGGER.warning("Skipped invalid message %s", message.id, exc_info=True)
+            continue
+        valid_messages.append(message)
+
+    if not valid_messages:
+        return
+
+    try:
+        messagebus = messagebus_factory()
+        await messagebus.handle(ImportImagingEvents(events=events))
+    except Exception:
+        if len(valid_messages) == 1:
+            raise
+        LOGGER.warning(
+            "Failed to import batch, importing %d messages individually",
+            len(valid_messages),
+            exc_info=True,
+        )
+    else:
+        await valid_messages[0].stream.ack_many(item.info for item in valid_messages)
+        return
+
+    for message, event in zip(valid_messages, events):
+        try:
+            messagebus = messagebus_factory()
+            await messagebus.handle(ImportImagingEvents(events=[event]))
+        except Exception:
+            LOGGER.exception("Failed to import message %s", message.id)
+            continue
+        await message.stream.ack(message.info)
+
+
+def _map_import_message(message: IncomingMessage) -> ImportImagingEvent:
     data = message.processed_data()
     src_dir_info = {
         "img_count": data.img_count,
         "local_path": data.local_path,
     }
-    mapped_message = ImportImagingEvent(
+    return ImportImagingEvent(
         **data.model_dump(exclude={"metadata"}),
         metadata=data.metadata.model_dump(mode="json"),
         src_dir_info=src_dir_info,
     )
-
-    messagebus = messagebus_factory()
-    async with message.process():
-        await messagebus.handle(mapped_message)
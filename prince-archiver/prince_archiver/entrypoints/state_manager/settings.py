@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import PostgresDsn
 from pydantic_settings import SettingsConfigDict
 
@@ -8,6 +10,41 @@ class Settings(AWSSettings, CommonSettings):
     POSTGRES_DSN: PostgresDsn
     RABBITMQ_DSN: str
 
+    # Maximum number of archives persisted per transaction from a notification
+    ARCHIVE_ENTRIES_CHUNK_SIZE: int = 1000
+
+    # Stream consumer name, unique to each replica and kept when it is recreated
+    # so it reads back its own pending messages. Container hostnames change
+    # when compose recreates a container, so this must be set explicitly.
+    CONSUMER_NAME: str
+
+    # Seconds before messages pending on another consumer are claimed
+    STREAM_RECLAIM_IDLE_TIME: int = 5 * 60
+    # Deliveries after which a message is moved to the dead-letter stream
+    STREAM_MAX_DELIVERIES: int = 5
+
+    # Maximum number of messages read from a stream per round trip
+    STREAM_BATCH_SIZE: int = 100
+
+    # Maximum number of batches handled concurrently by each stream ingester
+    INGEST_MAX_CONCURRENCY: int = 4
+
+    # Seconds for which presigned export urls are valid
+    PRESIGNED_URL_EXPIRY: int = 60 * 60
+    # Sign urls without going through the s3 client, needs static credentials
+    PRESIGN_LOCALLY: bool = False
+    # Maximum number of presigned urls cached
+    PRESIGNED_URL_CACHE_SIZE: int = 10_000
+
+    # Where API responses are cached, invalidations of the in memory cache are
+    # only seen by the process making them
+    RESPONSE_CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    # Seconds for which responses are cached, capped at a quarter of the expiry
+    # of presigned urls
+    RESPONSE_CACHE_TTL: int = 15 * 60
+    # Maximum number of responses cached in memory
+    RESPONSE_CACHE_SIZE: int = 1000
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,23 +1,36 @@
 import asyncio
 import logging
 from dataclasses import dataclass
+from datetime import timedelta
 from functools import partial
 
 import redis.asyncio as redis
+from s3fs import S3FileSystem
 
+from prince_archiver.adapters.presign import (
+    AbstractUrlSigner,
+    CachedUrlSigner,
+    FileSystemUrlSigner,
+    LocalUrlSigner,
+)
+from prince_archiver.adapters.response_cache import (
+    AbstractResponseCache,
+    LocalResponseCache,
+    RedisResponseCache,
+)
 from prince_archiver.adapters.s3 import file_system_factory
-from prince_archiver.adapters.streams import Consumer, Stream
+from prince_archiver.adapters.streams import Consumer, ReclaimPolicy, Stream
 from prince_archiver.adapters.subscriber import ManagedSubscriber
 from prince_archiver.api import APIState
 from prince_archiver.service_layer.dto import (
+    AddDataArchiveEntries,
     AddDataArchiveEntry,
-    ExportedImagingEvent,
-    ImportImagingEvent,
+    ImportImagingEvents,
 )
 from prince_archiver.service_layer.handlers.state import (
+    add_data_archive_entries,
     add_data_archive_entry,
-    import_imaging_event,
-    persist_imaging_event_export,
+    import_imaging_events,
 )
 from prince_archiver.service_layer.messagebus import MessageBus
 from prince_archiver.service_layer.streams import (
@@ -31,8 +44,8 @@ from prince_archiver.service_layer.uow import UnitOfWork, get_session_maker
 from .consumers import (
     Ingester,
     SubscriberMessageHandler,
-    import_handler,
-    upload_event_handler,
+    import_batch_handler,
+    upload_event_batch_handler,
 )
 from .settings import Settings
 
@@ -57,11 +70,15 @@ def get_state(
     redis_client = redis.from_url(str(settings.REDIS_DSN))
 
     sessionmaker = get_session_maker(str(settings.POSTGRES_DSN))
+
+    file_system = file_system_factory(settings)
+    response_cache = get_response_cache(settings, redis_client)
+
     messagebus_factory = MessageBus.factory(
         handlers={
-            ImportImagingEvent: [import_imaging_event],
-            ExportedImagingEvent: [persist_imaging_event_export],
+            ImportImagingEvents: [import_imaging_events],
             AddDataArchiveEntry: [add_data_archive_entry],
+            AddDataArchiveEntries: [add_data_archive_entries],
         },
         uow=partial(UnitOfWork, sessionmaker),
     )
@@ -71,35 +88,88 @@ def get_state(
 
     stop_event = asyncio.Event()
 
+    consumer = Consumer(Group.state_manager, settings.CONSUMER_NAME)
+    reclaim_policy = ReclaimPolicy(
+        min_idle_time=settings.STREAM_RECLAIM_IDLE_TIME * 1000,
+        max_deliveries=settings.STREAM_MAX_DELIVERIES,
+    )
+
     return State(
-        file_system=file_system_factory(settings),
+        file_system=file_system,
+        url_signer=get_url_signer(settings, file_system),
+        response_cache=response_cache,
         redis=redis_client,
         sessionmaker=sessionmaker,
         stop_event=stop_event,
+        # Batches are handled concurrently, each in its own transaction
         import_ingester=Ingester(
-            import_stream.stream_group(
-                consumer=Consumer(Group.state_manager),
+            import_stream.stream_group_batches(
+                consumer=consumer,
                 msg_cls=IncomingMessage,
                 stop_event=stop_event,
+                batch_size=settings.STREAM_BATCH_SIZE,
+                reclaim=reclaim_policy,
             ),
             handler=partial(
-                import_handler,
+                import_batch_handler,
                 messagebus_factory=messagebus_factory,
             ),
+            max_concurrency=settings.INGEST_MAX_CONCURRENCY,
         ),
         export_ingester=Ingester(
-            upload_stream.stream_group(
-                consumer=Consumer(Group.state_manager),
+            upload_stream.stream_group_batches(
+                consumer=consumer,
                 msg_cls=IncomingExportMessage,
                 stop_event=stop_event,
+                batch_size=settings.STREAM_BATCH_SIZE,
+                reclaim=reclaim_policy,
             ),
             handler=partial(
-                upload_event_handler,
-                messagebus_factory=messagebus_factory,
+                upload_event_batch_handler,
+                uow_factory=partial(UnitOfWork, sessionmaker),
+                response_cache=response_cache,
             ),
+            max_concurrency=settings.INGEST_MAX_CONCURRENCY,
         ),
         subscriber=ManagedSubscriber(
             connection_url=settings.RABBITMQ_DSN,
-            message_handler=SubscriberMessageHandler(messagebus_factory),
+            message_handler=SubscriberMessageHandler(
+                messagebus_factory,
+                chunk_size=settings.ARCHIVE_ENTRIES_CHUNK_SIZE,
+                response_cache=response_cache,
+            ),
         ),
     )
+
+
+def get_url_signer(settings: Settings, file_system: S3FileSystem) -> AbstractUrlSigner:
+    expires = timedelta(seconds=settings.PRESIGNED_URL_EXPIRY)
+
+    signer: AbstractUrlSigner
+    if settings.PRESIGN_LOCALLY:
+        signer = LocalUrlSigner.from_settings(settings, expires=expires)
+    else:
+        signer = FileSystemUrlSigner(file_system, expires=expires)
+
+    # Cached urls are handed out with at least half their lifetime left
+    return CachedUrlSigner(
+        signer,
+        ttl=expires / 2,
+        maxsize=settings.PRESIGNED_URL_CACHE_SIZE,
+    )
+
+
+def get_response_cache(
+    settings: Settings,
+    redis_client: redis.Redis,
+) -> AbstractResponseCache:
+    # Cached responses hold presigned urls, which are handed out with at least
+    # half their lifetime left, so expire well before those urls do
+    ttl = min(
+        timedelta(seconds=settings.RESPONSE_CACHE_TTL),
+        timedelta(seconds=settings.PRESIGNED_URL_EXPIRY) / 4,
+    )
+
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisResponseCache(redis_client, ttl=ttl)
+    return LocalResponseCache(ttl=ttl, maxsize=settings.RESPONSE_CACHE_SIZE)
@@ -3,6 +3,7 @@
 from typing import Type
 
 from sqlalchemy import ColumnElement
+from sqlalchemy.ext.orderinglist import ordering_list
 from sqlalchemy.orm import registry, relationship
 
 from prince_archiver.domain import models as domain_models
@@ -69,6 +70,7 @@ def init_mappers():
             "_event_archive_id": (
                 data_models.ArchiveChecksum.event_archive_id.expression
             ),
+            "_position": data_models.ArchiveChecksum.position.expression,
         },
         exclude_properties=[
             data_models.ArchiveChecksum.id,
@@ -80,9 +82,10 @@ def init_mappers():
         domain_models.EventArchive,
         data_models.EventArchive.__table__,
         properties={
-            "checksum": relationship(
+            "checksums": relationship(
                 archive_checksum_mapper,
-                uselist=False,
+                order_by=data_models.ArchiveChecksum.position,
+                collection_class=ordering_list("_position"),
             ),
         },
         exclude_properties=[
@@ -1,4 +1,4 @@
-from .archive import Archive
+from .archive import Archive, ArchiveEntry
 from .archive_member import ArchiveMember
 from .export import Export
 from .stats import DailyStats
@@ -7,6 +7,7 @@ from .utils import ReadBase
 __all__ = (
     "ReadBase",
     "Archive",
+    "ArchiveEntry",
     "ArchiveMember",
     "DailyStats",
     "Export",
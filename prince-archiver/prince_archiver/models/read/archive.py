@@ -52,6 +52,21 @@ def query_builder():
     )
 
 
+class ArchiveEntry(ReadBase):
+    __table__ = DataArchiveEntry.__table__
+    __mapper_args__ = {
+        "include_properties": [
+            "id",
+            "path",
+            "created_at",
+        ],
+    }
+
+    id: Mapped[UUID]
+    path: Mapped[str]
+    created_at: Mapped[datetime]
+
+
 class Archive(ReadBase):
     __table__ = query_builder()
 
@@ -15,6 +15,18 @@ from prince_archiver.models.write import (
 
 from .utils import ReadBase
 
+# Primary checksum of each archive, looked up per member so only the
+# checksums of the members read are visited
+primary_checksum = (
+    select(ArchiveChecksum.hex)
+    .where(
+        ArchiveChecksum.event_archive_id == EventArchive.id,
+        ArchiveChecksum.position == 0,
+    )
+    .correlate(EventArchive)
+    .scalar_subquery()
+)
+
 
 class ArchiveMember(ReadBase):
     __table__ = (
@@ -25,13 +37,13 @@ class ArchiveMember(ReadBase):
             ImagingEvent.ref_id,
             ImagingEvent.timestamp,
             ImagingEvent.type,
+            ImagingEvent.experiment_id,
             EventArchive.size,
-            ArchiveChecksum.hex.label("checksum"),
+            primary_checksum.label("checksum"),
         )
         .join_from(DataArchiveMember, ObjectStoreEntry)
         .join_from(ObjectStoreEntry, ImagingEvent)
         .outerjoin_from(ImagingEvent, EventArchive)
-        .outerjoin_from(EventArchive, ArchiveChecksum)
         .subquery()
     )
 
@@ -43,3 +55,4 @@ class ArchiveMember(ReadBase):
     checksum: Mapped[str]
     size: Mapped[int]
     type: Mapped[EventType]
+    experiment_id: Mapped[str]
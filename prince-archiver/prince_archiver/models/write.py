@@ -1,11 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Annotated
 from uuid import UUID, uuid4
 
-from sqlalchemy import BigInteger, ForeignKey, UniqueConstraint, text
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Date,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, QueryableAttribute, mapped_column
 from sqlalchemy.types import TIMESTAMP, Enum, Uuid
 
 from prince_archiver.definitions import Algorithm, EventType, System
@@ -19,6 +29,21 @@ uuid_pk = Annotated[
 ]
 
 
+def utc_date(
+    column: ColumnElement[datetime] | QueryableAttribute[datetime],
+) -> ColumnElement[date]:
+    """
+    UTC calendar date of a timestamp column.
+
+    Unlike `date(timestamptz)` the expression doesn't depend on the session
+    time zone, so postgres can index it.
+    """
+    return func.date(
+        func.timezone(literal_column("'UTC'"), column),
+        type_=Date,
+    )
+
+
 class Base(DeclarativeBase):
     created_at: Mapped[datetime] = mapped_column(default=now)
     updated_at: Mapped[datetime] = mapped_column(default=now, onupdate=now)
@@ -34,7 +59,7 @@ class DataArchiveEntry(Base):
 
     id: Mapped[uuid_pk]
     job_id: Mapped[UUID | None] = mapped_column(Uuid(native_uuid=False), default=None)
-    path: Mapped[str]
+    path: Mapped[str] = mapped_column(index=True)
 
 
 class DataArchiveMember(Base):
@@ -45,9 +70,11 @@ class DataArchiveMember(Base):
 
     src_key: Mapped[str] = mapped_column(
         ForeignKey("object_store_entries.key"),
+        index=True,
     )
     data_archive_entry_id: Mapped[UUID] = mapped_column(
         ForeignKey("data_archive_entries.id"),
+        index=True,
     )
 
 
@@ -57,21 +84,28 @@ class ObjectStoreEntry(Base):
 
     id: Mapped[uuid_pk]
     key: Mapped[str]
-    uploaded_at: Mapped[datetime]
+    uploaded_at: Mapped[datetime] = mapped_column(index=True)
 
     imaging_event_id: Mapped[UUID] = mapped_column(
         ForeignKey("imaging_events.id"),
+        index=True,
     )
 
 
 class ArchiveChecksum(Base):
     __tablename__ = "archive_checksums"
+    __table_args__ = (
+        UniqueConstraint("event_archive_id", "algorithm"),
+        UniqueConstraint("event_archive_id", "position"),
+    )
 
     id: Mapped[uuid_pk]
     hex: Mapped[str]
     algorithm: Mapped[Algorithm] = mapped_column(
         Enum(Algorithm, native_enum=False),
     )
+    # Order in which the checksums were computed, the first being the primary
+    position: Mapped[int] = mapped_column(server_default=text("0"))
 
     event_archive_id: Mapped[UUID] = mapped_column(
         ForeignKey("event_archives.id"),
@@ -87,6 +121,7 @@ class SrcDirInfo(Base):
 
     imaging_event_id: Mapped[UUID] = mapped_column(
         ForeignKey("imaging_events.id"),
+        index=True,
     )
 
 
@@ -98,14 +133,22 @@ class EventArchive(Base):
 
     imaging_event_id: Mapped[UUID] = mapped_column(
         ForeignKey("imaging_events.id"),
+        index=True,
     )
 
 
 class ImagingEvent(Base):
     __tablename__ = "imaging_events"
+    __table_args__ = (
+        # Matches `utc_date(ImagingEvent.timestamp)`
+        Index(
+            "ix_imaging_events_timestamp_utc_date",
+            text("date(timezone('UTC', \"timestamp\"))"),
+        ),
+    )
 
     id: Mapped[uuid_pk]
-    ref_id: Mapped[UUID] = mapped_column(Uuid(native_uuid=False))
+    ref_id: Mapped[UUID] = mapped_column(Uuid(native_uuid=False), unique=True)
     type: Mapped[EventType] = mapped_column(
         Enum(EventType, native_enum=False),
     )
@@ -123,3 +166,18 @@ class ImagingEvent(Base):
         nullable=True,
     )
     system_position: Mapped[int | None]
+
+
+class DailyStatsEntry(Base):
+    """
+    Event, export and archive counts per UTC date.
+
+    Maintained incrementally by the state handlers.
+    """
+
+    __tablename__ = "daily_stats"
+
+    date: Mapped["date"] = mapped_column(primary_key=True)
+    event_count: Mapped[int] = mapped_column(default=0)
+    export_count: Mapped[int] = mapped_column(default=0)
+    archive_count: Mapped[int] = mapped_column(default=0)
@@ -1,12 +1,15 @@
 from .common import CommonImagingEvent
 from .external import NewDataArchiveEntries, NewImagingEvent
 from .internal import (
+    AddDataArchiveEntries,
     AddDataArchiveEntry,
     ArchivedImagingEvent,
     ExportedImagingEvent,
+    ExportedImagingEvents,
     ExportImagingEvent,
     ImportedImagingEvent,
     ImportImagingEvent,
+    ImportImagingEvents,
 )
 from .schema import BaseSchema, Schema
 
@@ -17,9 +20,12 @@ __all__ = (
     "NewImagingEvent",
     "NewDataArchiveEntries",
     "ImportImagingEvent",
+    "ImportImagingEvents",
     "ImportedImagingEvent",
     "ExportImagingEvent",
     "ExportedImagingEvent",
+    "ExportedImagingEvents",
+    "AddDataArchiveEntries",
     "AddDataArchiveEntry",
     "ArchivedImagingEvent",
 )
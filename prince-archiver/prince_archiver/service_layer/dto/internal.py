@@ -13,6 +13,10 @@ class ImportImagingEvent(CommonImagingEvent):
     src_dir_info: SrcDirInfo
 
 
+class ImportImagingEvents(BaseModel):
+    events: list[ImportImagingEvent]
+
+
 class ImportedImagingEvent(ImportImagingEvent):
     id: UUID
 
@@ -33,11 +37,18 @@ class ExportImagingEvent(CommonImagingEvent):
 class ExportedImagingEvent(BaseModel):
     ref_id: UUID
     checksum: Json[Checksum] | Checksum
+    additional_checksums: Json[list[Checksum]] | list[Checksum] = Field(
+        default_factory=list,
+    )
     size: int
     key: str
     timestamp: AwareDatetime = Field(default_factory=now)
 
 
+class ExportedImagingEvents(BaseModel):
+    events: list[ExportedImagingEvent]
+
+
 # Relating to data archive
 class ArchiveMember(BaseModel):
     member_key: str
@@ -51,6 +62,11 @@ class AddDataArchiveEntry(BaseModel):
     members: list[ArchiveMember]
 
 
+class AddDataArchiveEntries(BaseModel):
+    job_id: UUID | None
+    entries: list[AddDataArchiveEntry]
+
+
 class ArchivedImagingEvent(BaseModel):
     src_key: str
     data_archive_entry_id: UUID
@@ -4,12 +4,21 @@ from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from pathlib import Path
 from typing import Any
 
 import s3fs
 
-from prince_archiver.adapters.file import ArchiveFile, MetaData, PathManager
+from prince_archiver.adapters.file import (
+    ArchiveFile,
+    ArchiveInfo,
+    MetaData,
+    PathManager,
+)
+from prince_archiver.adapters.s3 import (
+    ChecksumMismatchError,
+    MultipartUploader,
+    verify_checksums,
+)
 from prince_archiver.adapters.streams import MessageInfo, Stream
 from prince_archiver.domain.value_objects import Checksum
 from prince_archiver.service_layer import dto
@@ -24,9 +33,16 @@ class _ExportInfo:
     key: str
     size: str
     checksum: Checksum
+    additional_checksums: list[Checksum] = field(default_factory=list)
     timestamp: datetime = field(default_factory=now)
 
 
+@dataclass
+class StreamingConfig:
+    part_size: int
+    max_buffered_parts: int = 2
+
+
 SchemaMapperT = Callable[[dto.ExportImagingEvent], dto.BaseSchema]
 
 
@@ -47,12 +63,16 @@ class Exporter:
         *,
         schema_mapper: SchemaMapperT = default_schema_mapper,
         timeout: int = 120,
+        streaming: StreamingConfig | None = None,
+        uploader: MultipartUploader | None = None,
     ):
         self.s3 = s3
         self.key_generator = key_generator
         self.path_manager = path_manager
         self.schema_mapper = schema_mapper
         self.timeout = timeout
+        self.streaming = streaming
+        self.uploader = uploader or MultipartUploader(s3, timeout=timeout)
 
     async def export(self, message: dto.ExportImagingEvent) -> _ExportInfo:
         LOGGER.info(
@@ -62,14 +82,55 @@ class Exporter:
         # Get address to export location
         key = self.key_generator(message)
 
-        async with (
-            self._get_temp_archive(message) as archive_file,
-            asyncio.TaskGroup() as tg,
-        ):
-            t1 = tg.create_task(archive_file.get_info())
-            tg.create_task(self._upload(archive_file.path, key))
+        if self.streaming:
+            archive_info = await self._stream(message, key, self.streaming)
+        else:
+            async with self._get_temp_archive(message) as archive_file:
+                await self._upload(
+                    archive_file,
+                    key,
+                    checkpoint_id=str(message.ref_id),
+                )
+                archive_info = await archive_file.get_info()
 
-        return _ExportInfo(key=key, **asdict(t1.result()))
+        await self._verify(message, key, archive_info)
+
+        return _ExportInfo(key=key, **asdict(archive_info))
+
+    async def _verify(
+        self,
+        message: dto.ExportImagingEvent,
+        key: str,
+        archive_info: ArchiveInfo,
+    ):
+        checksums = [archive_info.checksum, *archive_info.additional_checksums]
+        verified = await verify_checksums(self.s3, key, checksums)
+
+        if verified is None:
+            LOGGER.warning("[%s] No s3 checksum to verify %s with", message.ref_id, key)
+        elif not verified:
+            raise ChecksumMismatchError(f"Checksums of {key} differ from s3")
+
+    async def _stream(
+        self,
+        message: dto.ExportImagingEvent,
+        key: str,
+        config: StreamingConfig,
+    ) -> ArchiveInfo:
+        src_dir = self.path_manager.get_src_dir(message.system, message.local_path)
+        metadata = self._get_metadata(message)
+
+        info_builder = src_dir.get_info_builder()
+        parts = src_dir.iter_archive(
+            chunk_size=config.part_size,
+            max_chunks=config.max_buffered_parts,
+            metadata=metadata,
+            info_builder=info_builder,
+        )
+
+        await self.uploader.upload(key, parts, checkpoint_id=str(message.ref_id))
+
+        return info_builder.info()
 
     @asynccontextmanager
     async def _get_temp_archive(
@@ -85,9 +146,20 @@ class Exporter:
         async with src_dir.get_temp_archive(metadata=metadata) as archive_file:
             yield archive_file
 
-    async def _upload(self, path: Path, key: str, *, timeout: int | None = None):
-        async with asyncio.timeout(timeout or self.timeout):
-            await self.s3._put_file(path, key)
+    async def _upload(
+        self,
+        archive_file: ArchiveFile,
+        key: str,
+        *,
+        checkpoint_id: str | None = None,
+    ):
+        size = await archive_file.get_size()
+        async with asyncio.timeout(self.uploader.get_timeout(size)):
+            await self.uploader.upload_file(
+                archive_file.path,
+                key,
+                checkpoint_id=checkpoint_id,
+            )
 
     def _get_metadata(self, message: dto.ExportImagingEvent) -> MetaData:
         schema = self.schema_mapper(message)
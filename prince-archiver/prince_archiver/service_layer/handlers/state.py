@@ -1,7 +1,11 @@
 """Handlers used to import imaging event into system."""
 
 import logging
+from datetime import datetime
+from enum import StrEnum, auto
+from uuid import UUID
 
+from prince_archiver.adapters.repository import ImagingEventExport
 from prince_archiver.domain import models
 from prince_archiver.domain.value_objects import Checksum
 from prince_archiver.service_layer import dto
@@ -11,65 +15,124 @@ from prince_archiver.service_layer.uow import AbstractUnitOfWork
 LOGGER = logging.getLogger(__name__)
 
 
-async def import_imaging_event(
-    message: dto.ImportImagingEvent,
+class ExportOutcome(StrEnum):
+    PERSISTED = auto()
+    DUPLICATE = auto()
+    MISSING = auto()
+
+
+async def import_imaging_events(
+    message: dto.ImportImagingEvents,
     uow: AbstractUnitOfWork,
 ):
-    LOGGER.info("[%s] Importing imaging event", message.ref_id)
+    """
+    Import a batch of imaging events in a single transaction.
 
-    async with uow:
-        if await uow.imaging_events.get_by_ref_id(message.ref_id):
-            raise ServiceLayerException("Already imported.")
+    Events already imported, or repeated within the batch, are skipped.
+    """
+    LOGGER.info("Importing %d imaging events", len(message.events))
 
-        imaging_event = models.ImagingEvent.factory(
-            **message.model_dump(exclude={"src_dir_info"}, by_alias=True),
-            src_dir_info=models.SrcDirInfo(**message.src_dir_info.model_dump()),
+    async with uow:
+        seen_ref_ids = await uow.imaging_events.get_existing_ref_ids(
+            event.ref_id for event in message.events
         )
 
-        uow.imaging_events.add(imaging_event)
+        candidates: list[tuple[dto.ImportImagingEvent, models.ImagingEvent]] = []
+        for event in message.events:
+            if event.ref_id in seen_ref_ids:
+                LOGGER.info("[%s] Already imported", event.ref_id)
+                continue
+            seen_ref_ids.add(event.ref_id)
+
+            imaging_event = models.ImagingEvent.factory(
+                **event.model_dump(exclude={"src_dir_info"}, by_alias=True),
+                src_dir_info=models.SrcDirInfo(**event.src_dir_info.model_dump()),
+            )
+            candidates.append((event, imaging_event))
 
-        uow.add_message(
-            dto.ImportedImagingEvent(
-                id=imaging_event.id,
-                **message.model_dump(),
-            ),
+        # Events imported concurrently since the lookup are skipped on insert
+        inserted_ref_ids = await uow.imaging_events.add_many(
+            imaging_event for _, imaging_event in candidates
         )
 
+        imaging_events: list[models.ImagingEvent] = []
+        for event, imaging_event in candidates:
+            if imaging_event.ref_id not in inserted_ref_ids:
+                LOGGER.info("[%s] Already imported", event.ref_id)
+                continue
+
+            imaging_events.append(imaging_event)
+            uow.add_message(
+                dto.ImportedImagingEvent(
+                    id=imaging_event.id,
+                    **event.model_dump(),
+                ),
+            )
+
+        await uow.daily_stats.record_events(item.timestamp for item in imaging_events)
+
         await uow.commit()
 
-    LOGGER.info("[%s] Imported imaging event", message.ref_id)
+    LOGGER.info("Imported %d imaging events", len(imaging_events))
 
 
-async def persist_imaging_event_export(
-    message: dto.ExportedImagingEvent,
+async def persist_imaging_event_exports(
+    message: dto.ExportedImagingEvents,
     uow: AbstractUnitOfWork,
-):
+) -> list[ExportOutcome]:
     """
-    Persist imaging event export.
+    Persist a batch of imaging event exports in a single transaction.
+
+    Returns the outcome of each export, in order. Exports of events which
+    have not been imported yet are reported as missing and not persisted.
     """
-    LOGGER.info("[%s] Persisting export", message.ref_id)
+    LOGGER.info("Persisting %d exports", len(message.events))
+
+    outcomes: list[ExportOutcome] = []
+    exports: list[ImagingEventExport] = []
+    exported_timestamps: list[datetime] = []
+    persisted_ref_ids: set[UUID] = set()
 
     async with uow:
-        imaging_event = await uow.imaging_events.get_by_ref_id(message.ref_id)
-        if not imaging_event:
-            raise ServiceLayerException("Rejecting persistence")
-
-        imaging_event.add_event_archive(
-            models.EventArchive(
-                size=message.size,
-                checksum=Checksum(**message.checksum.model_dump()),
-            )
+        refs = await uow.imaging_events.get_refs(
+            event.ref_id for event in message.events
         )
 
-        imaging_event.add_object_store_entry(
-            models.ObjectStoreEntry(
-                key=message.key,
-                uploaded_at=message.timestamp,
+        for event in message.events:
+            ref = refs.get(event.ref_id)
+            if not ref:
+                outcomes.append(ExportOutcome.MISSING)
+                continue
+
+            if ref.is_exported or event.ref_id in persisted_ref_ids:
+                outcomes.append(ExportOutcome.DUPLICATE)
+                continue
+
+            checksums = [event.checksum, *event.additional_checksums]
+            exports.append(
+                ImagingEventExport(
+                    imaging_event_id=ref.id,
+                    event_archive=models.EventArchive(
+                        size=event.size,
+                        checksums=[Checksum(**item.model_dump()) for item in checksums],
+                    ),
+                    object_store_entry=models.ObjectStoreEntry(
+                        key=event.key,
+                        uploaded_at=event.timestamp,
+                    ),
+                ),
             )
-        )
+            persisted_ref_ids.add(event.ref_id)
+            exported_timestamps.append(ref.timestamp)
+            outcomes.append(ExportOutcome.PERSISTED)
+
+        await uow.imaging_events.add_exports(exports)
+        await uow.daily_stats.record_exports(exported_timestamps)
         await uow.commit()
 
-    LOGGER.info("[%s] Persisted export", message.ref_id)
+    LOGGER.info("Persisted %d exports", len(exports))
+
+    return outcomes
 
 
 async def add_data_archive_entry(
@@ -90,6 +153,9 @@ async def add_data_archive_entry(
         )
 
         uow.data_archive.add(entry)
+        await uow.daily_stats.record_archived(
+            member.src_key for member in entry.members
+        )
 
         for member in entry.members:
             uow.add_message(
@@ -100,3 +166,49 @@ async def add_data_archive_entry(
             )
 
         await uow.commit()
+
+
+async def add_data_archive_entries(
+    message: dto.AddDataArchiveEntries,
+    uow: AbstractUnitOfWork,
+):
+    """
+    Add a set of data archive entries in a single transaction.
+
+    Entries whose path already exists are skipped.
+    """
+    LOGGER.info(
+        "[%s] Adding %d archive entries",
+        message.job_id,
+        len(message.entries),
+    )
+
+    async with uow:
+        seen_paths = await uow.data_archive.get_existing_paths(
+            item.path for item in message.entries
+        )
+
+        entries: list[models.DataArchiveEntry] = []
+        for item in message.entries:
+            if item.path in seen_paths:
+                LOGGER.info("[%s] Already exists %s", message.job_id, item.path)
+                continue
+            seen_paths.add(item.path)
+
+            entries.append(
+                models.DataArchiveEntry(
+                    **item.model_dump(exclude={"members"}),
+                    members=[
+                        models.ArchiveMember(**member.model_dump())
+                        for member in item.members
+                    ],
+                ),
+            )
+
+        await uow.data_archive.add_many(entries)
+        await uow.daily_stats.record_archived(
+            member.src_key for entry in entries for member in entry.members
+        )
+        await uow.commit()
+
+    LOGGER.info("[%s] Added %d archive entries", message.job_id, len(entries))
@@ -5,8 +5,10 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from prince_archiver.adapters.repository import (
+    AbstractDailyStatsRepo,
     AbstractDataArchiveEntryRepo,
     AbstractImagingEventRepo,
+    DailyStatsRepo,
     DataArchiveEntryRepo,
     ImagingEventRepo,
 )
@@ -26,6 +28,7 @@ class AbstractUnitOfWork(ABC):
 
     data_archive: AbstractDataArchiveEntryRepo
     imaging_events: AbstractImagingEventRepo
+    daily_stats: AbstractDailyStatsRepo
 
     @abstractmethod
     async def __aenter__(self) -> "AbstractUnitOfWork": ...
@@ -52,6 +55,7 @@ class UnitOfWork(AbstractUnitOfWork):
 
     data_archive: DataArchiveEntryRepo
     imaging_events: ImagingEventRepo
+    daily_stats: DailyStatsRepo
 
     def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
         self.session_maker = session_maker
@@ -63,6 +67,7 @@ class UnitOfWork(AbstractUnitOfWork):
         # Initialize repos
         self.data_archive = DataArchiveEntryRepo(self.session)
         self.imaging_events = ImagingEventRepo(self.session)
+        self.daily_stats = DailyStatsRepo(self.session)
 
         return self
 
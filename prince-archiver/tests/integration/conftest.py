@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from pathlib import Path
 from typing import AsyncGenerator
 from uuid import UUID, uuid4
@@ -154,6 +154,16 @@ def fixture_src_dir_info(
     )
 
 
+@pytest.fixture(name="daily_stats_entry")
+def fixture_daily_stats_entry() -> data_models.DailyStatsEntry:
+    return data_models.DailyStatsEntry(
+        date=date(2000, 1, 1),
+        event_count=1,
+        export_count=1,
+        archive_count=1,
+    )
+
+
 @pytest.fixture(name="seed_data")
 async def fixture_seed_data(
     data_archive_entry: data_models.DataArchiveEntry,
@@ -163,6 +173,7 @@ async def fixture_seed_data(
     src_dir_info: data_models.SrcDirInfo,
     event_archive: data_models.EventArchive,
     checksum: data_models.ArchiveChecksum,
+    daily_stats_entry: data_models.DailyStatsEntry,
     session: AsyncSession,
 ):
     items = [
@@ -173,6 +184,7 @@ async def fixture_seed_data(
         object_store_entry,
         data_archive_entry,
         data_archive_member,
+        daily_stats_entry,
     ]
 
     for object in items:
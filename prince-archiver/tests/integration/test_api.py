@@ -1,32 +1,48 @@
+import json
 from datetime import UTC, datetime
 from typing import AsyncGenerator
 from unittest.mock import AsyncMock
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from prince_archiver.adapters.presign import AbstractUrlSigner
+from prince_archiver.adapters.response_cache import ARCHIVES_TAG, LocalResponseCache
 from prince_archiver.api.deps import (
-    get_file_system,
+    get_response_cache,
     get_session,
+    get_sessionmaker,
+    get_url_signer,
 )
 from prince_archiver.definitions import EventType
 from prince_archiver.entrypoints.state_manager.app import create_app
 from prince_archiver.entrypoints.state_manager.state import State
+from prince_archiver.models import write as data_models
+
+
+@pytest.fixture(name="response_cache")
+def fixture_response_cache() -> LocalResponseCache:
+    return LocalResponseCache()
 
 
 @pytest.fixture(name="client")
 async def fixture_client(
     session: AsyncSession,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    response_cache: LocalResponseCache,
 ) -> AsyncGenerator[AsyncClient, None]:
     app = create_app(_state=AsyncMock(State))
 
-    file_system = AsyncMock()
-    file_system._url.return_value = "http://test.com"
+    url_signer = AsyncMock(AbstractUrlSigner)
+    url_signer.sign.return_value = "http://test.com"
 
-    app.dependency_overrides[get_file_system] = lambda: file_system
+    app.dependency_overrides[get_url_signer] = lambda: url_signer
     app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
 
     client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
     async with client:
@@ -48,6 +64,7 @@ async def test_list_exports(client: AsyncClient):
     )
     expected_response = {
         "count": 1,
+        "next_cursor": None,
         "data": [
             {
                 "ref_id": "0b036a6a-5ba7-45ae-a242-90106014b08d",
@@ -62,6 +79,20 @@ async def test_list_exports(client: AsyncClient):
     assert response.json() == expected_response
 
 
+@pytest.mark.usefixtures("seed_data")
+async def test_list_exports_without_url(client: AsyncClient):
+    response = await client.get(
+        "/api/1/exports",
+        params={
+            "start": datetime(1900, 1, 1, tzinfo=UTC),
+            "with_url": False,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"][0]["url"] is None
+
+
 @pytest.mark.usefixtures("seed_data")
 @pytest.mark.usefixtures("seed_data")
 @pytest.mark.parametrize(
@@ -89,6 +120,103 @@ async def test_list_exports_filtering(
     assert json_response["count"] == expected_count
 
 
+@pytest.fixture(name="exports")
+async def fixture_exports(session: AsyncSession) -> list[str]:
+    keys = []
+    for index in range(5):
+        imaging_event = data_models.ImagingEvent(
+            id=uuid4(),
+            ref_id=uuid4(),
+            type=EventType.STITCH,
+            experiment_id="test_experiment_id",
+            timestamp=datetime(2000, 1, 1, tzinfo=UTC),
+        )
+        # Pairs of exports share an upload time
+        uploaded_at = datetime(2001, 1, 1 + index // 2, tzinfo=UTC)
+
+        session.add(imaging_event)
+        session.add(
+            data_models.ObjectStoreEntry(
+                key=f"test/{index}",
+                uploaded_at=uploaded_at,
+                imaging_event_id=imaging_event.id,
+            ),
+        )
+        keys.append((uploaded_at, imaging_event.ref_id.hex))
+
+    await session.commit()
+
+    return [str(UUID(ref_id)) for _, ref_id in sorted(keys)]
+
+
+async def test_list_exports_with_cursor(client: AsyncClient, exports: list[str]):
+    params: dict = {
+        "start": datetime(1900, 1, 1, tzinfo=UTC),
+        "limit": 2,
+        "with_count": False,
+    }
+
+    ref_ids = []
+    while True:
+        response = await client.get("/api/1/exports", params=params)
+        assert response.status_code == 200
+
+        json_response: dict = response.json()
+        assert json_response["count"] is None
+        ref_ids.extend(item["ref_id"] for item in json_response["data"])
+
+        if not json_response["next_cursor"]:
+            break
+        params["cursor"] = json_response["next_cursor"]
+
+    assert ref_ids == exports
+
+
+async def test_list_exports_cached_for_explicit_past_range(
+    client: AsyncClient,
+    response_cache: LocalResponseCache,
+):
+    response = await client.get("/api/1/exports")
+    assert response.status_code == 200
+    assert not response_cache._cache
+
+    response = await client.get(
+        "/api/1/exports",
+        params={"end": datetime(2001, 1, 1, tzinfo=UTC)},
+    )
+    assert response.status_code == 200
+    assert not response_cache._cache
+
+    response = await client.get(
+        "/api/1/exports",
+        params={
+            "start": datetime(2000, 12, 1, tzinfo=UTC),
+            "end": datetime(2001, 1, 1, tzinfo=UTC),
+        },
+    )
+    assert response.status_code == 200
+    assert len(response_cache._cache) == 1
+
+
+async def test_stream_exports(client: AsyncClient, exports: list[str]):
+    response = await client.get(
+        "/api/1/exports/stream",
+        params={"start": datetime(1900, 1, 1, tzinfo=UTC)},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["ref_id"] for row in rows] == exports
+    assert rows[0]["url"] == "http://test.com/"
+
+
+async def test_list_exports_invalid_cursor(client: AsyncClient):
+    response = await client.get("/api/1/exports", params={"cursor": "invalid"})
+    assert response.status_code == 400
+
+
 @pytest.mark.usefixtures("seed_data")
 async def test_list_archives(client: AsyncClient):
     response = await client.get("/api/1/archives")
@@ -97,6 +225,7 @@ async def test_list_archives(client: AsyncClient):
 
     expected_json = {
         "count": 1,
+        "next_cursor": None,
         "data": [
             {
                 "id": "61159839-7745-466b-b78b-82f4c462fd6a",
@@ -161,3 +290,41 @@ async def test_read_archive(client: AsyncClient):
 async def test_read_archive_not_found(client: AsyncClient):
     response = await client.get(f"/api/1/archives/{uuid4()}")
     assert response.status_code == 404
+
+
+@pytest.mark.usefixtures("seed_data")
+async def test_read_archive_not_modified(client: AsyncClient):
+    url = "/api/1/archives/611598397745466bb78b82f4c462fd6a"
+
+    response = await client.get(url)
+    etag = response.headers["etag"]
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.usefixtures("seed_data")
+async def test_read_archive_cache_invalidated(
+    client: AsyncClient,
+    session: AsyncSession,
+    response_cache: LocalResponseCache,
+):
+    url = "/api/1/archives/611598397745466bb78b82f4c462fd6a"
+
+    response = await client.get(url)
+    assert response.json()["path"] == "images/test_experiment_id/test.tar"
+
+    await session.execute(
+        update(data_models.DataArchiveEntry).values(path="images/moved.tar"),
+    )
+    await session.commit()
+
+    response = await client.get(url)
+    assert response.json()["path"] == "images/test_experiment_id/test.tar"
+
+    await response_cache.invalidate([ARCHIVES_TAG])
+
+    response = await client.get(url)
+    assert response.json()["path"] == "images/moved.tar"
@@ -1,12 +1,23 @@
+import io
 import tarfile
-from hashlib import sha256
+import zlib
+from hashlib import blake2b, sha256
 from pathlib import Path
 from uuid import uuid4
 
 import pytest
 
-from prince_archiver.adapters.file.checksum import ChecksumFactory
-from prince_archiver.adapters.file.file_system import AsyncFileSystem, MetaData
+from prince_archiver.adapters.file.checksum import (
+    ChecksumBuilder,
+    ChecksumFactory,
+    HashingEngine,
+)
+from prince_archiver.adapters.file.file_system import (
+    ArchiveInfoBuilder,
+    AsyncFileSystem,
+    MetaData,
+)
+from prince_archiver.definitions import Algorithm
 
 pytestmark = pytest.mark.integration
 
@@ -40,6 +51,81 @@ async def test_get_checksum():
     assert checksum.hex == sha256(b"test").hexdigest()
 
 
+def test_checksum_builder_multiple_algorithms():
+    builder = ChecksumBuilder(Algorithm.SHA256, Algorithm.BLAKE2B, Algorithm.CRC32)
+    builder.update(b"te")
+    builder.update(b"st")
+
+    assert [item.hex for item in builder.checksums()] == [
+        sha256(b"test").hexdigest(),
+        blake2b(b"test").hexdigest(),
+        f"{zlib.crc32(b'test'):08x}",
+    ]
+    assert builder.checksum().algorithm == Algorithm.SHA256
+
+
+async def test_tar_tree_additional_checksums(
+    src_file_path: Path,
+    tmp_path: Path,
+):
+    file_system = AsyncFileSystem(algorithms=(Algorithm.SHA256, Algorithm.CRC32))
+    target_path = tmp_path / uuid4().hex
+
+    info = await file_system.tar_tree(src_file_path.parent, target_path)
+
+    assert info.checksum.algorithm == Algorithm.SHA256
+    assert info.additional_checksums[0].hex == (
+        f"{zlib.crc32(target_path.read_bytes()):08x}"
+    )
+
+
+async def test_get_checksum_with_hashing_engine(src_file_path: Path):
+    engine = HashingEngine(max_concurrency=1)
+    file_system = AsyncFileSystem(hashing_engine=engine)
+
+    checksum = await file_system.get_checksum(src_file_path, chunk_size=3)
+    engine.shutdown()
+
+    assert checksum.hex == sha256(b'{"a": 1}').hexdigest()
+    assert engine.metrics.bytes_hashed == len(b'{"a": 1}')
+
+
+async def test_iter_tar_with_hashing_engine(src_dir: Path):
+    (src_dir / "large.bin").write_bytes(bytes(range(256)) * 64)
+
+    engine = HashingEngine(max_concurrency=1)
+    file_system = AsyncFileSystem(
+        algorithms=(Algorithm.SHA256, Algorithm.CRC32),
+        hashing_engine=engine,
+    )
+
+    info_builder = file_system.get_info_builder()
+    chunks = [
+        chunk
+        async for chunk in file_system.iter_tar(
+            src_dir,
+            chunk_size=1024,
+            info_builder=info_builder,
+        )
+    ]
+    engine.shutdown()
+
+    data = b"".join(chunks)
+    info = info_builder.info()
+    assert info.checksum.hex == sha256(data).hexdigest()
+    assert info.additional_checksums[0].hex == f"{zlib.crc32(data):08x}"
+    assert engine.metrics.bytes_hashed == len(data)
+
+
+async def test_get_checksum_uses_primary_algorithm(src_file_path: Path):
+    file_system = AsyncFileSystem(algorithms=[Algorithm.BLAKE2B, Algorithm.SHA256])
+
+    checksum = await file_system.get_checksum(src_file_path, chunk_size=3)
+
+    assert checksum.algorithm == Algorithm.BLAKE2B
+    assert checksum.hex == blake2b(b'{"a": 1}').hexdigest()
+
+
 async def test_copy_tree(
     file_system: AsyncFileSystem,
     src_dir: Path,
@@ -76,6 +162,33 @@ async def test_iter_bytes(
     assert await anext(file_system.iter_bytes(src_file_path, None)) == b'{"a": 1}'
 
 
+async def test_iter_bytes_chunked(
+    file_system: AsyncFileSystem,
+    src_file_path: Path,
+):
+    chunks = [chunk async for chunk in file_system.iter_bytes(src_file_path, 3)]
+
+    assert chunks == [b'{"a', b'": ', b"1}"]
+
+
+async def test_iter_buffer(
+    file_system: AsyncFileSystem,
+    src_file_path: Path,
+):
+    chunks = [bytes(view) async for view in file_system.iter_buffer(src_file_path, 3)]
+
+    assert chunks == [b'{"a', b'": ', b"1}"]
+
+
+async def test_get_checksum_covers_whole_file(
+    file_system: AsyncFileSystem,
+    src_file_path: Path,
+):
+    checksum = await file_system.get_checksum(src_file_path, chunk_size=3)
+
+    assert checksum.hex == sha256(b'{"a": 1}').hexdigest()
+
+
 async def test_list_dir(
     file_system: AsyncFileSystem,
     src_file_path: Path,
@@ -91,14 +204,58 @@ async def test_tar_tree(
 ):
     metadata = MetaData(content=b"test")
     target_path = tmp_path / uuid4().hex
-    await file_system.tar_tree(src_file_path.parent, target_path, metadata=metadata)
+    info = await file_system.tar_tree(
+        src_file_path.parent,
+        target_path,
+        metadata=metadata,
+    )
 
     assert target_path.exists()
+    assert info.size == target_path.stat().st_size
+    assert info.checksum.hex == sha256(target_path.read_bytes()).hexdigest()
 
     with tarfile.open(target_path, "r") as tar:
         assert set(tar.getnames()) == {".", "./metadata.json", "./test.json"}
 
 
+async def test_iter_tar(
+    file_system: AsyncFileSystem,
+    src_file_path: Path,
+):
+    metadata = MetaData(content=b"test")
+    info_builder = ArchiveInfoBuilder()
+    chunks = [
+        chunk
+        async for chunk in file_system.iter_tar(
+            src_file_path.parent,
+            metadata,
+            chunk_size=1024,
+            info_builder=info_builder,
+        )
+    ]
+
+    assert all(len(chunk) == 1024 for chunk in chunks[:-1])
+
+    info = info_builder.info()
+    assert info.size == sum(map(len, chunks))
+    assert info.checksum.hex == sha256(b"".join(chunks)).hexdigest()
+
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks)), mode="r") as tar:
+        assert set(tar.getnames()) == {".", "./metadata.json", "./test.json"}
+
+
+async def test_iter_tar_stops_producer_on_close(
+    file_system: AsyncFileSystem,
+    src_dir: Path,
+):
+    (src_dir / "large.bin").write_bytes(bytes(64 * 1024))
+
+    iterator = file_system.iter_tar(src_dir, chunk_size=1024, max_chunks=1)
+    assert await anext(iterator)
+
+    await iterator.aclose()
+
+
 async def test_get_size(
     file_system: AsyncFileSystem,
     src_file_path: Path,
@@ -110,8 +267,9 @@ async def test_get_temp_archive(
     file_system: AsyncFileSystem,
     src_dir: Path,
 ):
-    async with file_system.get_temp_archive(src_dir) as target_path:
+    async with file_system.get_temp_archive(src_dir) as (target_path, info):
         assert target_path.exists()
+        assert info.size == target_path.stat().st_size
 
     assert not target_path.exists()
 
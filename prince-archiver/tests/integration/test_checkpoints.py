@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+import pytest
+from testcontainers.redis import AsyncRedisContainer
+
+from prince_archiver.adapters.checkpoints import (
+    CheckpointStore,
+    UploadCheckpoint,
+    UploadedPart,
+)
+
+
+@pytest.fixture(name="redis_container", scope="module")
+def fixture_redis_container():
+    with AsyncRedisContainer() as container:
+        yield container
+
+
+@pytest.fixture(name="checkpoint_store")
+async def fixture_checkpoint_store(redis_container: AsyncRedisContainer):
+    redis = await redis_container.get_async_client()
+
+    yield CheckpointStore(redis)
+
+    await redis.aclose()
+
+
+async def test_checkpoint_round_trip(checkpoint_store: CheckpointStore):
+    id = uuid4().hex
+
+    await checkpoint_store.start(
+        id,
+        UploadCheckpoint(key="test-bucket/test.tar", upload_id="test-id", part_size=2),
+    )
+    await checkpoint_store.add_part(id, UploadedPart(1, '"etag-1"', 2))
+    await checkpoint_store.add_part(id, UploadedPart(3, '"etag-3"', 2))
+
+    checkpoint = await checkpoint_store.get(id)
+
+    assert checkpoint == UploadCheckpoint(
+        key="test-bucket/test.tar",
+        upload_id="test-id",
+        part_size=2,
+        parts={
+            1: UploadedPart(1, '"etag-1"', 2),
+            3: UploadedPart(3, '"etag-3"', 2),
+        },
+    )
+
+
+async def test_checkpoint_cleared(checkpoint_store: CheckpointStore):
+    id = uuid4().hex
+
+    await checkpoint_store.start(
+        id,
+        UploadCheckpoint(key="test-bucket/test.tar", upload_id="test-id", part_size=2),
+    )
+    await checkpoint_store.clear(id)
+
+    assert await checkpoint_store.get(id) is None
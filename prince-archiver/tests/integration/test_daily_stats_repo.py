@@ -0,0 +1,55 @@
+from datetime import UTC, date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from prince_archiver.adapters.repository import DailyStatsRepo
+from prince_archiver.models.write import DailyStatsEntry
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def repo(session: AsyncSession) -> DailyStatsRepo:
+    return DailyStatsRepo(session)
+
+
+async def get_counts(session: AsyncSession) -> dict[date, tuple[int, int, int]]:
+    result = await session.scalars(select(DailyStatsEntry))
+    return {
+        item.date: (item.event_count, item.export_count, item.archive_count)
+        for item in result.all()
+    }
+
+
+async def test_record_events_and_exports(repo: DailyStatsRepo):
+    await repo.record_events(
+        [
+            datetime(2010, 1, 1, 12, tzinfo=UTC),
+            # 2010-01-01T23:00:00 UTC
+            datetime(2010, 1, 2, 1, tzinfo=timezone(timedelta(hours=2))),
+            datetime(2010, 1, 2, 12, tzinfo=UTC),
+        ],
+    )
+    await repo.record_events([datetime(2010, 1, 1, 13, tzinfo=UTC)])
+    await repo.record_exports([datetime(2010, 1, 1, 13, tzinfo=UTC)])
+
+    assert await get_counts(repo.session) == {
+        date(2010, 1, 1): (3, 1, 0),
+        date(2010, 1, 2): (1, 0, 0),
+    }
+
+
+@pytest.mark.usefixtures("seed_data")
+async def test_record_archived(repo: DailyStatsRepo):
+    await repo.record_archived(["test/key", "test/key", "unknown/key"])
+
+    assert await get_counts(repo.session) == {date(2000, 1, 1): (1, 1, 3)}
+
+
+async def test_record_nothing(repo: DailyStatsRepo):
+    await repo.record_events([])
+    await repo.record_archived([])
+
+    assert await get_counts(repo.session) == {}
@@ -41,3 +41,23 @@ async def test_get_by_path(repo: DataArchiveEntryRepo):
     # test with valid path
     data_archive_entry = await repo.get_by_path("images/test_experiment_id/test.tar")
     assert data_archive_entry
+
+
+async def test_add_many(repo: DataArchiveEntryRepo):
+    entries = [
+        DataArchiveEntry(id=uuid4(), job_id=None, path=f"test_path/{uuid4().hex}")
+        for _ in range(2)
+    ]
+
+    await repo.add_many(entries)
+    await repo.session.commit()
+
+    paths = {item.path for item in entries}
+    assert await repo.get_existing_paths(paths) == paths
+
+
+@pytest.mark.usefixtures("seed_data")
+async def test_get_existing_paths(repo: DataArchiveEntryRepo):
+    path = "images/test_experiment_id/test.tar"
+
+    assert await repo.get_existing_paths([path, "nonexistent/path"]) == {path}
@@ -6,9 +6,15 @@ import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from prince_archiver.adapters.repository import ImagingEventRepo
-from prince_archiver.definitions import EventType, System
-from prince_archiver.domain.models import ImagingEvent, SrcDirInfo
+from prince_archiver.adapters.repository import ImagingEventExport, ImagingEventRepo
+from prince_archiver.definitions import Algorithm, EventType, System
+from prince_archiver.domain.models import (
+    EventArchive,
+    ImagingEvent,
+    ObjectStoreEntry,
+    SrcDirInfo,
+)
+from prince_archiver.domain.value_objects import Checksum
 
 pytestmark = pytest.mark.integration
 
@@ -63,3 +69,97 @@ async def test_get_by_ref_id(repo: ImagingEventRepo):
 
     imaging_events = await repo.get_by_ref_id(UUID("0b036a6a5ba745aea24290106014b08d"))
     assert imaging_events
+
+
+@pytest.mark.usefixtures("seed_data")
+async def test_get_existing_ref_ids(repo: ImagingEventRepo):
+    ref_id = UUID("0b036a6a5ba745aea24290106014b08d")
+
+    assert await repo.get_existing_ref_ids([ref_id, uuid4()]) == {ref_id}
+    assert await repo.get_existing_ref_ids([]) == set()
+
+
+async def test_add_many(repo: ImagingEventRepo):
+    stitch_events = [
+        ImagingEvent.factory(
+            ref_id=uuid4(),
+            system=System.PRINCE,
+            experiment_id="experiment_id",
+            timestamp=datetime.now(),
+            type=EventType.STITCH,
+            raw_metadata={"key": "value"},
+            src_dir_info=SrcDirInfo(
+                local_path=Path("test/path"),
+                img_count=10,
+            ),
+        )
+        for _ in range(2)
+    ]
+
+    ref_ids = {item.ref_id for item in stitch_events}
+
+    assert await repo.add_many(stitch_events) == ref_ids
+    await repo.session.commit()
+
+    assert await repo.get_existing_ref_ids(ref_ids) == ref_ids
+
+    # Redelivered events are skipped rather than violating the constraint
+    assert await repo.add_many(stitch_events) == set()
+    await repo.session.commit()
+
+    stmt = text("SELECT COUNT(*) FROM src_dir_info WHERE imaging_event_id=:id")
+    for item in stitch_events:
+        result = await repo.session.scalar(stmt.bindparams(id=item.id.hex))
+        assert result == 1
+
+
+async def test_add_exports(repo: ImagingEventRepo):
+    stitch_event = ImagingEvent.factory(
+        ref_id=uuid4(),
+        system=System.PRINCE,
+        experiment_id="experiment_id",
+        timestamp=datetime.now(),
+        type=EventType.STITCH,
+        raw_metadata={"key": "value"},
+        src_dir_info=SrcDirInfo(
+            local_path=Path("test/path"),
+            img_count=10,
+        ),
+    )
+    repo.add(stitch_event)
+    await repo.session.commit()
+
+    refs = await repo.get_refs([stitch_event.ref_id])
+    assert refs[stitch_event.ref_id].id == stitch_event.id
+    assert not refs[stitch_event.ref_id].is_exported
+
+    await repo.add_exports(
+        [
+            ImagingEventExport(
+                imaging_event_id=stitch_event.id,
+                event_archive=EventArchive(
+                    size=1024,
+                    checksums=[
+                        Checksum(hex="primary", algorithm=Algorithm.BLAKE2B),
+                        Checksum(hex="additional", algorithm=Algorithm.SHA256),
+                    ],
+                ),
+                object_store_entry=ObjectStoreEntry(
+                    key=f"test/{stitch_event.ref_id}.tar",
+                    uploaded_at=datetime.now(),
+                ),
+            ),
+        ],
+    )
+    await repo.session.commit()
+
+    refs = await repo.get_refs([stitch_event.ref_id])
+    assert refs[stitch_event.ref_id].is_exported
+
+    repo.session.expire_all()
+    imaging_event = await repo.get_by_ref_id(stitch_event.ref_id)
+    assert imaging_event and imaging_event.event_archive
+    assert [item.hex for item in imaging_event.event_archive.checksums] == [
+        "primary",
+        "additional",
+    ]
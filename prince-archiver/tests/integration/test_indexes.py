@@ -0,0 +1,135 @@
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import Select, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from prince_archiver.definitions import EventType
+from prince_archiver.models import write as data_models
+
+pytestmark = pytest.mark.integration
+
+EVENT_COUNT = 500
+
+
+@pytest.fixture(name="seeded_session")
+async def fixture_seeded_session(session: AsyncSession) -> AsyncSession:
+    start = datetime(2000, 1, 1, tzinfo=UTC)
+
+    events, entries, members, object_store_entries = [], [], [], []
+    for i in range(EVENT_COUNT):
+        event_id, entry_id = uuid4(), uuid4()
+        key = f"images/{i}.tar"
+
+        events.append(
+            {
+                "id": event_id,
+                "ref_id": uuid4(),
+                "type": EventType.STITCH,
+                "experiment_id": "test_experiment_id",
+                "timestamp": start + timedelta(hours=i),
+            },
+        )
+        object_store_entries.append(
+            {
+                "key": key,
+                "uploaded_at": start + timedelta(hours=i),
+                "imaging_event_id": event_id,
+            },
+        )
+        entries.append({"id": entry_id, "path": f"archives/{i}.tar"})
+        members.append(
+            {
+                "member_key": key,
+                "src_key": key,
+                "data_archive_entry_id": entry_id,
+            },
+        )
+
+    for model, rows in (
+        (data_models.ImagingEvent, events),
+        (data_models.ObjectStoreEntry, object_store_entries),
+        (data_models.DataArchiveEntry, entries),
+        (data_models.DataArchiveMember, members),
+    ):
+        await session.execute(insert(model), rows)
+
+    await session.execute(text("ANALYZE"))
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    return session
+
+
+async def explain(session: AsyncSession, stmt: Select) -> str:
+    compiled = stmt.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    result = await session.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(result.scalars())
+
+
+@pytest.mark.parametrize(
+    "stmt, index_name",
+    [
+        (
+            select(data_models.ImagingEvent).where(
+                data_models.ImagingEvent.ref_id
+                == UUID("0b036a6a5ba745aea24290106014b08d"),
+            ),
+            "imaging_events_ref_id_key",
+        ),
+        (
+            select(data_models.ImagingEvent).where(
+                data_models.utc_date(data_models.ImagingEvent.timestamp)
+                == date(2000, 1, 2),
+            ),
+            "ix_imaging_events_timestamp_utc_date",
+        ),
+        (
+            select(data_models.DataArchiveEntry).where(
+                data_models.DataArchiveEntry.path == "archives/1.tar",
+            ),
+            "ix_data_archive_entries_path",
+        ),
+        (
+            select(data_models.ObjectStoreEntry)
+            .where(
+                data_models.ObjectStoreEntry.uploaded_at
+                > datetime(2000, 1, 10, tzinfo=UTC),
+            )
+            .order_by(data_models.ObjectStoreEntry.uploaded_at)
+            .limit(10),
+            "ix_object_store_entries_uploaded_at",
+        ),
+        (
+            select(data_models.ObjectStoreEntry).where(
+                data_models.ObjectStoreEntry.imaging_event_id
+                == UUID("0b036a6a5ba745aea24290106014b08d"),
+            ),
+            "ix_object_store_entries_imaging_event_id",
+        ),
+        (
+            select(data_models.DataArchiveMember).where(
+                data_models.DataArchiveMember.data_archive_entry_id
+                == UUID("611598397745466bb78b82f4c462fd6a"),
+            ),
+            "ix_data_archive_members_data_archive_entry_id",
+        ),
+        (
+            select(data_models.DataArchiveMember).where(
+                data_models.DataArchiveMember.src_key == "images/1.tar",
+            ),
+            "ix_data_archive_members_src_key",
+        ),
+    ],
+)
+async def test_lookup_uses_index(
+    seeded_session: AsyncSession,
+    stmt: Select,
+    index_name: str,
+):
+    plan = await explain(seeded_session, stmt)
+
+    assert index_name in plan
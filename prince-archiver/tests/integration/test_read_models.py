@@ -6,7 +6,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from prince_archiver.definitions import EventType
-from prince_archiver.models.read import Archive, ArchiveMember, DailyStats, Export
+from prince_archiver.models.read import (
+    Archive,
+    ArchiveEntry,
+    ArchiveMember,
+    DailyStats,
+    Export,
+)
 
 
 @pytest.mark.usefixtures("seed_data")
@@ -47,10 +53,21 @@ async def test_data_archive_member_model(session: AsyncSession):
     assert result.member_key == "test_member_key"
     assert result.timestamp == datetime(2000, 1, 1, tzinfo=UTC)
     assert result.type == EventType.STITCH
+    assert result.experiment_id == "test_experiment_id"
     assert result.size == 10
     assert result.checksum == "test_hex"
 
 
+@pytest.mark.usefixtures("seed_data")
+async def test_archive_entry_model(session: AsyncSession):
+    result = await session.scalar(select(ArchiveEntry))
+
+    assert result
+    assert result.id == UUID("611598397745466bb78b82f4c462fd6a")
+    assert result.path == "images/test_experiment_id/test.tar"
+    assert result.created_at == datetime(2002, 1, 1, tzinfo=UTC)
+
+
 @pytest.mark.usefixtures("seed_data")
 async def test_daily_stats_model(session: AsyncSession):
     result = await session.scalar(select(DailyStats))
@@ -12,6 +12,7 @@ from prince_archiver.adapters.streams import (
     AbstractOutgoingMessage,
     Consumer,
     MessageInfo,
+    ReclaimPolicy,
     Stream,
     get_id,
 )
@@ -106,6 +107,99 @@ async def test_stream_latest(
     assert msg.processed_data() == payload
 
 
+async def test_stream_batches(
+    stream: Stream,
+    message_factory: Callable[[str, dict], Awaitable[str]],
+):
+    ids = [await message_factory("*", {"a": "b"}) for _ in range(3)]
+
+    batches = stream.stream_group_batches(
+        Consumer("test", "test"),
+        msg_cls=MockIncomingMessage,
+        batch_size=2,
+    )
+
+    first_batch = await asyncio.wait_for(anext(batches), 2)
+    second_batch = await asyncio.wait_for(anext(batches), 2)
+
+    assert [msg.id for msg in [*first_batch, *second_batch]] == ids
+
+
+async def test_can_acknowledge_many_messages(
+    stream: Stream,
+    redis: Redis,
+    message_factory: Callable[[str, dict], Awaitable[str]],
+):
+    ids = [await message_factory("*", {"a": "b"}) for _ in range(2)]
+
+    await redis.xreadgroup(
+        groupname="test",
+        consumername="test",
+        streams={stream.name: ">"},
+    )
+
+    await stream.ack_many(
+        MessageInfo(id=id, stream_name=stream.name, group_name="test") for id in ids
+    )
+
+    response: dict = await redis.xpending(stream.name, "test")
+    assert response["pending"] == 0
+
+
+async def test_stream_reclaims_idle_messages(
+    stream: Stream,
+    redis: Redis,
+    message_factory: Callable[[str, dict], Awaitable[str]],
+):
+    id = await message_factory("*", {"a": "b"})
+
+    # Left pending by a consumer which never acknowledges it
+    await redis.xreadgroup(
+        groupname="test",
+        consumername="crashed",
+        streams={stream.name: ">"},
+    )
+
+    batches = stream.stream_group_batches(
+        Consumer("test", "test"),
+        msg_cls=MockIncomingMessage,
+        reclaim=ReclaimPolicy(min_idle_time=0),
+    )
+
+    batch = await asyncio.wait_for(anext(batches), 5)
+
+    assert [msg.id for msg in batch] == [id]
+
+
+async def test_stream_dead_letters_redelivered_messages(
+    stream: Stream,
+    redis: Redis,
+    message_factory: Callable[[str, dict], Awaitable[str]],
+):
+    await message_factory("*", {"a": "b"})
+
+    await redis.xreadgroup(
+        groupname="test",
+        consumername="crashed",
+        streams={stream.name: ">"},
+    )
+
+    policy = ReclaimPolicy(min_idle_time=0, max_deliveries=1)
+    consumer = Consumer("test", "test")
+
+    _, claimed = await stream.claim_idle(
+        consumer,
+        msg_cls=MockIncomingMessage,
+        policy=policy,
+    )
+
+    assert not claimed
+    assert await redis.xlen(f"{stream.name}:dead-letter") == 1
+
+    response: dict = await redis.xpending(stream.name, "test")
+    assert response["pending"] == 0
+
+
 async def test_add(stream: Stream, redis: Redis):
     assert await redis.xlen(stream.name) == 0
 
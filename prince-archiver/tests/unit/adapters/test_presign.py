@@ -0,0 +1,85 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import botocore.session
+import pytest
+from botocore.config import Config
+
+from prince_archiver.adapters.presign import (
+    AbstractUrlSigner,
+    CachedUrlSigner,
+    LocalUrlSigner,
+)
+
+
+@pytest.fixture(name="signer")
+def fixture_signer() -> AsyncMock:
+    signer = AsyncMock(AbstractUrlSigner)
+    signer.sign.side_effect = lambda key: f"http://test.com/{key}"
+    return signer
+
+
+@patch(
+    "botocore.auth.get_current_datetime",
+    return_value=datetime(2000, 1, 1, tzinfo=UTC),
+)
+async def test_local_url_signer_matches_client(_):
+    client = botocore.session.get_session().create_client(
+        "s3",
+        aws_access_key_id="test-key",
+        aws_secret_access_key="test-secret",
+        endpoint_url="http://s3.test.com",
+        region_name="test-region",
+        config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+    )
+    expected_url = client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": "test-bucket", "Key": "images/test key+1.tar"},
+        ExpiresIn=600,
+    )
+
+    signer = LocalUrlSigner(
+        access_key="test-key",
+        secret_key="test-secret",
+        endpoint_url="http://s3.test.com",
+        region_name="test-region",
+        expires=timedelta(minutes=10),
+    )
+
+    assert await signer.sign("test-bucket/images/test key+1.tar") == expected_url
+
+
+async def test_cached_url_signer_reuses_url(signer: AsyncMock):
+    cached_signer = CachedUrlSigner(signer, ttl=timedelta(minutes=30))
+
+    assert await cached_signer.sign("test/key") == "http://test.com/test/key"
+    assert await cached_signer.sign("test/key") == "http://test.com/test/key"
+
+    signer.sign.assert_awaited_once_with("test/key")
+
+
+@patch("prince_archiver.adapters.presign.time.monotonic")
+async def test_cached_url_signer_expires_url(monotonic, signer: AsyncMock):
+    cached_signer = CachedUrlSigner(signer, ttl=timedelta(minutes=30))
+
+    monotonic.return_value = 0
+    await cached_signer.sign("test/key")
+
+    monotonic.return_value = 30 * 60
+    await cached_signer.sign("test/key")
+
+    assert signer.sign.await_count == 2
+
+
+async def test_cached_url_signer_evicts_least_recently_used(signer: AsyncMock):
+    cached_signer = CachedUrlSigner(signer, maxsize=2)
+
+    for key in ("key-1", "key-2", "key-1", "key-3", "key-1", "key-2"):
+        await cached_signer.sign(key)
+
+    assert [call.args[0] for call in signer.sign.await_args_list] == [
+        "key-1",
+        "key-2",
+        "key-3",
+        "key-2",
+    ]
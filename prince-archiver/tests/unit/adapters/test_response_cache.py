@@ -0,0 +1,44 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from prince_archiver.adapters.response_cache import LocalResponseCache
+
+
+async def test_local_response_cache_invalidates_tag():
+    cache = LocalResponseCache()
+
+    key = await cache.get_key("/test", ["tag-a", "tag-b"])
+    await cache.set(key, b"test")
+
+    assert await cache.get_key("/test", ["tag-b", "tag-a"]) == key
+    assert await cache.get(key) == b"test"
+
+    await cache.invalidate(["tag-b"])
+
+    new_key = await cache.get_key("/test", ["tag-a", "tag-b"])
+    assert new_key != key
+    assert await cache.get(new_key) is None
+
+
+@patch("prince_archiver.adapters.response_cache.time.monotonic")
+async def test_local_response_cache_expires_entry(monotonic):
+    cache = LocalResponseCache(ttl=timedelta(minutes=15))
+
+    monotonic.return_value = 0
+    await cache.set("key", b"test")
+
+    monotonic.return_value = 15 * 60
+    assert await cache.get("key") is None
+
+
+async def test_local_response_cache_evicts_least_recently_used():
+    cache = LocalResponseCache(maxsize=2)
+
+    await cache.set("key-1", b"1")
+    await cache.set("key-2", b"2")
+    await cache.get("key-1")
+    await cache.set("key-3", b"3")
+
+    assert await cache.get("key-1") == b"1"
+    assert await cache.get("key-2") is None
+    assert await cache.get("key-3") == b"3"
@@ -0,0 +1,418 @@
+import base64
+import zlib
+from hashlib import md5
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from prince_archiver.adapters.checkpoints import (
+    CheckpointStore,
+    UploadCheckpoint,
+    UploadedPart,
+)
+from prince_archiver.adapters.s3 import (
+    MultipartUploader,
+    to_s3_checksum,
+    verify_checksums,
+)
+from prince_archiver.definitions import Algorithm
+from prince_archiver.domain.value_objects import Checksum
+
+
+class MockException(Exception):
+    pass
+
+
+def _crc32(body: bytes) -> str:
+    return base64.b64encode(zlib.crc32(body).to_bytes(4, "big")).decode()
+
+
+@pytest.fixture(name="s3")
+def fixture_s3() -> MagicMock:
+    s3 = MagicMock()
+    s3.split_path.return_value = ("test-bucket", "test/key.tar", None)
+    s3._call_s3 = AsyncMock(
+        side_effect=lambda method, **_: {
+            "create_multipart_upload": {"UploadId": "test-id"},
+            "upload_part": {"ETag": "test-etag"},
+        }.get(method, {}),
+    )
+    return s3
+
+
+async def _iter_parts(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _get_methods(s3: MagicMock) -> list[str]:
+    return [call.args[0] for call in s3._call_s3.await_args_list]
+
+
+async def test_multipart_upload_successful(s3: MagicMock):
+    await MultipartUploader(s3).upload(
+        "test-bucket/test/key.tar", _iter_parts(b"a", b"b")
+    )
+
+    assert _get_methods(s3) == [
+        "create_multipart_upload",
+        "upload_part",
+        "upload_part",
+        "complete_multipart_upload",
+    ]
+
+    s3._call_s3.assert_awaited_with(
+        "complete_multipart_upload",
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": 1, "ETag": "test-etag", "ChecksumCRC32": _crc32(b"a")},
+                {"PartNumber": 2, "ETag": "test-etag", "ChecksumCRC32": _crc32(b"b")},
+            ],
+        },
+        ChecksumType="FULL_OBJECT",
+        Bucket="test-bucket",
+        Key="test/key.tar",
+        UploadId="test-id",
+    )
+
+
+async def test_multipart_upload_aborted_on_error(s3: MagicMock):
+    async def _failing_parts():
+        yield b"a"
+        raise MockException()
+
+    with pytest.raises(MockException):
+        await MultipartUploader(s3).upload("test-bucket/test/key.tar", _failing_parts())
+
+    s3._call_s3.assert_awaited_with(
+        "abort_multipart_upload",
+        Bucket="test-bucket",
+        Key="test/key.tar",
+        UploadId="test-id",
+    )
+
+
+async def test_multipart_upload_closes_parts_on_error(s3: MagicMock):
+    closed = False
+
+    async def _parts():
+        nonlocal closed
+        try:
+            yield b"a"
+            yield b"b"
+        finally:
+            closed = True
+
+    def _call_s3(method: str, **_):
+        if method == "upload_part":
+            raise MockException()
+        return {"UploadId": "test-id"}
+
+    s3._call_s3.side_effect = _call_s3
+
+    with pytest.raises(MockException):
+        await MultipartUploader(s3).upload("test-bucket/test/key.tar", _parts())
+
+    assert closed
+
+
+@pytest.fixture(name="src_path")
+def fixture_src_path(tmp_path: Path) -> Path:
+    src_path = tmp_path / "test.tar"
+    src_path.write_bytes(b"aabbc")
+    return src_path
+
+
+async def test_multipart_upload_file_successful(s3: MagicMock, src_path: Path):
+    uploader = MultipartUploader(s3, part_size=2)
+
+    await uploader.upload_file(src_path, "test-bucket/test/key.tar")
+
+    assert _get_methods(s3) == [
+        "list_multipart_uploads",
+        "create_multipart_upload",
+        *["upload_part"] * 3,
+        "complete_multipart_upload",
+    ]
+    bodies = [
+        call.kwargs["Body"]
+        for call in s3._call_s3.await_args_list
+        if call.args[0] == "upload_part"
+    ]
+    assert sorted(bodies) == [b"aa", b"bb", b"c"]
+
+
+async def test_multipart_upload_file_resumes_matching_parts(
+    s3: MagicMock,
+    src_path: Path,
+):
+    responses = {
+        "list_multipart_uploads": {
+            "Uploads": [
+                {"Key": "test/key.tar", "UploadId": "test-id", "Initiated": 1},
+            ],
+        },
+        "list_parts": {
+            "ChecksumType": "FULL_OBJECT",
+            "Parts": [
+                {
+                    "PartNumber": 1,
+                    "ETag": f'"{md5(b"aa").hexdigest()}"',
+                    "Size": 2,
+                    "ChecksumCRC32": _crc32(b"aa"),
+                },
+                {"PartNumber": 2, "ETag": '"stale"', "Size": 2},
+            ],
+        },
+        "upload_part": {"ETag": "test-etag"},
+    }
+    s3._call_s3.side_effect = lambda method, **_: responses.get(method, {})
+
+    await MultipartUploader(s3, part_size=2).upload_file(
+        src_path,
+        "test-bucket/test/key.tar",
+    )
+
+    assert _get_methods(s3).count("upload_part") == 2
+    s3._call_s3.assert_awaited_with(
+        "complete_multipart_upload",
+        MultipartUpload={
+            "Parts": [
+                {
+                    "PartNumber": 1,
+                    "ETag": f'"{md5(b"aa").hexdigest()}"',
+                    "ChecksumCRC32": _crc32(b"aa"),
+                },
+                {"PartNumber": 2, "ETag": "test-etag", "ChecksumCRC32": _crc32(b"bb")},
+                {"PartNumber": 3, "ETag": "test-etag", "ChecksumCRC32": _crc32(b"c")},
+            ],
+        },
+        ChecksumType="FULL_OBJECT",
+        Bucket="test-bucket",
+        Key="test/key.tar",
+        UploadId="test-id",
+    )
+
+
+async def test_multipart_upload_file_kept_on_error_when_resumable(
+    s3: MagicMock,
+    src_path: Path,
+):
+    async def _call_s3(method: str, **_):
+        if method == "upload_part":
+            raise MockException()
+        return {"UploadId": "test-id"}
+
+    s3._call_s3.side_effect = _call_s3
+
+    with pytest.raises(ExceptionGroup):
+        await MultipartUploader(s3, part_size=2).upload_file(
+            src_path,
+            "test-bucket/test/key.tar",
+        )
+
+    assert "abort_multipart_upload" not in _get_methods(s3)
+
+
+@pytest.fixture(name="checkpoint_store")
+def fixture_checkpoint_store() -> AsyncMock:
+    checkpoint_store = AsyncMock(CheckpointStore)
+    checkpoint_store.get.return_value = None
+    return checkpoint_store
+
+
+async def test_multipart_upload_checkpointed(
+    s3: MagicMock,
+    checkpoint_store: AsyncMock,
+):
+    uploader = MultipartUploader(s3, part_size=1, checkpoint_store=checkpoint_store)
+
+    await uploader.upload(
+        "test-bucket/test/key.tar",
+        _iter_parts(b"a", b"b"),
+        checkpoint_id="test-job",
+    )
+
+    checkpoint_store.start.assert_awaited_once_with(
+        "test-job",
+        UploadCheckpoint(
+            key="test-bucket/test/key.tar", upload_id="test-id", part_size=1
+        ),
+    )
+    assert [call.args for call in checkpoint_store.add_part.await_args_list] == [
+        ("test-job", UploadedPart(1, "test-etag", 1, _crc32(b"a"))),
+        ("test-job", UploadedPart(2, "test-etag", 1, _crc32(b"b"))),
+    ]
+    checkpoint_store.clear.assert_awaited_once_with("test-job")
+
+
+async def test_multipart_upload_resumed_from_checkpoint(
+    s3: MagicMock,
+    checkpoint_store: AsyncMock,
+):
+    checkpoint_store.get.return_value = UploadCheckpoint(
+        key="test-bucket/test/key.tar",
+        upload_id="existing-id",
+        part_size=1,
+    )
+    responses = {
+        "list_parts": {
+            "ChecksumType": "FULL_OBJECT",
+            "Parts": [
+                {
+                    "PartNumber": 1,
+                    "ETag": f'"{md5(b"a").hexdigest()}"',
+                    "Size": 1,
+                    "ChecksumCRC32": _crc32(b"a"),
+                },
+            ],
+        },
+        "upload_part": {"ETag": "test-etag"},
+    }
+    s3._call_s3.side_effect = lambda method, **_: responses.get(method, {})
+
+    uploader = MultipartUploader(s3, part_size=1, checkpoint_store=checkpoint_store)
+    await uploader.upload(
+        "test-bucket/test/key.tar",
+        _iter_parts(b"a", b"b"),
+        checkpoint_id="test-job",
+    )
+
+    assert _get_methods(s3) == [
+        "list_parts",
+        "upload_part",
+        "complete_multipart_upload",
+    ]
+    s3._call_s3.assert_awaited_with(
+        "complete_multipart_upload",
+        MultipartUpload={
+            "Parts": [
+                {
+                    "PartNumber": 1,
+                    "ETag": f'"{md5(b"a").hexdigest()}"',
+                    "ChecksumCRC32": _crc32(b"a"),
+                },
+                {"PartNumber": 2, "ETag": "test-etag", "ChecksumCRC32": _crc32(b"b")},
+            ],
+        },
+        ChecksumType="FULL_OBJECT",
+        Bucket="test-bucket",
+        Key="test/key.tar",
+        UploadId="existing-id",
+    )
+
+
+async def test_multipart_upload_restarted_when_checkpoint_expired(
+    s3: MagicMock,
+    checkpoint_store: AsyncMock,
+):
+    checkpoint_store.get.return_value = UploadCheckpoint(
+        key="test-bucket/test/key.tar",
+        upload_id="existing-id",
+        part_size=1,
+    )
+
+    async def _call_s3(method: str, **_):
+        if method == "list_parts":
+            raise FileNotFoundError()
+        return {"UploadId": "test-id", "ETag": "test-etag"}
+
+    s3._call_s3.side_effect = _call_s3
+
+    uploader = MultipartUploader(s3, part_size=1, checkpoint_store=checkpoint_store)
+    await uploader.upload(
+        "test-bucket/test/key.tar",
+        _iter_parts(b"a"),
+        checkpoint_id="test-job",
+    )
+
+    assert _get_methods(s3) == [
+        "list_parts",
+        "create_multipart_upload",
+        "upload_part",
+        "complete_multipart_upload",
+    ]
+    checkpoint_store.start.assert_awaited_once()
+
+
+async def test_multipart_upload_restarted_without_full_object_checksum(
+    s3: MagicMock,
+    checkpoint_store: AsyncMock,
+):
+    checkpoint_store.get.return_value = UploadCheckpoint(
+        key="test-bucket/test/key.tar",
+        upload_id="existing-id",
+        part_size=1,
+    )
+
+    uploader = MultipartUploader(s3, part_size=1, checkpoint_store=checkpoint_store)
+    await uploader.upload(
+        "test-bucket/test/key.tar",
+        _iter_parts(b"a"),
+        checkpoint_id="test-job",
+    )
+
+    assert _get_methods(s3) == [
+        "list_parts",
+        "abort_multipart_upload",
+        "create_multipart_upload",
+        "upload_part",
+        "complete_multipart_upload",
+    ]
+    assert s3._call_s3.await_args_list[2].kwargs["ChecksumType"] == "FULL_OBJECT"
+
+
+async def test_multipart_upload_kept_on_error_when_checkpointed(
+    s3: MagicMock,
+    checkpoint_store: AsyncMock,
+):
+    async def _failing_parts():
+        yield b"a"
+        raise MockException()
+
+    uploader = MultipartUploader(s3, checkpoint_store=checkpoint_store)
+    with pytest.raises(MockException):
+        await uploader.upload(
+            "test-bucket/test/key.tar",
+            _failing_parts(),
+            checkpoint_id="test-job",
+        )
+
+    assert "abort_multipart_upload" not in _get_methods(s3)
+    checkpoint_store.clear.assert_not_awaited()
+
+
+def test_get_timeout(s3: MagicMock):
+    uploader = MultipartUploader(s3, timeout=10, min_throughput=1024)
+
+    assert uploader.get_timeout(10 * 1024) == 20
+
+
+def test_to_s3_checksum():
+    checksum = Checksum(hex="d87f7e0c", algorithm=Algorithm.CRC32)
+
+    assert to_s3_checksum(checksum) == "2H9+DA=="
+
+
+@pytest.mark.parametrize(
+    "response,expected",
+    [
+        ({"ChecksumCRC32": "2H9+DA=="}, True),
+        ({"ChecksumCRC32": "AAAAAA=="}, False),
+        ({"ChecksumCRC32": "2H9+DA==-2"}, None),
+        ({}, None),
+    ],
+)
+async def test_verify_checksums(
+    s3: MagicMock,
+    response: dict,
+    expected: bool | None,
+):
+    s3._call_s3 = AsyncMock(return_value=response)
+    checksums = [
+        Checksum(hex="test", algorithm=Algorithm.BLAKE2B),
+        Checksum(hex="d87f7e0c", algorithm=Algorithm.CRC32),
+    ]
+
+    assert await verify_checksums(s3, "test-bucket/test/key.tar", checksums) is expected
@@ -1,7 +1,214 @@
+import asyncio
 from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
 
-from prince_archiver.adapters.streams import get_id
+import pytest
+
+from prince_archiver.adapters.streams import (
+    AbstractIncomingMessage,
+    AbstractIngester,
+    Consumer,
+    ReclaimPolicy,
+    Stream,
+    get_id,
+)
 
 
 def test_get_id():
     assert get_id(datetime(1970, 1, 1, 1, tzinfo=UTC)) == 3600000
+
+
+class MockIncomingMessage(AbstractIncomingMessage[dict]):
+    def processed_data(self) -> dict:
+        return self.raw_data
+
+
+@pytest.fixture(name="redis")
+def fixture_redis() -> MagicMock:
+    redis = MagicMock()
+    redis.xreadgroup = AsyncMock(
+        side_effect=[
+            [("test", [(b"1-0", {}), (b"2-0", {})])],
+            [("test", [])],
+            [("test", [(b"3-0", {})])],
+        ],
+    )
+    redis.xack = AsyncMock()
+    return redis
+
+
+async def test_stream_group_batches(redis: MagicMock):
+    stream = Stream(redis, "test")
+
+    batches = stream.stream_group_batches(
+        Consumer("group", "consumer"),
+        msg_cls=MockIncomingMessage,
+        batch_size=2,
+    )
+
+    assert [msg.id for msg in await anext(batches)] == [b"1-0", b"2-0"]
+    assert [msg.id for msg in await anext(batches)] == [b"3-0"]
+
+    stream_ids = [
+        call.kwargs["streams"]["test"] for call in redis.xreadgroup.await_args_list
+    ]
+    assert stream_ids == [0, b"2-0", ">"]
+
+
+async def test_stream_group_acks_batch_together(redis: MagicMock):
+    stream = Stream(redis, "test")
+    pipe = redis.pipeline.return_value.__aenter__.return_value
+    pipe.xack = MagicMock()
+
+    streamer = stream.stream_group(
+        Consumer("group", "consumer"),
+        msg_cls=MockIncomingMessage,
+        batch_size=2,
+    )
+
+    msg = await anext(streamer)
+    async with msg.process():
+        pass
+
+    pipe.xack.assert_not_called()
+
+    async with (await anext(streamer)).process():
+        pass
+
+    pipe.xack.assert_called_once_with("test", "group", b"1-0", b"2-0")
+    pipe.execute.assert_awaited_once()
+    redis.xack.assert_not_awaited()
+
+
+async def test_stream_group_flushes_unfinished_batch(redis: MagicMock):
+    stream = Stream(redis, "test")
+    pipe = redis.pipeline.return_value.__aenter__.return_value
+    pipe.xack = MagicMock()
+
+    streamer = stream.stream_group(
+        Consumer("group", "consumer"),
+        msg_cls=MockIncomingMessage,
+        batch_size=2,
+    )
+
+    first_msg = await anext(streamer)
+    second_msg = await anext(streamer)
+
+    async with first_msg.process():
+        pass
+
+    # Reading the next batch flushes acknowledgements received so far
+    await anext(streamer)
+    pipe.xack.assert_called_once_with("test", "group", b"1-0")
+
+    async with second_msg.process():
+        pass
+
+    redis.xack.assert_awaited_once_with("test", "group", b"2-0")
+
+
+async def test_stream_group_acks_immediately_without_batching(redis: MagicMock):
+    stream = Stream(redis, "test")
+
+    streamer = stream.stream_group(
+        Consumer("group", "consumer"),
+        msg_cls=MockIncomingMessage,
+    )
+
+    async with (await anext(streamer)).process():
+        pass
+
+    redis.xack.assert_awaited_once_with("test", "group", b"1-0")
+
+
+async def test_stream_group_batches_reclaims_idle_messages(redis: MagicMock):
+    redis.xreadgroup.side_effect = [[("test", [])], []]
+    redis.xpending_range = AsyncMock(return_value=[])
+    redis.xautoclaim = AsyncMock(return_value=["0-0", [(b"1-0", {b"a": b"b"})], []])
+
+    stream = Stream(redis, "test")
+
+    batches = stream.stream_group_batches(
+        Consumer("group", "consumer"),
+        msg_cls=MockIncomingMessage,
+        reclaim=ReclaimPolicy(min_idle_time=1000),
+    )
+
+    assert [msg.id for msg in await anext(batches)] == [b"1-0"]
+    redis.xautoclaim.assert_awaited_once_with(
+        "test",
+        "group",
+        "consumer",
+        min_idle_time=1000,
+        start_id="0-0",
+        count=1,
+    )
+
+
+async def test_dead_letter(redis: MagicMock):
+    redis.xpending_range = AsyncMock(
+        return_value=[
+            {"message_id": b"1-0", "times_delivered": 5},
+            {"message_id": b"2-0", "times_delivered": 1},
+        ],
+    )
+    redis.xclaim = AsyncMock(return_value=[(b"1-0", {b"a": b"b"})])
+    pipe = redis.pipeline.return_value.__aenter__.return_value
+    pipe.xadd = MagicMock()
+    pipe.xack = MagicMock()
+
+    stream = Stream(redis, "test")
+
+    count = await stream.dead_letter(
+        Consumer("group", "consumer"),
+        policy=ReclaimPolicy(min_idle_time=1000, max_deliveries=5),
+    )
+
+    assert count == 1
+    redis.xclaim.assert_awaited_once_with(
+        "test",
+        "group",
+        "consumer",
+        min_idle_time=1000,
+        message_ids=[b"1-0"],
+    )
+    pipe.xadd.assert_called_once_with("test:dead-letter", {b"a": b"b"})
+    pipe.xack.assert_called_once_with("test", "group", b"1-0")
+
+
+class MockIngester(AbstractIngester):
+    async def process_message(self, message: MockIncomingMessage):
+        await self.handler(message)
+
+
+async def _iter_messages(count: int):
+    for i in range(count):
+        yield MockIncomingMessage(
+            id=str(i),
+            stream_name="test",
+            group_name="group",
+            raw_data={},
+            stream=MagicMock(),
+        )
+
+
+async def test_ingester_processes_messages_concurrently():
+    running: set[str] = set()
+    max_running = 0
+
+    async def _handler(message: MockIncomingMessage):
+        nonlocal max_running
+        running.add(message.id)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(message.id)
+
+    ingester = MockIngester(
+        _iter_messages(4),
+        _handler,
+        max_concurrency=2,
+    )
+
+    await ingester.consume()
+
+    assert max_running == 2
@@ -71,7 +71,7 @@ def fixture_exported_imaging_event() -> ImagingEvent:
     imaging_event.add_event_archive(
         EventArchive(
             size=10,
-            checksum=Checksum(hex="321"),
+            checksums=[Checksum(hex="321")],
         )
     )
 
@@ -1,11 +1,15 @@
-from unittest.mock import AsyncMock
+import json
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from arq import Retry
+from arq import ArqRedis, Retry
 
+from prince_archiver.adapters.streams import Stream
+from prince_archiver.entrypoints.exporter.stream import message_handler
 from prince_archiver.entrypoints.exporter.worker import State, run_export
 from prince_archiver.service_layer.dto import ExportImagingEvent
 from prince_archiver.service_layer.handlers.export import ExportHandler
+from prince_archiver.service_layer.streams import IncomingMessage
 
 
 @pytest.fixture(name="workflow_payload")
@@ -58,3 +62,32 @@ async def test_workflow_with_retries(workflow_payload: dict, error_cls: Exceptio
 
     with pytest.raises(Retry):
         await run_export(ctx, workflow_payload)
+
+
+async def test_replayed_pending_message_is_enqueued_once(metadata: dict):
+    redis = AsyncMock(ArqRedis)
+
+    fields = {
+        "ref_id": "8b5b871a23454f9bb22b2e6fbae51764",
+        "experiment_id": "test_id",
+        "timestamp": "2001-01-01T00:00:00+00:00",
+        "type": "stitch",
+        "system": "prince",
+        "local_path": "test/path",
+        "img_count": "1",
+        "metadata": json.dumps(metadata),
+    }
+
+    # Read once as a new message, then again from the pending list on restart
+    for _ in range(2):
+        message = IncomingMessage(
+            id=b"1-0",
+            stream_name="test-stream",
+            group_name="test-group",
+            raw_data={k.encode(): v.encode() for k, v in fields.items()},
+            stream=MagicMock(Stream),
+        )
+        await message_handler(message, redis=redis)
+
+    job_ids = {call.kwargs["_job_id"] for call in redis.enqueue_job.await_args_list}
+    assert job_ids == {"run_export:test-stream:1-0"}
@@ -1,14 +1,30 @@
-from unittest.mock import AsyncMock
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
 
 import pytest
 from aio_pika.abc import AbstractIncomingMessage
 
-from prince_archiver.entrypoints.state_manager.consumers import SubscriberMessageHandler
+from prince_archiver.adapters.response_cache import (
+    ARCHIVES_TAG,
+    AbstractResponseCache,
+)
+from prince_archiver.adapters.streams import Stream
+from prince_archiver.entrypoints.state_manager.consumers import (
+    SubscriberMessageHandler,
+    import_batch_handler,
+    upload_event_batch_handler,
+)
 from prince_archiver.service_layer.dto import (
+    AddDataArchiveEntries,
     AddDataArchiveEntry,
+    ImportImagingEvents,
     NewDataArchiveEntries,
 )
+from prince_archiver.service_layer.handlers.state import ExportOutcome
 from prince_archiver.service_layer.messagebus import MessageBus
+from prince_archiver.service_layer.streams import IncomingExportMessage, IncomingMessage
 
 
 @pytest.fixture(name="new_data_archive_entries")
@@ -30,19 +46,223 @@ async def test_subscriber_message_handler(
     new_data_archive_entries: NewDataArchiveEntries,
 ):
     messagebus = AsyncMock(MessageBus)
-    handler = SubscriberMessageHandler(messagebus_factory=lambda: messagebus)
+    response_cache = AsyncMock(AbstractResponseCache)
+    handler = SubscriberMessageHandler(
+        messagebus_factory=lambda: messagebus,
+        response_cache=response_cache,
+    )
 
     incoming_message = AsyncMock(
         AbstractIncomingMessage,
         body=new_data_archive_entries.model_dump_json().encode(),
     )
 
-    expected_msg = AddDataArchiveEntry(
-        id="dabfa4a3051c4e47a736e9d12e38b05a",
+    expected_msg = AddDataArchiveEntries(
         job_id="a136586a44e6417eb707e10d9795b1f9",
-        path="test_path",
-        members=[{"src_key": "test/a", "member_key": "a"}],
+        entries=[
+            AddDataArchiveEntry(
+                id="dabfa4a3051c4e47a736e9d12e38b05a",
+                job_id="a136586a44e6417eb707e10d9795b1f9",
+                path="test_path",
+                members=[{"src_key": "test/a", "member_key": "a"}],
+            ),
+        ],
     )
 
     await handler(incoming_message)
     messagebus.handle.assert_awaited_once_with(expected_msg)
+    response_cache.invalidate.assert_awaited_once_with([ARCHIVES_TAG])
+
+
+async def test_subscriber_message_handler_chunks_archives():
+    messagebus = AsyncMock(MessageBus)
+    handler = SubscriberMessageHandler(
+        messagebus_factory=lambda: messagebus,
+        chunk_size=2,
+    )
+
+    new_data_archive_entries = NewDataArchiveEntries(
+        job_id="a136586a44e6417eb707e10d9795b1f9",
+        date="2000-01-01",
+        archives=[
+            {"path": f"test_path_{i}", "src_keys": [f"test/{i}"]} for i in range(3)
+        ],
+    )
+    incoming_message = AsyncMock(
+        AbstractIncomingMessage,
+        body=new_data_archive_entries.model_dump_json().encode(),
+    )
+
+    await handler(incoming_message)
+
+    chunks = [call.args[0].entries for call in messagebus.handle.await_args_list]
+    assert [[item.path for item in chunk] for chunk in chunks] == [
+        ["test_path_0", "test_path_1"],
+        ["test_path_2"],
+    ]
+
+
+async def test_import_batch_handler(metadata: dict[str, Any]):
+    messagebus = AsyncMock(MessageBus)
+    stream = MagicMock(Stream)
+    stream.ack_many = AsyncMock()
+
+    ref_id = uuid4()
+    fields = {
+        "ref_id": ref_id.hex,
+        "experiment_id": "test_id",
+        "timestamp": "2000-01-01T00:00:00+00:00",
+        "local_path": "test/path",
+        "img_count": "1",
+        "metadata": json.dumps(metadata),
+    }
+    valid_message = IncomingMessage(
+        id="1-0",
+        stream_name="test",
+        group_name="test",
+        raw_data={k.encode(): v.encode() for k, v in fields.items()},
+        stream=stream,
+    )
+    invalid_message = IncomingMessage(
+        id="2-0",
+        stream_name="test",
+        group_name="test",
+        raw_data={b"ref_id": b"invalid"},
+        stream=stream,
+    )
+
+    await import_batch_handler(
+        [valid_message, invalid_message],
+        messagebus_factory=lambda: messagebus,
+    )
+
+    handled_msg = messagebus.handle.await_args.args[0]
+    assert isinstance(handled_msg, ImportImagingEvents)
+    assert [item.ref_id for item in handled_msg.events] == [ref_id]
+
+    acked_ids = [item.id for item in stream.ack_many.await_args.args[0]]
+    assert acked_ids == ["1-0"]
+
+
+async def test_import_batch_handler_falls_back_to_single_messages(
+    metadata: dict[str, Any],
+):
+    messagebus = AsyncMock(MessageBus)
+    messagebus.handle.side_effect = [Exception("batch"), None, Exception(), None]
+    stream = MagicMock(Stream)
+    stream.ack = AsyncMock()
+    stream.ack_many = AsyncMock()
+
+    messages = [
+        IncomingMessage(
+            id=f"{i}-0",
+            stream_name="test",
+            group_name="test",
+            raw_data={
+                b"ref_id": uuid4().hex.encode(),
+                b"experiment_id": b"test_id",
+                b"timestamp": b"2000-01-01T00:00:00+00:00",
+                b"local_path": b"test/path",
+                b"img_count": b"1",
+                b"metadata": json.dumps(metadata).encode(),
+            },
+            stream=stream,
+        )
+        for i in range(3)
+    ]
+
+    await import_batch_handler(messages, messagebus_factory=lambda: messagebus)
+
+    handled_msgs = [call.args[0] for call in messagebus.handle.await_args_list]
+    assert [len(item.events) for item in handled_msgs] == [3, 1, 1, 1]
+
+    acked_ids = [call.args[0].id for call in stream.ack.await_args_list]
+    assert acked_ids == ["0-0", "2-0"]
+    stream.ack_many.assert_not_awaited()
+
+
+async def test_upload_event_batch_handler():
+    stream = MagicMock(Stream)
+    stream.ack_many = AsyncMock()
+    response_cache = AsyncMock(AbstractResponseCache)
+
+    messages = [
+        IncomingExportMessage(
+            id=f"{i}-0",
+            stream_name="test",
+            group_name="test",
+            raw_data={
+                b"ref_id": uuid4().hex.encode(),
+                b"checksum": b'{"hex": "test", "algorithm": "sha256"}',
+                b"size": b"1024",
+                b"key": b"test-key",
+                b"timestamp": f"2000-01-0{i + 1}T00:00:00+00:00".encode(),
+            },
+            stream=stream,
+        )
+        for i in range(3)
+    ]
+
+    with patch(
+        "prince_archiver.entrypoints.state_manager.consumers.stream"
+        ".persist_imaging_event_exports",
+        AsyncMock(
+            return_value=[
+                ExportOutcome.PERSISTED,
+                ExportOutcome.MISSING,
+                ExportOutcome.DUPLICATE,
+            ],
+        ),
+    ):
+        await upload_event_batch_handler(
+            messages,
+            uow_factory=MagicMock(),
+            response_cache=response_cache,
+        )
+
+    acked_ids = [item.id for item in stream.ack_many.await_args.args[0]]
+    assert acked_ids == ["0-0", "2-0"]
+
+    response_cache.invalidate.assert_awaited_once_with({"exports:2000-01-01"})
+
+
+async def test_upload_event_batch_handler_falls_back_to_single_messages():
+    stream = MagicMock(Stream)
+    stream.ack_many = AsyncMock()
+
+    messages = [
+        IncomingExportMessage(
+            id=f"{i}-0",
+            stream_name="test",
+            group_name="test",
+            raw_data={
+                b"ref_id": uuid4().hex.encode(),
+                b"checksum": b'{"hex": "test", "algorithm": "sha256"}',
+                b"size": b"1024",
+                b"key": b"test-key",
+                b"timestamp": b"2000-01-01T00:00:00+00:00",
+            },
+            stream=stream,
+        )
+        for i in range(3)
+    ]
+
+    with patch(
+        "prince_archiver.entrypoints.state_manager.consumers.stream"
+        ".persist_imaging_event_exports",
+        AsyncMock(
+            side_effect=[
+                Exception("batch"),
+                [ExportOutcome.PERSISTED],
+                Exception(),
+                [ExportOutcome.DUPLICATE],
+            ],
+        ),
+    ) as persist:
+        await upload_event_batch_handler(messages, uow_factory=MagicMock())
+
+    batch_sizes = [len(call.args[0].events) for call in persist.await_args_list]
+    assert batch_sizes == [3, 1, 1, 1]
+
+    acked_ids = [item.id for item in stream.ack_many.await_args.args[0]]
+    assert acked_ids == ["0-0", "2-0"]
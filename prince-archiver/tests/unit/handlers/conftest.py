@@ -29,6 +29,7 @@ def mock_path_manager() -> PathManager:
         checksum=Checksum(hex="test"),
         size=1024,
     )
+    mock_archive_file.get_size.return_value = 1024
 
     mock_src_dir = AsyncMock(SrcDir)
     mock_src_dir.get_temp_archive.return_value.__aenter__.return_value = (
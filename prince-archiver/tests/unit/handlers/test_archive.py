@@ -4,11 +4,15 @@ import pytest
 
 from prince_archiver.domain import models
 from prince_archiver.service_layer.dto import (
+    AddDataArchiveEntries,
     AddDataArchiveEntry,
     ArchivedImagingEvent,
 )
 from prince_archiver.service_layer.exceptions import ServiceLayerException
-from prince_archiver.service_layer.handlers.state import add_data_archive_entry
+from prince_archiver.service_layer.handlers.state import (
+    add_data_archive_entries,
+    add_data_archive_entry,
+)
 
 from .utils import MockDataArchiveEntryRepo, MockUnitOfWork
 
@@ -61,3 +65,32 @@ async def test_add_data_archive_entry_unsuccessful_when_path_exists(
 
     with pytest.raises(ServiceLayerException):
         await add_data_archive_entry(msg, uow)
+
+
+async def test_add_data_archive_entries_skips_existing_paths(
+    msg: AddDataArchiveEntry,
+    data_archive_entry: models.DataArchiveEntry,
+):
+    uow = MockUnitOfWork(
+        data_archive_repo=MockDataArchiveEntryRepo([data_archive_entry])
+    )
+    new_msg = AddDataArchiveEntry(
+        path="/new-path/",
+        job_id=None,
+        members=[{"member_key": "key", "src_key": "test/key"}],
+    )
+
+    await add_data_archive_entries(
+        AddDataArchiveEntries(job_id=None, entries=[msg, new_msg, new_msg]),
+        uow,
+    )
+
+    assert [item.path for item in uow.data_archive.entries] == [
+        "/path/",
+        "/new-path/",
+    ]
+    assert uow.data_archive.entries[1].members == [
+        models.ArchiveMember(member_key="key", src_key="test/key"),
+    ]
+    assert uow.daily_stats.archived_keys == ["test/key"]
+    assert uow.is_commited
@@ -0,0 +1,149 @@
+import base64
+import zlib
+from hashlib import sha256
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from prince_archiver.adapters.file import ArchiveInfoBuilder, PathManager
+from prince_archiver.adapters.s3 import ChecksumMismatchError, MultipartUploader
+from prince_archiver.definitions import Algorithm
+from prince_archiver.service_layer.dto import ExportImagingEvent
+from prince_archiver.service_layer.handlers.export import Exporter, StreamingConfig
+
+
+@pytest.fixture(name="msg")
+def fixture_msg(metadata: dict) -> ExportImagingEvent:
+    return ExportImagingEvent(
+        ref_id="8b5b871a23454f9bb22b2e6fbae51764",
+        experiment_id="test_id",
+        timestamp="2001-01-01T00:00:00+00:00",
+        local_path="test/path",
+        metadata=metadata,
+        message_info={
+            "id": "test-id",
+            "stream_name": "test-stream",
+            "group_name": "test-group",
+        },
+    )
+
+
+@pytest.fixture(name="s3")
+def fixture_s3() -> MagicMock:
+    s3 = MagicMock()
+    s3.split_path.return_value = ("test-bucket", "test/key.tar", None)
+    s3._call_s3 = AsyncMock(return_value={"UploadId": "test-id", "ETag": "etag"})
+    return s3
+
+
+@pytest.fixture(name="uploader")
+def fixture_uploader() -> AsyncMock:
+    uploader = AsyncMock(MultipartUploader)
+    uploader.get_timeout.return_value = 10
+    return uploader
+
+
+async def test_export_via_temp_archive(
+    msg: ExportImagingEvent,
+    s3: MagicMock,
+    uploader: AsyncMock,
+    mock_path_manager: PathManager,
+):
+    exporter = Exporter(
+        s3,
+        lambda _: "test-bucket/test/key.tar",
+        mock_path_manager,
+        uploader=uploader,
+    )
+
+    export_info = await exporter.export(msg)
+
+    assert export_info.size == 1024
+    uploader.get_timeout.assert_called_once_with(1024)
+    uploader.upload_file.assert_awaited_once_with(
+        Path("/test"),
+        "test-bucket/test/key.tar",
+        checkpoint_id=str(msg.ref_id),
+    )
+
+
+async def test_export_via_stream(
+    msg: ExportImagingEvent,
+    s3: MagicMock,
+    mock_path_manager: PathManager,
+):
+    async def _iter_archive(*, info_builder: ArchiveInfoBuilder, **_):
+        for part in (b"part-1", b"part-2"):
+            info_builder.update(part)
+            yield part
+
+    src_dir = mock_path_manager.get_src_dir.return_value
+    src_dir.iter_archive = MagicMock(side_effect=_iter_archive)
+    src_dir.get_info_builder.return_value = ArchiveInfoBuilder()
+
+    exporter = Exporter(
+        s3,
+        lambda _: "test-bucket/test/key.tar",
+        mock_path_manager,
+        streaming=StreamingConfig(part_size=6),
+    )
+
+    export_info = await exporter.export(msg)
+
+    assert export_info.size == 12
+    assert export_info.checksum == {
+        "hex": sha256(b"part-1part-2").hexdigest(),
+        "algorithm": "sha256",
+    }
+
+
+@pytest.mark.parametrize("body,raises", [(b"part-1", False), (b"other", True)])
+async def test_export_verified_against_s3_checksum(
+    msg: ExportImagingEvent,
+    s3: MagicMock,
+    uploader: AsyncMock,
+    mock_path_manager: PathManager,
+    body: bytes,
+    raises: bool,
+):
+    async def _iter_archive(*, info_builder: ArchiveInfoBuilder, **_):
+        info_builder.update(b"part-1")
+        yield b"part-1"
+
+    src_dir = mock_path_manager.get_src_dir.return_value
+    src_dir.iter_archive = MagicMock(side_effect=_iter_archive)
+    src_dir.get_info_builder.return_value = ArchiveInfoBuilder(
+        Algorithm.SHA256,
+        Algorithm.CRC32,
+    )
+
+    async def _upload(key: str, parts, **_):
+        async for _ in parts:
+            pass
+
+    uploader.upload.side_effect = _upload
+
+    crc32 = zlib.crc32(body).to_bytes(4, "big")
+    s3._call_s3.return_value = {"ChecksumCRC32": base64.b64encode(crc32).decode()}
+
+    exporter = Exporter(
+        s3,
+        lambda _: "test-bucket/test/key.tar",
+        mock_path_manager,
+        streaming=StreamingConfig(part_size=6),
+        uploader=uploader,
+    )
+
+    if raises:
+        with pytest.raises(ChecksumMismatchError):
+            await exporter.export(msg)
+    else:
+        await exporter.export(msg)
+
+    s3._call_s3.assert_awaited_once_with(
+        "head_object",
+        Bucket="test-bucket",
+        Key="test/key.tar",
+        ChecksumMode="ENABLED",
+    )
@@ -1,15 +1,15 @@
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from uuid import uuid4
 
 import pytest
 
 from prince_archiver.domain.models import ImagingEvent
 from prince_archiver.service_layer.dto import (
-    ImportedImagingEvent,
     ImportImagingEvent,
+    ImportImagingEvents,
 )
-from prince_archiver.service_layer.exceptions import ServiceLayerException
-from prince_archiver.service_layer.handlers.state import import_imaging_event
+from prince_archiver.service_layer.handlers.state import import_imaging_events
 
 from .utils import MockUnitOfWork
 
@@ -42,33 +42,31 @@ def msg_kwargs(metadata: dict) -> _MsgKwargs:
     )
 
 
-async def test_import_imaging_event_successful(
+async def test_import_imaging_events_skips_duplicates(
     msg_kwargs: _MsgKwargs,
     uow: MockUnitOfWork,
+    unexported_imaging_event: ImagingEvent,
 ):
     ref_id = uuid4()
 
-    msg = ImportImagingEvent(ref_id=ref_id, **msg_kwargs.__dict__)
+    msg = ImportImagingEvents(
+        events=[
+            ImportImagingEvent(ref_id=ref_id, **msg_kwargs.__dict__),
+            ImportImagingEvent(ref_id=ref_id, **msg_kwargs.__dict__),
+            ImportImagingEvent(
+                ref_id=unexported_imaging_event.ref_id,
+                **msg_kwargs.__dict__,
+            ),
+        ],
+    )
 
-    await import_imaging_event(msg, uow)
+    await import_imaging_events(msg, uow)
 
-    imaging_event = await uow.imaging_events.get_by_ref_id(ref_id)
-    assert isinstance(imaging_event, ImagingEvent)
+    assert len(uow.imaging_events.entries) == 3
+    assert await uow.imaging_events.get_by_ref_id(ref_id)
 
-    next_msg = next(uow.collect_messages())
-    assert isinstance(next_msg, ImportedImagingEvent)
+    imported_msgs = list(uow.collect_messages())
+    assert [item.ref_id for item in imported_msgs] == [ref_id]
 
+    assert uow.daily_stats.event_timestamps == [datetime(2000, 1, 1, tzinfo=UTC)]
     assert uow.is_commited
-
-
-async def test_import_imaging_event_already_imported(
-    msg_kwargs: _MsgKwargs,
-    uow: MockUnitOfWork,
-    unexported_imaging_event: ImagingEvent,
-):
-    msg = ImportImagingEvent(
-        ref_id=unexported_imaging_event.ref_id,
-        **msg_kwargs.__dict__,
-    )
-    with pytest.raises(ServiceLayerException):
-        await import_imaging_event(msg, uow)
@@ -1,43 +1,85 @@
 from uuid import uuid4
 
-import pytest
-
+from prince_archiver.definitions import Algorithm
 from prince_archiver.domain.models import ImagingEvent
-from prince_archiver.service_layer.dto import ExportedImagingEvent
-from prince_archiver.service_layer.exceptions import ServiceLayerException
-from prince_archiver.service_layer.handlers.state import persist_imaging_event_export
+from prince_archiver.domain.value_objects import Checksum
+from prince_archiver.service_layer.dto import (
+    ExportedImagingEvent,
+    ExportedImagingEvents,
+)
+from prince_archiver.service_layer.handlers.state import (
+    ExportOutcome,
+    persist_imaging_event_exports,
+)
 
 from .utils import MockUnitOfWork
 
 
-async def test_persist_imaging_event_successful(
+async def test_persist_imaging_event_exports_additional_checksums(
     uow: MockUnitOfWork,
     unexported_imaging_event: ImagingEvent,
 ):
-    msg = ExportedImagingEvent(
-        ref_id=unexported_imaging_event.ref_id,
-        checksum={"hex": "test", "algorithm": "sha256"},
-        size=1024,
-        key="target",
-        timestamp="2000-01-01T00:00:00+00:00",
+    msg = ExportedImagingEvents(
+        events=[
+            ExportedImagingEvent(
+                ref_id=unexported_imaging_event.ref_id,
+                checksum={"hex": "test", "algorithm": "sha256"},
+                additional_checksums='[{"hex": "d87f7e0c", "algorithm": "crc32"}]',
+                size=1024,
+                key="target",
+                timestamp="2000-01-01T00:00:00+00:00",
+            ),
+        ],
     )
 
-    await persist_imaging_event_export(msg, uow)
-
-    assert unexported_imaging_event.event_archive
-    assert unexported_imaging_event.object_store_entry
+    await persist_imaging_event_exports(msg, uow)
 
-    assert uow.is_commited
+    event_archive = unexported_imaging_event.event_archive
+    assert event_archive
+    assert event_archive.checksum == Checksum(hex="test")
+    assert event_archive.checksums[1] == Checksum(
+        hex="d87f7e0c",
+        algorithm=Algorithm.CRC32,
+    )
 
 
-async def test_persist_imaging_event_non_existent_reference():
-    msg = ExportedImagingEvent(
-        ref_id=uuid4(),
-        checksum={"hex": "test", "algorithm": "sha256"},
-        size=1024,
-        key="target",
-        timestamp="2000-01-01T00:00:00+00:00",
+async def test_persist_imaging_event_exports(
+    uow: MockUnitOfWork,
+    unexported_imaging_event: ImagingEvent,
+    exported_imaging_event: ImagingEvent,
+):
+    missing_ref_id = uuid4()
+    msg = ExportedImagingEvents(
+        events=[
+            ExportedImagingEvent(
+                ref_id=ref_id,
+                checksum={"hex": "test", "algorithm": "sha256"},
+                size=1024,
+                key=f"target/{ref_id}",
+                timestamp="2000-01-01T00:00:00+00:00",
+            )
+            for ref_id in (
+                unexported_imaging_event.ref_id,
+                unexported_imaging_event.ref_id,
+                exported_imaging_event.ref_id,
+                missing_ref_id,
+            )
+        ],
     )
 
-    with pytest.raises(ServiceLayerException):
-        await persist_imaging_event_export(msg, MockUnitOfWork())
+    outcomes = await persist_imaging_event_exports(msg, uow)
+
+    assert outcomes == [
+        ExportOutcome.PERSISTED,
+        ExportOutcome.DUPLICATE,
+        ExportOutcome.DUPLICATE,
+        ExportOutcome.MISSING,
+    ]
+
+    event_archive = unexported_imaging_event.event_archive
+    assert event_archive
+    assert event_archive.checksum == Checksum(hex="test")
+    assert unexported_imaging_event.object_store_entry
+
+    assert uow.daily_stats.export_timestamps == [unexported_imaging_event.timestamp]
+    assert uow.is_commited
@@ -1,12 +1,15 @@
-from datetime import date
-from typing import Generator, Mapping
+from datetime import date, datetime
+from typing import Generator, Iterable, Mapping
 from uuid import UUID
 
 from pydantic import BaseModel
 
 from prince_archiver.adapters.repository import (
+    AbstractDailyStatsRepo,
     AbstractDataArchiveEntryRepo,
     AbstractImagingEventRepo,
+    ImagingEventExport,
+    ImagingEventRef,
 )
 from prince_archiver.domain.models import DataArchiveEntry, ImagingEvent
 from prince_archiver.service_layer.uow import AbstractUnitOfWork
@@ -22,9 +25,15 @@ class MockDataArchiveEntryRepo(AbstractDataArchiveEntryRepo):
     def add(self, data_archive_entry: DataArchiveEntry) -> None:
         self.entries.append(data_archive_entry)
 
+    async def add_many(self, data_archive_entries: Iterable[DataArchiveEntry]) -> None:
+        self.entries.extend(data_archive_entries)
+
     async def get_by_path(self, path: str) -> DataArchiveEntry | None:
         return self._mapping.get(path)
 
+    async def get_existing_paths(self, paths: Iterable[str]) -> set[str]:
+        return set(paths) & self._mapping.keys()
+
     @property
     def _mapping(self) -> Mapping[str, DataArchiveEntry]:
         return {item.path: item for item in self.entries}
@@ -40,6 +49,36 @@ class MockImagingEventRepo(AbstractImagingEventRepo):
     def add(self, image_event: ImagingEvent) -> None:
         self.entries.append(image_event)
 
+    async def add_many(self, image_events: Iterable[ImagingEvent]) -> set[UUID]:
+        inserted_ref_ids: set[UUID] = set()
+        for item in image_events:
+            if item.ref_id in self._mapping:
+                continue
+            self.entries.append(item)
+            inserted_ref_ids.add(item.ref_id)
+        return inserted_ref_ids
+
+    async def get_existing_ref_ids(self, ref_ids: Iterable[UUID]) -> set[UUID]:
+        return set(ref_ids) & self._mapping.keys()
+
+    async def get_refs(self, ref_ids: Iterable[UUID]) -> dict[UUID, ImagingEventRef]:
+        return {
+            ref_id: ImagingEventRef(
+                id=item.id,
+                timestamp=item.timestamp,
+                is_exported=bool(item.event_archive or item.object_store_entry),
+            )
+            for ref_id in ref_ids
+            if (item := self._mapping.get(ref_id))
+        }
+
+    async def add_exports(self, exports: Iterable[ImagingEventExport]) -> None:
+        mapping = {item.id: item for item in self.entries}
+        for export in exports:
+            imaging_event = mapping[export.imaging_event_id]
+            imaging_event.add_event_archive(export.event_archive)
+            imaging_event.add_object_store_entry(export.object_store_entry)
+
     async def get_by_ref_id(self, event_id: UUID) -> ImagingEvent | None:
         return self._mapping.get(event_id)
 
@@ -55,11 +94,28 @@ class MockImagingEventRepo(AbstractImagingEventRepo):
         return {item.ref_id: item for item in self.entries}
 
 
+class MockDailyStatsRepo(AbstractDailyStatsRepo):
+    def __init__(self):
+        self.event_timestamps: list[datetime] = []
+        self.export_timestamps: list[datetime] = []
+        self.archived_keys: list[str] = []
+
+    async def record_events(self, timestamps: Iterable[datetime]) -> None:
+        self.event_timestamps.extend(timestamps)
+
+    async def record_exports(self, timestamps: Iterable[datetime]) -> None:
+        self.export_timestamps.extend(timestamps)
+
+    async def record_archived(self, src_keys: Iterable[str]) -> None:
+        self.archived_keys.extend(src_keys)
+
+
 class MockUnitOfWork(AbstractUnitOfWork):
     def __init__(
         self,
         imaging_event_repo: MockImagingEventRepo | None = None,
         data_archive_repo: MockDataArchiveEntryRepo | None = None,
+        daily_stats_repo: MockDailyStatsRepo | None = None,
     ):
         self.imaging_events: MockImagingEventRepo = (
             imaging_event_repo or MockImagingEventRepo()
@@ -67,6 +123,7 @@ class MockUnitOfWork(AbstractUnitOfWork):
         self.data_archive: MockDataArchiveEntryRepo = (
             data_archive_repo or MockDataArchiveEntryRepo()
         )
+        self.daily_stats: MockDailyStatsRepo = daily_stats_repo or MockDailyStatsRepo()
 
         self.messages = []
         self.is_commited = False
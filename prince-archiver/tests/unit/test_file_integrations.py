@@ -3,13 +3,14 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from prince_archiver.adapters.file.file_system import AsyncFileSystem
+from prince_archiver.adapters.file.file_system import ArchiveInfo, AsyncFileSystem
 from prince_archiver.adapters.file.integrations import (
     ArchiveFile,
     SrcDir,
     SystemDir,
 )
 from prince_archiver.definitions import System
+from prince_archiver.domain.value_objects import Checksum
 
 
 class MockException(Exception):
@@ -60,9 +61,12 @@ async def test_src_dir_rm(src_dir: SrcDir):
 
 
 async def test_src_dir_get_temp_archive(src_dir: SrcDir):
-    src_dir.file_system.get_temp_archive.return_value.__aenter__.return_value = Path(
-        "/tmp/archive/"
+    info = ArchiveInfo(checksum=Checksum(hex="test"), size=1024)
+    src_dir.file_system.get_temp_archive.return_value.__aenter__.return_value = (
+        Path("/tmp/archive/"),
+        info,
     )
 
     async with src_dir.get_temp_archive() as archive_file:
         assert isinstance(archive_file, ArchiveFile)
+        assert await archive_file.get_info() == info
@@ -1,9 +1,9 @@
-import asyncio
 import logging
 from contextlib import AsyncExitStack
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from .abc import (
     AbstractArchiver,
@@ -12,7 +12,15 @@ from .abc import (
     ArchiveEntry,
     ArchiveParams,
 )
-from .file import ArchiveFileSystem, ExperimentFileSystem, managed_s3_file_system
+from .file import (
+    ArchiveFileSystem,
+    ExperimentFileSystem,
+    TarMember,
+    managed_s3_file_system,
+)
+from .index import ArchiveIndex
+from .tagger import Tagger, TaggingStats
+from .utils import run_pipeline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -24,14 +32,32 @@ class _TargetArchive:
     target: Path
 
 
+@dataclass
+class PipelineConfig:
+    """
+    Number of archive groups handled at once by each stage.
+
+    Source files are streamed straight into their tar, so downloading and
+    tarring are a single stage and nothing is staged on disk besides the tars
+    themselves. At most `download_concurrency` tars are incomplete at once.
+    """
+
+    download_concurrency: int = 1
+    tag_concurrency: int = 1
+
+
 class Archiver(AbstractArchiver):
     def __init__(
         self,
         experiment_file_system: ExperimentFileSystem,
         archive_file_system: ArchiveFileSystem,
+        pipeline_config: Optional[PipelineConfig] = None,
+        tagger: Optional[Tagger] = None,
     ):
         self.experiment_file_system = experiment_file_system
         self.archive_file_system = archive_file_system
+        self.pipeline_config = pipeline_config or PipelineConfig()
+        self.tagger = tagger or Tagger(experiment_file_system)
 
     async def archive(
         self,
@@ -39,7 +65,11 @@ class Archiver(AbstractArchiver):
     ) -> list[ArchiveEntry]:
         """Archive all files for a given date for given type.
 
-        Files will be bundled per experiment id.
+        Files will be bundled per experiment id. Groups are written and
+        tagged in a pipeline, so writing one group overlaps with tagging
+        the groups before it. Tagging left unfinished by a previous run is
+        completed first. With an index, groups which fail to be tagged are
+        left to resume on the next run, without stopping the others.
         """
         LOGGER.info(
             "Starting archive run mode=%s job_id=%s",
@@ -47,76 +77,146 @@ class Archiver(AbstractArchiver):
             archive_params.job_id,
         )
 
-        archives: list[ArchiveEntry] = []
-        async for target_archive in self._get_target_archives(archive_params):
-            LOGGER.info(
-                "Creating archive experiment=%s target=%s",
-                target_archive.experiment_id,
-                target_archive.target,
-            )
-            await self._create_archive(target_archive)
+        self.tagger.stats = TaggingStats()
+        archives = await self._resume_tagging()
 
-            archives.append(
-                ArchiveEntry(
-                    path=str(target_archive.target),
-                    src_keys=target_archive.src_files,
-                )
-            )
+        config = self.pipeline_config
+        results = await run_pipeline(
+            self._get_target_archives(archive_params),
+            [
+                (self._write, config.download_concurrency),
+                (self._tag, config.tag_concurrency),
+            ],
+        )
+        archives += [item for item in results if item]
 
+        stats = self.tagger.stats
         LOGGER.info(
-            "Archive run complete mode=%s archives_created=%d",
+            "Archive run complete mode=%s archives_created=%d files_tagged=%d "
+            "tag_retries=%d tags_per_second=%.1f",
             archive_params.mode.value,
             len(archives),
+            stats.count,
+            stats.retries,
+            stats.rate,
         )
 
         return archives
 
+    async def _resume_tagging(self) -> list[ArchiveEntry]:
+        archives = []
+        for target, files in self.tagger.get_unfinished().items():
+            path = Path(target)
+            if not self.archive_file_system.exists(path):
+                LOGGER.warning("Archive left partially tagged is gone target=%s", path)
+                self.tagger.discard(target)
+                continue
+
+            LOGGER.info("Resuming tagging target=%s count=%d", path, len(files))
+            archive = await self._tag(
+                _TargetArchive(
+                    experiment_id=path.parent.name,
+                    target=path,
+                    src_files=files,
+                )
+            )
+            if archive:
+                archives.append(archive)
+
+        return archives
+
     async def _get_target_archives(
         self,
         archive_params: ArchiveParams,
     ) -> AsyncGenerator[_TargetArchive, None]:
-        grouped_files = await self.experiment_file_system.list_files_by_date(
+        # Groups are archived as they are discovered
+        grouped_files = self.experiment_file_system.iter_files_by_date(
             archive_params.mode
         )
-        LOGGER.info("Pending archive groups found count=%d", len(grouped_files))
-
-        for info, files in grouped_files.items():
+        async for info, files in grouped_files:
             experiment_id, date = info
+            LOGGER.info(
+                "Pending archive group found experiment=%s date=%s count=%d",
+                experiment_id,
+                date,
+                len(files),
+            )
+
             tar_name = f"{date}.tar"
             path = Path(archive_params.mode.value, experiment_id, tar_name)
             if not self.archive_file_system.exists(path):
                 yield _TargetArchive(
                     experiment_id=experiment_id, target=path, src_files=files
                 )
+            else:
+                # The files aren't in the tar nor tagged, so aren't archived
+                LOGGER.warning(
+                    "Archive already exists, skipping untagged files target=%s "
+                    "count=%d",
+                    path,
+                    len(files),
+                )
 
-    async def _create_archive(self, target_archive: _TargetArchive):
-        with self.archive_file_system.get_temp_dir() as temp_dir:
-            src_files = target_archive.src_files
-            LOGGER.info("Downloading source files count=%d", len(src_files))
-            await self.experiment_file_system.get_files(src_files, temp_dir.path)
-            await self.archive_file_system.add(temp_dir, target_archive.target)
+    async def _write(self, target_archive: _TargetArchive) -> _TargetArchive:
+        src_files = target_archive.src_files
+        sizes = await self.experiment_file_system.get_sizes(src_files)
 
-            results = await asyncio.gather(
-                *[self.experiment_file_system.tag(file) for file in src_files],
-                return_exceptions=True,
-            )
+        LOGGER.info(
+            "Creating archive experiment=%s target=%s",
+            target_archive.experiment_id,
+            target_archive.target,
+        )
+        LOGGER.info("Streaming source files count=%d", len(src_files))
+        await self.archive_file_system.write(
+            target_archive.target,
+            [
+                TarMember(
+                    name=file.split("/")[-1],
+                    size=size,
+                    open=partial(self.experiment_file_system.iter_file, file),
+                )
+                for file, size in zip(src_files, sizes)
+            ],
+        )
+
+        return target_archive
 
-            failures = [r for r in results if isinstance(r, Exception)]
-            if failures:
-                LOGGER.error(
-                    "S3 tagging failed for %d/%d files in %s — rolling back tar",
-                    len(failures),
-                    len(src_files),
+    async def _tag(self, target_archive: _TargetArchive) -> Optional[ArchiveEntry]:
+        src_files = target_archive.src_files
+        try:
+            await self.tagger.tag(str(target_archive.target), src_files)
+        except Exception:
+            if self.tagger.index:
+                LOGGER.exception(
+                    "S3 tagging failed for %s — left to resume on the next run",
                     target_archive.target,
                 )
-                self.archive_file_system.delete(target_archive.target)
-                raise failures[0]
+                return None
+
+            # Without a journal to resume from, the tar is written again
+            LOGGER.error(
+                "S3 tagging failed for %s — rolling back tar",
+                target_archive.target,
+            )
+            self.archive_file_system.delete(target_archive.target)
+            raise
+
+        self.experiment_file_system.mark_archived(src_files)
+
+        return ArchiveEntry(
+            path=str(target_archive.target),
+            src_keys=src_files,
+        )
 
 
 @dataclass
 class ArchiverConfig(AbstractConfig):
     bucket_name: str
     base_path: Path
+    max_concurrency: int = 64
+    index_file: Optional[Path] = None
+    tag_max_attempts: int = 5
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
 
 
 class ManagedArchiver(AbstractManagedArchiver[ArchiverConfig]):
@@ -126,9 +226,28 @@ class ManagedArchiver(AbstractManagedArchiver[ArchiverConfig]):
         self.stack = await AsyncExitStack().__aenter__()
         s3 = await self.stack.enter_async_context(managed_s3_file_system())
 
+        index = None
+        if self.config.index_file:
+            index = self.stack.enter_context(
+                ArchiveIndex.open(self.config.index_file),
+            )
+
+        experiment_file_system = ExperimentFileSystem(
+            s3,
+            self.config.bucket_name,
+            max_concurrency=self.config.max_concurrency,
+            index=index,
+        )
         return Archiver(
-            experiment_file_system=ExperimentFileSystem(s3, self.config.bucket_name),
+            experiment_file_system=experiment_file_system,
             archive_file_system=ArchiveFileSystem(self.config.base_path),
+            pipeline_config=self.config.pipeline,
+            tagger=Tagger(
+                experiment_file_system,
+                index=index,
+                max_concurrency=self.config.max_concurrency,
+                max_attempts=self.config.tag_max_attempts,
+            ),
         )
 
     async def __aexit__(self, *args):
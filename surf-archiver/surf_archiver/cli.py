@@ -7,7 +7,7 @@ from uuid import UUID, uuid4
 
 import typer
 
-from .archiver import ArchiveParams, ArchiverConfig, ManagedArchiver
+from .archiver import ArchiveParams, ArchiverConfig, ManagedArchiver, PipelineConfig
 from .config import DEFAULT_CONFIG_FILE, get_config
 from .definitions import Mode
 from .log import configure_logging
@@ -36,6 +36,13 @@ def archive(
     archiver_config = ArchiverConfig(
         bucket_name=config.bucket,
         base_path=config.target_dir,
+        max_concurrency=config.max_concurrency,
+        index_file=config.index_file,
+        tag_max_attempts=config.tag_max_attempts,
+        pipeline=PipelineConfig(
+            download_concurrency=config.download_concurrency,
+            tag_concurrency=config.tag_concurrency,
+        ),
     )
 
     archive_params = ArchiveParams(
@@ -20,6 +20,21 @@ class Config(BaseSettings):
     bucket: str = "prince-archiver-dev"
     target_dir: Path = HOME_PATH / "prince"
 
+    # Maximum number of S3 requests in flight while listing and tagging
+    max_concurrency: int = 64
+
+    # Record of archived files, so their tags aren't fetched again, and of
+    # tagging progress, so interrupted tagging is resumed
+    index_file: Optional[Path] = DEFAULT_CONFIG_DIR / "index.sqlite3"
+
+    # Archive groups streamed into tars and tagged at once. Only the tars being
+    # written take up disk space, as nothing else is staged locally.
+    download_concurrency: int = 1
+    tag_concurrency: int = 1
+
+    # Attempts made to tag a file while S3 throttles requests
+    tag_max_attempts: int = 5
+
     model_config = SettingsConfigDict(env_prefix="surf_archiver_")
 
 
@@ -1,16 +1,27 @@
 import asyncio
+import tarfile
+import time
 from collections import defaultdict
-from contextlib import asynccontextmanager, contextmanager
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-from tarfile import TarFile
-from tempfile import TemporaryDirectory
-from typing import AsyncGenerator, Generator, Optional, Tuple
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Optional,
+    Tuple,
+)
 
 from s3fs import S3FileSystem
 from s3fs.core import version_id_kw
 
 from .definitions import Mode
+from .index import ArchiveIndex
+from .utils import iter_bounded
+
+GroupKey = Tuple[str, str]
 
 
 @asynccontextmanager
@@ -29,28 +40,134 @@ class ExperimentFileSystem:
         self,
         s3: S3FileSystem,
         bucket_name: str,
+        *,
+        max_concurrency: int = 64,
+        index: Optional[ArchiveIndex] = None,
     ):
         self.s3 = s3
         self.bucket_name = bucket_name
-        self.batch_size = -1
+        self.max_concurrency = max_concurrency
+        self.index = index
+
+        # Sizes of the files listed, saving a request for each when needed
+        self._sizes: dict[str, int] = {}
 
     async def list_files_by_date(
         self,
         mode: Mode = Mode.STITCH,
-    ) -> dict[Tuple[str, str], list[str]]:
-        date_today = date.today()
-        date_prefix = date_today.strftime("%Y%m%d")
-        files = await self.s3._glob(
-            f"{self.bucket_name}/{mode.value}/*/*/*.tar",
-        )
-        untagged_files = []
+    ) -> dict[GroupKey, list[str]]:
+        return {key: files async for key, files in self.iter_files_by_date(mode)}
+
+    async def iter_files_by_date(
+        self,
+        mode: Mode = Mode.STITCH,
+    ) -> AsyncGenerator[Tuple[GroupKey, list[str]], None]:
+        """
+        Yield untagged files per experiment and date, before today.
+
+        Date directories from today onwards are skipped before any of their
+        files are listed. Tags are fetched with at most `max_concurrency`
+        requests in flight, and each group is yielded once all of its files
+        have been checked.
+
+        With an `index`, date directories and files recorded as archived are
+        skipped without fetching tags, and files found to be tagged are
+        recorded so they aren't checked again.
+        """
+        date_prefix = date.today().strftime("%Y%m%d")
+
+        experiment_dirs = await self._list_dirs(f"{self.bucket_name}/{mode.value}")
+        date_dirs = [
+            date_dir
+            async for date_dirs in iter_bounded(
+                self._list_dirs,
+                experiment_dirs,
+                limit=self.max_concurrency,
+            )
+            for date_dir in date_dirs
+            if date_dir.split("/")[-1] < date_prefix
+        ]
+        if self.index:
+            archived_groups = self.index.get_archived_groups(date_dirs)
+            date_dirs = [item for item in date_dirs if item not in archived_groups]
+
+        files = [
+            file
+            async for files in iter_bounded(
+                self._list_tar_files,
+                date_dirs,
+                limit=self.max_concurrency,
+            )
+            for file in files
+        ]
+        archived_files = self.index.get_archived_keys(files) if self.index else set()
+
+        pending_files: dict[str, list[str]] = defaultdict(list)
         for file in files:
-            if not await self._has_tag(file, "archived", "true"):
-                # Check if the file is older than one day
-                if file.split("/")[-2] < date_prefix:
-                    untagged_files.append(file)
+            if file not in archived_files:
+                pending_files[self._get_group_prefix(file)].append(file)
+
+        if self.index:
+            self.index.add_groups(
+                {self._get_group_prefix(file) for file in archived_files}
+                - pending_files.keys(),
+            )
+
+        remaining = {prefix: len(files) for prefix, files in pending_files.items()}
+        untagged_files: dict[str, list[str]] = defaultdict(list)
+        tagged_files: dict[str, list[str]] = defaultdict(list)
+
+        async for file, is_archived in iter_bounded(
+            self._is_archived,
+            (file for files in pending_files.values() for file in files),
+            limit=self.max_concurrency,
+        ):
+            prefix = self._get_group_prefix(file)
+            if is_archived:
+                tagged_files[prefix].append(file)
+            else:
+                untagged_files[prefix].append(file)
+
+            remaining[prefix] -= 1
+            if remaining[prefix]:
+                continue
+
+            if self.index:
+                self.index.add_keys(tagged_files.pop(prefix, []))
+
+            if untagged_files[prefix]:
+                # Tags arrive in any order, files are yielded in listing order
+                group = sorted(untagged_files.pop(prefix))
+                yield self._get_group_key(group[0]), group
+            elif self.index:
+                self.index.add_groups([prefix])
+
+    def mark_archived(self, files: list[str]):
+        """
+        Record `files`, and the date directories they are in, as archived.
+        """
+        if self.index:
+            self.index.add_keys(files)
+            self.index.add_groups({self._get_group_prefix(file) for file in files})
+
+    async def _list_dirs(self, path: str) -> list[str]:
+        return [
+            item["name"]
+            for item in await self.s3._lsdir(path)
+            if item["type"] == "directory"
+        ]
 
-        return self._group_files(untagged_files)
+    async def _list_tar_files(self, path: str) -> list[str]:
+        files = [
+            item
+            for item in await self.s3._lsdir(path)
+            if item["type"] == "file" and item["name"].endswith(".tar")
+        ]
+        self._sizes.update((item["name"], item["size"]) for item in files)
+        return [item["name"] for item in files]
+
+    async def _is_archived(self, file: str) -> Tuple[str, bool]:
+        return file, await self._has_tag(file, "archived", "true")
 
     async def _has_tag(self, file: str, tag_key: str, tag_value: str) -> bool:
         """
@@ -70,8 +187,28 @@ class ExperimentFileSystem:
         tags = {tag["Key"]: tag["Value"] for tag in response.get("TagSet", [])}
         return tags.get(tag_key) == tag_value
 
-    async def get_files(self, files: list[str], target_dir: Path):
-        await self.s3._get(files, f"{target_dir}/", batch_size=self.batch_size)
+    async def iter_file(
+        self,
+        path: str,
+        *,
+        chunk_size: int = 8 * 1024 * 1024,
+    ) -> AsyncGenerator[bytes, None]:
+        file = await self.s3.open_async(path, "rb")
+        try:
+            while chunk := await file.read(chunk_size):
+                yield chunk
+        finally:
+            await file.close()
+
+    async def get_sizes(self, files: list[str]) -> list[int]:
+        return [
+            self._sizes[file] if file in self._sizes else await self._get_size(file)
+            for file in files
+        ]
+
+    async def _get_size(self, file: str) -> int:
+        info = await self.s3._info(file)
+        return info["size"]
 
     async def tag(self, path: str, *, _tags: Optional[dict[str, str]] = None):
         tags = _tags or {"archived": "true"}
@@ -88,20 +225,20 @@ class ExperimentFileSystem:
         )
 
     @staticmethod
-    def _group_files(files: list[str]) -> dict[Tuple[str, str], list[str]]:
-        data: dict[Tuple[str, str], list[str]] = defaultdict(list)
-        for file_obj, file in zip(map(Path, files), files):
-            data[(file_obj.parent.parent.name, file_obj.parent.name)].append(file)
-        return data
+    def _get_group_prefix(file: str) -> str:
+        return file.rsplit("/", 1)[0]
 
+    @staticmethod
+    def _get_group_key(file: str) -> GroupKey:
+        file_obj = Path(file)
+        return file_obj.parent.parent.name, file_obj.parent.name
 
-class _TempDir:
-    def __init__(self, path: Path):
-        self._path = path
 
-    @property
-    def path(self) -> Path:
-        return self._path
+@dataclass
+class TarMember:
+    name: str
+    size: int
+    open: Callable[[], AsyncIterator[bytes]]
 
 
 class ArchiveFileSystem:
@@ -112,25 +249,61 @@ class ArchiveFileSystem:
     def exists(self, path: Path) -> bool:
         return (self.base_path / path).exists()
 
-    async def add(self, temp_dir: _TempDir, target: Path):
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(self.pool, self._add, temp_dir, target)
-
-    def delete(self, path: Path) -> None:
-        (self.base_path / path).unlink(missing_ok=True)
+    async def write(self, target: Path, members: list[TarMember]):
+        """
+        Write a tar of `members`, streaming each into it as it is read.
 
-    def _add(self, temp_dir: _TempDir, target: Path):
+        Members are laid out in the root directory of the tar. The tar is
+        written next to `target` and only moved into place once complete, so
+        nothing but the tar itself is written to disk.
+        """
         target = self.base_path / target
         target.parent.mkdir(parents=True, exist_ok=True)
+        partial_target = target.with_name(f"{target.name}.partial")
+
+        loop = asyncio.get_event_loop()
         try:
-            with TarFile.open(target, "w") as tar:
-                tar.add(temp_dir.path, arcname=".")
-        except Exception:
-            target.unlink(missing_ok=True)
+            with partial_target.open("wb") as file:
+                written = 0
+
+                async def write(data: bytes):
+                    nonlocal written
+                    await loop.run_in_executor(self.pool, file.write, data)
+                    written += len(data)
+
+                await write(self._get_header(".", tarfile.DIRTYPE))
+                for member in members:
+                    await write(self._get_header(f"./{member.name}", size=member.size))
+
+                    size = 0
+                    async for chunk in member.open():
+                        await write(chunk)
+                        size += len(chunk)
+                    if size != member.size:
+                        raise ValueError(
+                            f"Read {size} bytes of {member.name}, "
+                            f"expected {member.size}"
+                        )
+
+                    await write(tarfile.NUL * (-size % tarfile.BLOCKSIZE))
+
+                # End of archive, padded to a whole record as `TarFile` does
+                await write(tarfile.NUL * tarfile.BLOCKSIZE * 2)
+                await write(tarfile.NUL * (-written % tarfile.RECORDSIZE))
+
+            partial_target.replace(target)
+        except BaseException:
+            partial_target.unlink(missing_ok=True)
             raise
 
+    def delete(self, path: Path) -> None:
+        (self.base_path / path).unlink(missing_ok=True)
+
     @staticmethod
-    @contextmanager
-    def get_temp_dir() -> Generator[_TempDir, None, None]:
-        with TemporaryDirectory() as _temp_path:
-            yield _TempDir(Path(_temp_path))
+    def _get_header(name: str, type_: bytes = tarfile.REGTYPE, size: int = 0) -> bytes:
+        info = tarfile.TarInfo(name)
+        info.type = type_
+        info.size = size
+        info.mode = 0o755 if type_ == tarfile.DIRTYPE else 0o644
+        info.mtime = int(time.time())
+        return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
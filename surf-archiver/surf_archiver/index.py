@@ -0,0 +1,122 @@
+import sqlite3
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Below SQLite's default limit on the number of parameters of a statement
+CHUNK_SIZE = 500
+
+
+class ArchiveIndex:
+    """
+    Local record of source files and date directories already archived.
+
+    Lets discovery skip date directories archived on a previous run, and
+    skip fetching the tags of files known to be archived. Also journals
+    the tagging of each archive, so it can be resumed if interrupted.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    @classmethod
+    @contextmanager
+    def open(cls, path: Path) -> Generator["ArchiveIndex", None, None]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS archived_keys "
+                    "(key TEXT PRIMARY KEY, archived_at TEXT NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS archived_groups "
+                    "(prefix TEXT PRIMARY KEY, archived_at TEXT NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tag_journal "
+                    "(target TEXT NOT NULL, key TEXT NOT NULL, "
+                    "tagged INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (target, key))"
+                )
+            yield cls(conn)
+        finally:
+            conn.close()
+
+    def get_archived_keys(self, keys: Iterable[str]) -> set[str]:
+        return self._get_existing("archived_keys", "key", keys)
+
+    def get_archived_groups(self, prefixes: Iterable[str]) -> set[str]:
+        return self._get_existing("archived_groups", "prefix", prefixes)
+
+    def add_keys(self, keys: Iterable[str]):
+        self._add("archived_keys", "key", keys)
+
+    def add_groups(self, prefixes: Iterable[str]):
+        self._add("archived_groups", "prefix", prefixes)
+
+    def start_tagging(self, target: str, keys: list[str]) -> list[str]:
+        """
+        Journal the tagging of `keys` archived in `target`.
+
+        Returns the keys not tagged yet, which is all of them unless tagging
+        `target` was started before.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tag_journal (target, key) VALUES (?, ?)",
+                ((target, key) for key in keys),
+            )
+        cursor = self.conn.execute(
+            "SELECT key FROM tag_journal WHERE target = ? AND NOT tagged",
+            (target,),
+        )
+        pending = {row[0] for row in cursor}
+        return [key for key in keys if key in pending]
+
+    def mark_tagged(self, target: str, keys: Iterable[str]):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tag_journal SET tagged = 1 WHERE target = ? AND key = ?",
+                ((target, key) for key in keys),
+            )
+
+    def finish_tagging(self, target: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM tag_journal WHERE target = ?", (target,))
+
+    def get_unfinished_tagging(self) -> dict[str, list[str]]:
+        """
+        Get the keys of each target whose tagging was started, not finished.
+        """
+        unfinished: dict[str, list[str]] = {}
+        for target, key in self.conn.execute(
+            "SELECT target, key FROM tag_journal ORDER BY target, key"
+        ):
+            unfinished.setdefault(target, []).append(key)
+        return unfinished
+
+    def _get_existing(self, table: str, column: str, values: Iterable[str]) -> set[str]:
+        values = list(values)
+
+        existing: set[str] = set()
+        for start in range(0, len(values), CHUNK_SIZE):
+            chunk = values[start : start + CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})",
+                chunk,
+            )
+            existing.update(row[0] for row in cursor)
+
+        return existing
+
+    def _add(self, table: str, column: str, values: Iterable[str]):
+        archived_at = datetime.now(timezone.utc).isoformat()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO {table} ({column}, archived_at) VALUES (?, ?)",
+                ((value, archived_at) for value in values),
+            )
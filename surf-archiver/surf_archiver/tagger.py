@@ -0,0 +1,156 @@
+import asyncio
+import errno
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .file import ExperimentFileSystem
+from .index import ArchiveIndex
+from .utils import iter_bounded
+
+LOGGER = logging.getLogger(__name__)
+
+# Error codes s3fs doesn't already translate to EBUSY
+THROTTLING_CODES = {
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequests",
+}
+
+# Number of tagged files recorded in the journal at a time
+JOURNAL_BATCH_SIZE = 100
+
+
+@dataclass
+class TaggingStats:
+    count: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.seconds if self.seconds else 0.0
+
+
+class Tagger:
+    """
+    Tags the source files of archives as archived.
+
+    Files are tagged with at most `max_concurrency` requests in flight.
+    Throttled or timed out requests are retried with jittered exponential
+    backoff, making at most `max_attempts` attempts. With an `index`, tagged
+    files are journaled so tagging an archive can be resumed where a previous
+    run left off.
+    """
+
+    def __init__(
+        self,
+        experiment_file_system: ExperimentFileSystem,
+        *,
+        index: Optional[ArchiveIndex] = None,
+        max_concurrency: int = 64,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.experiment_file_system = experiment_file_system
+        self.index = index
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.stats = TaggingStats()
+
+    def get_unfinished(self) -> dict[str, list[str]]:
+        """
+        Get the source files of each archive left partially tagged.
+        """
+        return self.index.get_unfinished_tagging() if self.index else {}
+
+    def discard(self, target: str):
+        if self.index:
+            self.index.finish_tagging(target)
+
+    async def tag(self, target: str, files: list[str]):
+        """
+        Tag the source `files` of `target`, skipping those already tagged.
+
+        Tagging stops at the first file which can't be tagged, with the files
+        tagged up to then kept in the journal.
+        """
+        pending = self.index.start_tagging(target, files) if self.index else files
+
+        start = time.monotonic()
+        stats = TaggingStats()
+        tagged: list[str] = []
+        try:
+            async for file, retries in iter_bounded(
+                self._tag_file,
+                pending,
+                limit=self.max_concurrency,
+            ):
+                tagged.append(file)
+                stats.count += 1
+                stats.retries += retries
+                if len(tagged) >= JOURNAL_BATCH_SIZE:
+                    self._record(target, tagged)
+                    tagged = []
+        finally:
+            self._record(target, tagged)
+
+            stats.seconds = time.monotonic() - start
+            self.stats.count += stats.count
+            self.stats.retries += stats.retries
+            self.stats.seconds += stats.seconds
+            LOGGER.info(
+                "Tagged files target=%s tagged=%d/%d retries=%d "
+                "seconds=%.2f tags_per_second=%.1f",
+                target,
+                stats.count,
+                len(pending),
+                stats.retries,
+                stats.seconds,
+                stats.rate,
+            )
+
+        self.discard(target)
+
+    async def _tag_file(self, file: str) -> tuple[str, int]:
+        retries = 0
+        while True:
+            try:
+                await self.experiment_file_system.tag(file)
+                return file, retries
+            except Exception as err:
+                if retries + 1 >= self.max_attempts or not _is_throttled(err):
+                    raise
+
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**retries))
+            retries += 1
+            LOGGER.warning(
+                "Tagging throttled file=%s attempt=%d delay=%.2f",
+                file,
+                retries,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    def _record(self, target: str, files: list[str]):
+        if self.index and files:
+            self.index.mark_tagged(target, files)
+
+
+def _is_throttled(err: BaseException) -> bool:
+    # s3fs translates SlowDown and 503 errors to EBUSY, keeping the client
+    # error as the cause of those it doesn't translate
+    if isinstance(err, TimeoutError):
+        return True
+    if isinstance(err, OSError) and err.errno == errno.EBUSY:
+        return True
+
+    response = getattr(err.__cause__, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLING_CODES
@@ -1,4 +1,112 @@
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Iterable, Sequence
 from datetime import date, datetime
-from typing import Union
+from typing import Any, Callable, TypeVar, Union
 
 DateT = Union[date, datetime]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def iter_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    *,
+    limit: int,
+) -> AsyncGenerator[R, None]:
+    """
+    Apply `func` to `items` with at most `limit` calls in flight.
+
+    Results are yielded in the order they complete. Calls still in flight
+    are cancelled if the generator is closed early.
+    """
+    iterator = iter(items)
+    pending: set[asyncio.Future[R]] = set()
+    try:
+        while True:
+            for item in iterator:
+                pending.add(asyncio.ensure_future(func(item)))
+                if len(pending) >= limit:
+                    break
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(
+                pending,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class _Done:
+    pass
+
+
+DONE = _Done()
+
+
+async def run_pipeline(
+    items: AsyncIterable[Any],
+    stages: Sequence[tuple[Callable[[Any], Awaitable[Any]], int]],
+) -> list[Any]:
+    """
+    Pass `items` through each stage of `(func, concurrency)` in turn.
+
+    Stages run concurrently, each with up to `concurrency` calls in flight,
+    and hand items on through queues as small as the next stage's
+    concurrency so a slow stage holds back the ones before it. Results of
+    the last stage are returned in the order they complete. The first
+    exception cancels every stage and is raised.
+    """
+    queues: list[asyncio.Queue] = [
+        asyncio.Queue(maxsize=concurrency) for _, concurrency in stages
+    ]
+    results: list[Any] = []
+
+    async def feed():
+        async for item in items:
+            await queues[0].put(item)
+        for _ in range(stages[0][1]):
+            await queues[0].put(DONE)
+
+    async def run_worker(index: int):
+        func = stages[index][0]
+        while (item := await queues[index].get()) is not DONE:
+            result = await func(item)
+            if index + 1 < len(stages):
+                await queues[index + 1].put(result)
+            else:
+                results.append(result)
+
+    async def run_stage(index: int):
+        await _gather_or_cancel(
+            *(run_worker(index) for _ in range(stages[index][1])),
+        )
+        if index + 1 < len(stages):
+            for _ in range(stages[index + 1][1]):
+                await queues[index + 1].put(DONE)
+
+    await _gather_or_cancel(
+        feed(),
+        *(run_stage(index) for index in range(len(stages))),
+    )
+
+    return results
+
+
+async def _gather_or_cancel(*coros: Awaitable[Any]):
+    # Unlike `asyncio.gather`, nothing is left running once one fails
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
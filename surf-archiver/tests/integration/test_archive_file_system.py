@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from pathlib import Path
 from tarfile import TarFile
 from typing import Callable
@@ -5,7 +6,7 @@ from uuid import uuid4
 
 import pytest
 
-from surf_archiver.file import ArchiveFileSystem, _TempDir
+from surf_archiver.file import ArchiveFileSystem, TarMember
 
 FactoryT = Callable[[], Path]
 
@@ -25,16 +26,6 @@ def fixture_archive_file_system(dir_factory: FactoryT) -> ArchiveFileSystem:
     return ArchiveFileSystem(dir_factory())
 
 
-@pytest.fixture(name="populated_temp_dir")
-def fixture_populated_temp_dir(dir_factory: FactoryT) -> _TempDir:
-    dir_ = dir_factory()
-
-    file = dir_ / "test.txt"
-    file.touch()
-
-    return _TempDir(dir_)
-
-
 def test_file_exists(archive_file_system: ArchiveFileSystem):
     file_name = Path(uuid4().hex)
     (archive_file_system.base_path / file_name).touch()
@@ -47,21 +38,37 @@ def test_file_does_not_exist(archive_file_system: ArchiveFileSystem):
     assert not archive_file_system.exists(file_name)
 
 
-async def test_add_temp_directory_to_file_system(
-    archive_file_system: ArchiveFileSystem,
-    populated_temp_dir: _TempDir,
-):
-    await archive_file_system.add(populated_temp_dir, Path("test.tar"))
+async def test_write_streamed_members(archive_file_system: ArchiveFileSystem):
+    data = {"0000.tar": b"test" * 1000, "0001.tar": b""}
 
-    expected_target = archive_file_system.base_path / "test.tar"
+    def get_opener(content: bytes) -> Callable[[], AsyncIterator[bytes]]:
+        async def _open() -> AsyncIterator[bytes]:
+            for start in range(0, len(content), 1024):
+                yield content[start : start + 1024]
 
-    assert expected_target.exists()
+        return _open
+
+    members = [
+        TarMember(name=name, size=len(content), open=get_opener(content))
+        for name, content in data.items()
+    ]
+    await archive_file_system.write(Path("test.tar"), members)
+
+    expected_target = archive_file_system.base_path / "test.tar"
     with TarFile(expected_target, "r") as tarfile:
-        assert tarfile.getnames() == [".", "./test.txt"]
+        assert tarfile.getnames() == [".", "./0000.tar", "./0001.tar"]
+        for name, content in data.items():
+            member = tarfile.extractfile(f"./{name}")
+            assert member and member.read() == content
+
+
+async def test_write_removes_incomplete_tar(archive_file_system: ArchiveFileSystem):
+    async def _open() -> AsyncIterator[bytes]:
+        yield b"test"
 
+    members = [TarMember(name="0000.tar", size=1024, open=_open)]
 
-def test_get_temp_dir():
-    with ArchiveFileSystem.get_temp_dir() as tmp_dir:
-        assert tmp_dir.path.exists()
+    with pytest.raises(ValueError):
+        await archive_file_system.write(Path("test.tar"), members)
 
-    assert not tmp_dir.path.exists()
+    assert not list(archive_file_system.base_path.iterdir())
@@ -44,6 +44,7 @@ def fixture_config(
         target_dir=tmp_path,
         bucket=random_str,
         log_file=tmp_path / "test.log",
+        index_file=tmp_path / "index.sqlite3",
     )
 
 
@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import Generator
+from pathlib import Path
 from unittest.mock import AsyncMock
 from uuid import UUID
 
@@ -5,18 +8,26 @@ import pytest
 
 from surf_archiver.archiver import ArchiveEntry, ArchiveParams, Archiver
 from surf_archiver.definitions import Mode
-from surf_archiver.file import ArchiveFileSystem, ExperimentFileSystem
+from surf_archiver.file import ArchiveFileSystem, ExperimentFileSystem, TarMember
+from surf_archiver.index import ArchiveIndex
+from surf_archiver.tagger import Tagger
 
 
 @pytest.fixture(name="experiment_file_system")
-def fixture_experiment_file_system() -> ExperimentFileSystem:
+def fixture_experiment_file_system() -> AsyncMock:
     file_system = AsyncMock(ExperimentFileSystem)
-    file_system.list_files_by_date.return_value = {
-        ("test-id", "20000101"): ["test-bucket/images/test-id/20000101/0000.tar"],
-    }
+    file_system.iter_files_by_date.return_value.__aiter__.return_value = [
+        (("test-id", "20000101"), ["test-bucket/images/test-id/20000101/0000.tar"]),
+    ]
     return file_system
 
 
+@pytest.fixture(name="index")
+def fixture_index(tmp_path: Path) -> Generator[ArchiveIndex, None, None]:
+    with ArchiveIndex.open(tmp_path / "index.sqlite3") as index:
+        yield index
+
+
 @pytest.fixture(name="archive_params")
 def fixture_archive_params() -> ArchiveParams:
     return ArchiveParams(
@@ -26,7 +37,7 @@ def fixture_archive_params() -> ArchiveParams:
 
 
 async def test_new_files_are_archived(
-    archive_params: ArchiveParams, experiment_file_system: ExperimentFileSystem
+    archive_params: ArchiveParams, experiment_file_system: AsyncMock
 ):
     archive_file_system = AsyncMock(ArchiveFileSystem)
     archive_file_system.exists.return_value = False
@@ -42,11 +53,14 @@ async def test_new_files_are_archived(
     archives = await archiver.archive(archive_params)
 
     assert archives == expected
+    experiment_file_system.mark_archived.assert_called_once_with(
+        ["test-bucket/images/test-id/20000101/0000.tar"],
+    )
 
 
 async def test_already_archived_files_are_skipped(
     archive_params: ArchiveParams,
-    experiment_file_system: ExperimentFileSystem,
+    experiment_file_system: AsyncMock,
 ):
     archive_file_system = AsyncMock(ArchiveFileSystem)
     archive_file_system.exists.return_value = True
@@ -56,14 +70,17 @@ async def test_already_archived_files_are_skipped(
     archives = await archiver.archive(archive_params)
     assert not archives
 
+    archive_file_system.write.assert_not_called()
+    experiment_file_system.mark_archived.assert_not_called()
+
 
 async def test_tar_creation_failure_propagates(
     archive_params: ArchiveParams,
-    experiment_file_system: ExperimentFileSystem,
+    experiment_file_system: AsyncMock,
 ):
     archive_file_system = AsyncMock(ArchiveFileSystem)
     archive_file_system.exists.return_value = False
-    archive_file_system.add.side_effect = OSError("disk full")
+    archive_file_system.write.side_effect = OSError("disk full")
 
     archiver = Archiver(experiment_file_system, archive_file_system)
 
@@ -75,7 +92,7 @@ async def test_tar_creation_failure_propagates(
 
 async def test_tagging_failure_rolls_back_tar(
     archive_params: ArchiveParams,
-    experiment_file_system: ExperimentFileSystem,
+    experiment_file_system: AsyncMock,
 ):
     archive_file_system = AsyncMock(ArchiveFileSystem)
     archive_file_system.exists.return_value = False
@@ -87,18 +104,22 @@ async def test_tagging_failure_rolls_back_tar(
         await archiver.archive(archive_params)
 
     archive_file_system.delete.assert_called_once()
+    experiment_file_system.mark_archived.assert_not_called()
 
 
 async def test_partial_tagging_failure_rolls_back_tar(
     archive_params: ArchiveParams,
 ):
     experiment_file_system = AsyncMock(ExperimentFileSystem)
-    experiment_file_system.list_files_by_date.return_value = {
-        ("test-id", "20000101"): [
-            "test-bucket/images/test-id/20000101/0000.tar",
-            "test-bucket/images/test-id/20000101/0001.tar",
-        ],
-    }
+    experiment_file_system.iter_files_by_date.return_value.__aiter__.return_value = [
+        (
+            ("test-id", "20000101"),
+            [
+                "test-bucket/images/test-id/20000101/0000.tar",
+                "test-bucket/images/test-id/20000101/0001.tar",
+            ],
+        ),
+    ]
     experiment_file_system.tag.side_effect = [None, OSError("s3 error")]
 
     archive_file_system = AsyncMock(ArchiveFileSystem)
@@ -110,3 +131,129 @@ async def test_partial_tagging_failure_rolls_back_tar(
         await archiver.archive(archive_params)
 
     archive_file_system.delete.assert_called_once()
+
+
+async def test_tagging_failure_is_resumed_with_index(
+    archive_params: ArchiveParams,
+    experiment_file_system: AsyncMock,
+    index: ArchiveIndex,
+):
+    archive_file_system = AsyncMock(ArchiveFileSystem)
+    archive_file_system.exists.return_value = False
+    experiment_file_system.tag.side_effect = OSError("s3 error")
+
+    tagger = Tagger(experiment_file_system, index=index)
+    archiver = Archiver(experiment_file_system, archive_file_system, tagger=tagger)
+
+    assert not await archiver.archive(archive_params)
+
+    archive_file_system.delete.assert_not_called()
+
+    # The tar is tagged on the next run without being written again
+    archive_file_system.exists.return_value = True
+    experiment_file_system.tag.side_effect = None
+    experiment_file_system.iter_files_by_date.return_value.__aiter__.return_value = []
+
+    archives = await archiver.archive(archive_params)
+
+    assert archives == [
+        ArchiveEntry(
+            path="images/test-id/20000101.tar",
+            src_keys=["test-bucket/images/test-id/20000101/0000.tar"],
+        )
+    ]
+    archive_file_system.write.assert_awaited_once()
+    experiment_file_system.mark_archived.assert_called_once_with(
+        ["test-bucket/images/test-id/20000101/0000.tar"],
+    )
+
+
+async def test_tagging_failure_with_index_skips_group(
+    archive_params: ArchiveParams,
+    index: ArchiveIndex,
+):
+    experiment_file_system = AsyncMock(ExperimentFileSystem)
+    experiment_file_system.iter_files_by_date.return_value.__aiter__.return_value = [
+        (("test-id", date), [f"test-bucket/images/test-id/{date}/0000.tar"])
+        for date in ("20000101", "20000102", "20000103")
+    ]
+
+    async def tag(file: str):
+        if "20000102" in file:
+            raise OSError("s3 error")
+
+    experiment_file_system.tag.side_effect = tag
+
+    archive_file_system = AsyncMock(ArchiveFileSystem)
+    archive_file_system.exists.return_value = False
+
+    tagger = Tagger(experiment_file_system, index=index)
+    archiver = Archiver(experiment_file_system, archive_file_system, tagger=tagger)
+
+    archives = await archiver.archive(archive_params)
+
+    assert sorted(item.path for item in archives) == [
+        "images/test-id/20000101.tar",
+        "images/test-id/20000103.tar",
+    ]
+    assert list(tagger.get_unfinished()) == ["images/test-id/20000102.tar"]
+    archive_file_system.delete.assert_not_called()
+
+
+async def test_archive_groups_are_pipelined(archive_params: ArchiveParams):
+    events: list[str] = []
+
+    experiment_file_system = AsyncMock(ExperimentFileSystem)
+    experiment_file_system.iter_files_by_date.return_value.__aiter__.return_value = [
+        (("test-id", date), [f"test-bucket/images/test-id/{date}/0000.tar"])
+        for date in ("20000101", "20000102")
+    ]
+    experiment_file_system.get_sizes.return_value = [1]
+
+    async def tag(file: str):
+        # Tagging the first group is slow, so the second is written first
+        if "20000101" in file:
+            await asyncio.sleep(0.01)
+        events.append(f"tag {file.split('/')[-2]}")
+
+    experiment_file_system.tag.side_effect = tag
+
+    async def write(target: Path, members: list[TarMember]):
+        events.append(f"write {target.stem}")
+
+    archive_file_system = AsyncMock(ArchiveFileSystem)
+    archive_file_system.exists.return_value = False
+    archive_file_system.write.side_effect = write
+
+    archiver = Archiver(experiment_file_system, archive_file_system)
+
+    archives = await archiver.archive(archive_params)
+
+    assert sorted(item.path for item in archives) == [
+        "images/test-id/20000101.tar",
+        "images/test-id/20000102.tar",
+    ]
+    assert events.index("write 20000102") < events.index("tag 20000101")
+
+
+async def test_source_files_are_streamed(
+    archive_params: ArchiveParams,
+    experiment_file_system: AsyncMock,
+):
+    experiment_file_system.get_sizes.return_value = [1024]
+
+    archive_file_system = AsyncMock(ArchiveFileSystem)
+    archive_file_system.exists.return_value = False
+
+    archiver = Archiver(experiment_file_system, archive_file_system)
+
+    await archiver.archive(archive_params)
+
+    target, members = archive_file_system.write.await_args.args
+    assert target == Path("images/test-id/20000101.tar")
+    assert [(item.name, item.size) for item in members] == [("0000.tar", 1024)]
+
+    members[0].open()
+    experiment_file_system.iter_file.assert_called_once_with(
+        "test-bucket/images/test-id/20000101/0000.tar",
+    )
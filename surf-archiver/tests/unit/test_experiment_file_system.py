@@ -1,20 +1,162 @@
-# async def test_list_files_by_date():
-#     mock_s3 = AsyncMock(S3FileSystem)
-#     mock_s3._glob.return_value = [
-#         "test-bucket/images/id-1/20000101/0000.tar",
-#         "test-bucket/images/id-2/20000101/0000.tar",
-#         "test-bucket/images/id-2/20000101/0100.tar",
-#     ]
-#
-#     file_system = ExperimentFileSystem(s3=mock_s3, bucket_name="test-bucket")
-#
-#     expected = {
-#         "id-1": ["test-bucket/images/id-1/20000101/0000.tar"],
-#         "id-2": [
-#             "test-bucket/images/id-2/20000101/0000.tar",
-#             "test-bucket/images/id-2/20000101/0100.tar",
-#         ],
-#     }
-#
-#     output = await file_system.list_files_by_date()
-#     assert output == expected
+from collections.abc import Generator
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from s3fs import S3FileSystem
+
+from surf_archiver.file import ExperimentFileSystem
+from surf_archiver.index import ArchiveIndex
+
+LISTINGS = {
+    "test-bucket/images": ["id-1", "id-2"],
+    "test-bucket/images/id-1": ["20000101", "20000102"],
+    "test-bucket/images/id-2": ["20000101"],
+    "test-bucket/images/id-1/20000101": ["0000.tar", "0100.tar", "metadata.json"],
+    "test-bucket/images/id-2/20000101": ["0000.tar"],
+}
+
+ARCHIVED = {"test-bucket/images/id-1/20000101/0100.tar"}
+
+
+async def list_dir(path: str) -> list[dict]:
+    item_type = "file" if path.count("/") == 3 else "directory"
+    return [
+        {"name": f"{path}/{name}", "type": item_type, "size": 0}
+        for name in LISTINGS.get(path, [])
+    ]
+
+
+async def get_object_tagging(method: str, *, Bucket: str, Key: str) -> dict:
+    if f"{Bucket}/{Key}" in ARCHIVED:
+        return {"TagSet": [{"Key": "archived", "Value": "true"}]}
+    return {"TagSet": []}
+
+
+@pytest.fixture(name="s3")
+def fixture_s3() -> AsyncMock:
+    s3 = AsyncMock(S3FileSystem)
+    s3._lsdir.side_effect = list_dir
+    s3._call_s3.side_effect = get_object_tagging
+    s3.split_path.side_effect = lambda path: (*path.split("/", 1), None)
+    return s3
+
+
+@patch("surf_archiver.file.date")
+async def test_list_files_by_date(mock_date, s3: AsyncMock):
+    mock_date.today.return_value = date(2000, 1, 2)
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket")
+
+    expected = {
+        ("id-1", "20000101"): ["test-bucket/images/id-1/20000101/0000.tar"],
+        ("id-2", "20000101"): ["test-bucket/images/id-2/20000101/0000.tar"],
+    }
+
+    assert await file_system.list_files_by_date() == expected
+
+    # Directories from today onwards are never listed
+    listed = [call.args[0] for call in s3._lsdir.await_args_list]
+    assert "test-bucket/images/id-1/20000102" not in listed
+
+
+@patch("surf_archiver.file.date")
+async def test_list_files_by_date_skips_archived_groups(mock_date, s3: AsyncMock):
+    mock_date.today.return_value = date(2000, 1, 2)
+    s3._call_s3.side_effect = None
+    s3._call_s3.return_value = {"TagSet": [{"Key": "archived", "Value": "true"}]}
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket")
+
+    assert await file_system.list_files_by_date() == {}
+
+
+@pytest.fixture(name="index")
+def fixture_index(tmp_path: Path) -> Generator[ArchiveIndex, None, None]:
+    with ArchiveIndex.open(tmp_path / "index.sqlite3") as index:
+        yield index
+
+
+@patch("surf_archiver.file.date")
+async def test_list_files_by_date_with_index(
+    mock_date,
+    s3: AsyncMock,
+    index: ArchiveIndex,
+):
+    mock_date.today.return_value = date(2000, 1, 2)
+    index.add_groups(["test-bucket/images/id-2/20000101"])
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket", index=index)
+
+    expected = {
+        ("id-1", "20000101"): ["test-bucket/images/id-1/20000101/0000.tar"],
+    }
+    assert await file_system.list_files_by_date() == expected
+
+    # Tagged files are recorded, and not checked again
+    assert index.get_archived_keys(ARCHIVED) == ARCHIVED
+
+    s3._call_s3.reset_mock()
+    await file_system.list_files_by_date()
+
+    checked = [call.kwargs["Key"] for call in s3._call_s3.await_args_list]
+    assert checked == ["images/id-1/20000101/0000.tar"]
+
+
+@patch("surf_archiver.file.date")
+async def test_mark_archived_skips_group(
+    mock_date,
+    s3: AsyncMock,
+    index: ArchiveIndex,
+):
+    mock_date.today.return_value = date(2000, 1, 2)
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket", index=index)
+    for files in (await file_system.list_files_by_date()).values():
+        file_system.mark_archived(files)
+
+    s3._lsdir.reset_mock()
+    s3._call_s3.reset_mock()
+
+    assert await file_system.list_files_by_date() == {}
+
+    listed = [call.args[0] for call in s3._lsdir.await_args_list]
+    assert listed == [
+        "test-bucket/images",
+        "test-bucket/images/id-1",
+        "test-bucket/images/id-2",
+    ]
+    s3._call_s3.assert_not_awaited()
+
+
+@patch("surf_archiver.file.date")
+async def test_get_sizes_from_listing(mock_date, s3: AsyncMock):
+    mock_date.today.return_value = date(2000, 1, 2)
+    s3._info.return_value = {"size": 1024}
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket")
+    await file_system.list_files_by_date()
+
+    sizes = await file_system.get_sizes(
+        [
+            "test-bucket/images/id-1/20000101/0000.tar",
+            "test-bucket/images/id-1/20000102/0000.tar",
+        ]
+    )
+
+    assert sizes == [0, 1024]
+    s3._info.assert_awaited_once_with("test-bucket/images/id-1/20000102/0000.tar")
+
+
+async def test_iter_file(s3: AsyncMock):
+    file = AsyncMock()
+    file.read.side_effect = [b"test", b"data", b""]
+    s3.open_async.return_value = file
+
+    file_system = ExperimentFileSystem(s3=s3, bucket_name="test-bucket")
+
+    chunks = [chunk async for chunk in file_system.iter_file("test-bucket/key")]
+
+    assert chunks == [b"test", b"data"]
+    file.close.assert_awaited_once()
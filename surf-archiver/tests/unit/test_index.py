@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from surf_archiver.index import CHUNK_SIZE, ArchiveIndex
+
+
+def test_archived_keys_persist(tmp_path: Path):
+    path = tmp_path / "index" / "index.sqlite3"
+    keys = [f"test-bucket/images/test-id/20000101/{i:04}.tar" for i in range(2)]
+
+    with ArchiveIndex.open(path) as index:
+        index.add_keys(keys[:1])
+        index.add_groups(["test-bucket/images/test-id/20000101"])
+
+    with ArchiveIndex.open(path) as index:
+        assert index.get_archived_keys(keys) == set(keys[:1])
+        assert index.get_archived_groups(
+            [
+                "test-bucket/images/test-id/20000101",
+                "test-bucket/images/test-id/20000102",
+            ]
+        ) == {"test-bucket/images/test-id/20000101"}
+
+
+def test_get_archived_keys_in_chunks(tmp_path: Path):
+    keys = [f"key-{i}" for i in range(CHUNK_SIZE * 2 + 1)]
+
+    with ArchiveIndex.open(tmp_path / "index.sqlite3") as index:
+        index.add_keys(keys[::2])
+
+        assert index.get_archived_keys(keys) == set(keys[::2])
+
+
+def test_tagging_is_journaled(tmp_path: Path):
+    path = tmp_path / "index.sqlite3"
+    target = "images/test-id/20000101.tar"
+    keys = [f"test-bucket/images/test-id/20000101/{i:04}.tar" for i in range(2)]
+
+    with ArchiveIndex.open(path) as index:
+        assert index.start_tagging(target, keys) == keys
+        index.mark_tagged(target, keys[:1])
+
+    with ArchiveIndex.open(path) as index:
+        assert index.get_unfinished_tagging() == {target: keys}
+        assert index.start_tagging(target, keys) == keys[1:]
+
+        index.finish_tagging(target)
+        assert not index.get_unfinished_tagging()
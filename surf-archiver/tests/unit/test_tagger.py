@@ -0,0 +1,85 @@
+import errno
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from surf_archiver.file import ExperimentFileSystem
+from surf_archiver.index import ArchiveIndex
+from surf_archiver.tagger import Tagger
+
+FILES = [f"test-bucket/images/test-id/20000101/{i:04}.tar" for i in range(3)]
+
+TARGET = "images/test-id/20000101.tar"
+
+
+@pytest.fixture(name="experiment_file_system")
+def fixture_experiment_file_system() -> AsyncMock:
+    return AsyncMock(ExperimentFileSystem)
+
+
+@pytest.fixture(name="index")
+def fixture_index(tmp_path: Path) -> Generator[ArchiveIndex, None, None]:
+    with ArchiveIndex.open(tmp_path / "index.sqlite3") as index:
+        yield index
+
+
+async def test_throttled_files_are_retried(experiment_file_system: AsyncMock):
+    experiment_file_system.tag.side_effect = [
+        OSError(errno.EBUSY, "SlowDown"),
+        TimeoutError(),
+        None,
+    ]
+
+    tagger = Tagger(experiment_file_system, base_delay=0)
+
+    await tagger.tag(TARGET, FILES[:1])
+
+    assert experiment_file_system.tag.await_count == 3
+    assert (tagger.stats.count, tagger.stats.retries) == (1, 2)
+
+
+async def test_retries_are_limited(experiment_file_system: AsyncMock):
+    experiment_file_system.tag.side_effect = OSError(errno.EBUSY, "SlowDown")
+
+    tagger = Tagger(experiment_file_system, max_attempts=2, base_delay=0)
+
+    with pytest.raises(OSError, match="SlowDown"):
+        await tagger.tag(TARGET, FILES[:1])
+
+    assert experiment_file_system.tag.await_count == 2
+
+
+async def test_other_errors_are_not_retried(experiment_file_system: AsyncMock):
+    experiment_file_system.tag.side_effect = PermissionError("denied")
+
+    tagger = Tagger(experiment_file_system, base_delay=0)
+
+    with pytest.raises(PermissionError):
+        await tagger.tag(TARGET, FILES[:1])
+
+    experiment_file_system.tag.assert_awaited_once()
+
+
+async def test_tagging_is_resumed(
+    experiment_file_system: AsyncMock,
+    index: ArchiveIndex,
+):
+    experiment_file_system.tag.side_effect = [None, OSError("s3 error"), None]
+
+    tagger = Tagger(experiment_file_system, index=index, max_concurrency=1)
+
+    with pytest.raises(OSError, match="s3 error"):
+        await tagger.tag(TARGET, FILES)
+
+    assert tagger.get_unfinished() == {TARGET: FILES}
+
+    experiment_file_system.tag.reset_mock(side_effect=True)
+    await tagger.tag(TARGET, FILES)
+
+    assert [item.args[0] for item in experiment_file_system.tag.await_args_list] == [
+        FILES[1],
+        FILES[2],
+    ]
+    assert not tagger.get_unfinished()
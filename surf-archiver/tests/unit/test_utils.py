@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from surf_archiver.utils import iter_bounded, run_pipeline
+
+
+async def test_iter_bounded_limits_calls_in_flight():
+    in_flight, max_in_flight = 0, 0
+
+    async def func(item: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01 * (item % 3))
+        in_flight -= 1
+        return item
+
+    results = [item async for item in iter_bounded(func, range(10), limit=3)]
+
+    assert sorted(results) == list(range(10))
+    assert max_in_flight == 3
+
+
+async def test_run_pipeline_passes_items_through_stages():
+    async def items():
+        for item in range(5):
+            yield item
+
+    async def double(item: int) -> int:
+        return item * 2
+
+    async def to_str(item: int) -> str:
+        return str(item)
+
+    results = await run_pipeline(items(), [(double, 2), (to_str, 1)])
+
+    assert sorted(results) == ["0", "2", "4", "6", "8"]
+
+
+async def test_run_pipeline_cancels_stages_on_failure():
+    cancelled = asyncio.Event()
+
+    async def items():
+        for item in range(2):
+            yield item
+
+    async def wait(item: int):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fail(item: int):
+        raise ValueError("test")
+
+    async def route(item: int):
+        await (fail if item else wait)(item)
+
+    with pytest.raises(ValueError, match="test"):
+        await run_pipeline(items(), [(route, 2)])
+
+    assert cancelled.is_set()